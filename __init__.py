@@ -1,14 +1,46 @@
 import os
 from pathlib import Path
-from flask import Flask, jsonify, request, Response
+from typing import Any, Dict, Optional
+
+from flask import Flask, jsonify, request, Response, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
 
+from app_factory import db, init_db
+from backend.services.recipe_api import SpoonacularError, enrich_with_links, find_by_ingredients, parse_fields
+from services import compression, image_proxy, json_provider, metrics, retry_policy, timing
+from services.conditional import (
+    PANTRY_CACHE_CONTROL,
+    is_not_modified,
+    make_etag,
+    not_modified,
+    set_validators,
+)
+from services.ingredients import canonicalize_ingredients
+from services.pagination import (
+    NDJSON_MIMETYPE,
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    json_array_chunks,
+    ndjson_lines,
+    parse_limit,
+)
+from services.pantry_search import DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT
+from services.pantry_store import (
+    BACKEND_MEMORY, BACKEND_SQL, BACKENDS, MemoryPantryStore, PantryStore, SQLAlchemyPantryStore
+)
+from services.pantry_suggestions import PantrySuggestionCache
+
 
-def create_app():
+def create_app(config: Optional[Dict[str, Any]] = None):
     """
     Application factory that returns a configured Flask app.
     All routes are registered directly on this app instance (no blueprints).
+
+    PANTRY_BACKEND (config or env) picks the pantry storage:
+      memory  per-process dict (default; tests, single worker)
+      sql     models.PantryItem via DATABASE_URL, shared by every worker
     """
     # Load environment variables from project root .env (if present)
     root_env = Path(__file__).resolve().parent.parent / ".env"
@@ -16,7 +48,19 @@ def create_app():
         load_dotenv(root_env)
 
     app = Flask(__name__)
+    app.config.from_mapping(
+        PANTRY_BACKEND=os.getenv("PANTRY_BACKEND", BACKEND_MEMORY),
+        DATABASE_URL=os.getenv("DATABASE_URL", "sqlite:///prepify.db"),
+    )
+    app.config.update(config or {})
     CORS(app, resources={r"/*": {"origins": "*"}})
+    json_provider.init_app(app)
+    compression.init_app(app)
+    retry_policy.init_app(app)
+    # IMAGE_PROXY may carry a ready ImageProxy (tests inject a local fetcher)
+    image_proxy.init_app(app, app.config.get("IMAGE_PROXY"))
+    metrics.init_app(app)
+    timing.init_app(app)
 
     @app.get("/")
     def home():
@@ -31,41 +75,182 @@ def create_app():
         routes = sorted([str(rule) for rule in app.url_map.iter_rules()])
         return jsonify({"routes": routes}), 200
 
-    pantry = []
+    pantry = _pantry_store(app)
+    # Suggestions stay memoized until the store's revision moves (DB-backed for sql, so any worker's write counts)
+    pantry_suggestions = PantrySuggestionCache(pantry.versions, revision=lambda _: pantry.revision())
+    metrics.register_cache("pantry_suggestions", pantry_suggestions, entries_key="pantries")
+
+    def _fields(data):
+        fields = {"name": data.get("name"), "quantity": data.get("quantity")}
+        if "category" in data:
+            fields["category"] = data.get("category")
+        return fields
 
     @app.get("/pantry")
     def get_pantry():
-        return jsonify(pantry), 200
+        """
+        GET /pantry                        full list
+        GET /pantry?limit=50&cursor=...    {"items": [...], "next": <cursor or null>}, keyset on id
+        GET /pantry?stream=ndjson|json     every item, streamed one at a time
+
+        Every 200 carries an ETag derived from the pantry revision and the
+        query, so an unchanged poll with If-None-Match gets a bodiless 304.
+        """
+        stream = request.args.get("stream")
+        if not stream and NDJSON_MIMETYPE in request.headers.get("Accept", ""):
+            stream = "ndjson"
+        if stream and stream not in ("ndjson", "json"):
+            return jsonify({"error": "stream must be ndjson or json"}), 400
+
+        etag = make_etag("pantry", pantry.pantry_id, pantry.revision(), stream, sorted(request.args.items(multi=True)))
+        if is_not_modified(etag):
+            return not_modified(etag, PANTRY_CACHE_CONTROL, vary=("Accept",))
+
+        def validated(response):
+            return set_validators(response, etag, PANTRY_CACHE_CONTROL, vary=("Accept",))
+
+        if stream:
+            encode = json_array_chunks if stream == "json" else ndjson_lines
+            chunks = encode(pantry.items(), dumps=app.json.dumps)
+            mimetype = NDJSON_MIMETYPE if stream == "ndjson" else "application/json"
+            return validated(Response(stream_with_context(chunks), mimetype=mimetype))
+
+        if "limit" in request.args or "cursor" in request.args:
+            try:
+                limit = parse_limit(request.args.get("limit"))
+                after = decode_cursor(request.args.get("cursor"))
+            except InvalidCursor as e:
+                return jsonify({"error": str(e)}), 400
+            except ValueError:
+                return jsonify({"error": "limit must be an integer"}), 400
+            if after is not None and (not isinstance(after, int) or isinstance(after, bool)):
+                return jsonify({"error": "Invalid cursor"}), 400
+            items, more = pantry.page(after, limit)
+            next_cursor = encode_cursor(items[-1]["id"]) if more else None
+            return validated(jsonify({"items": items, "next": next_cursor})), 200
+
+        return validated(jsonify(list(pantry.items()))), 200
 
     @app.post("/pantry")
     def add_item():
         data = request.get_json(silent=True) or {}
-        name = data.get("name")
-        quantity = data.get("quantity")
-        if not name:
+        if not data.get("name"):
             return jsonify({"error": "name is required"}), 400
-        pantry.append({"name": name, "quantity": quantity})
-        return jsonify({"name": name, "quantity": quantity}), 201
+        return jsonify(pantry.add(_fields(data))), 201
+
+    @app.get("/pantry/search")
+    def search_pantry():
+        """
+        GET /pantry/search?q=tom%20sa        autocomplete: each word matches a word prefix
+        GET /pantry/search?q=rice&category=grains&limit=10
+        GET /pantry/search?category=grains   browse a category in name order
+        Needs PANTRY_BACKEND=sql.
+        """
+        if not isinstance(pantry, SQLAlchemyPantryStore):
+            return jsonify({"error": "Search needs PANTRY_BACKEND=sql"}), 501
+        try:
+            limit = parse_limit(request.args.get("limit"), DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT)
+        except ValueError:
+            return jsonify({"error": "limit must be an integer"}), 400
+        etag = make_etag("search", pantry.pantry_id, pantry.revision(), sorted(request.args.items(multi=True)))
+        if is_not_modified(etag):
+            return not_modified(etag, PANTRY_CACHE_CONTROL)
+        items = pantry.search(request.args.get("q", ""), request.args.get("category"), limit)
+        return set_validators(jsonify({"items": items}), etag, PANTRY_CACHE_CONTROL), 200
+
+    @app.post("/pantry/batch")
+    def batch_items():
+        """
+        {"operations": [{"op": "create", "name": "Rice"}, {"op": "delete", "id": 3}], "atomic": false}
+        A bare list of operations is accepted too; ?atomic=true rejects the
+        whole batch if any operation is invalid. Needs PANTRY_BACKEND=sql.
+        """
+        if not isinstance(pantry, SQLAlchemyPantryStore):
+            return jsonify({"error": "Batch writes need PANTRY_BACKEND=sql"}), 501
+        data = request.get_json(silent=True)
+        if isinstance(data, list):
+            operations, atomic = data, False
+        else:
+            operations, atomic = (data or {}).get("operations"), bool((data or {}).get("atomic", False))
+        if request.args.get("atomic", "").lower() in ("1", "true", "yes"):
+            atomic = True
+        body, status = pantry.apply_batch(operations, atomic=atomic)
+        return jsonify(body), status
 
     @app.put("/pantry/<int:item_id>")
     def update_item(item_id):
-        if item_id < 0 or item_id >= len(pantry):
+        if pantry.get(item_id) is None:
             return jsonify({"error": "Item not found"}), 404
         data = request.get_json(silent=True) or {}
-        name = data.get("name")
-        quantity = data.get("quantity")
-        if not name:
+        if not data.get("name"):
             return jsonify({"error": "name is required"}), 400
-        pantry[item_id] = {"name": name, "quantity": quantity}
-        return jsonify(pantry[item_id]), 200
+        item = pantry.update(item_id, _fields(data))
+        if item is None:
+            return jsonify({"error": "Item not found"}), 404
+        return jsonify(item), 200
 
     @app.delete("/pantry/<int:item_id>")
     def delete_item(item_id):
-        if item_id < 0 or item_id >= len(pantry):
+        if not pantry.delete(item_id):
             return jsonify({"error": "Item not found"}), 404
-        pantry.pop(item_id)
         return Response(status=204)
 
+    @app.get("/recipes/suggest")
+    def suggest_from_pantry():
+        """
+        GET /recipes/suggest?from=pantry&number=5&ranking=1[&fields=id,title,sourceUrl]
+        Suggests recipes for whatever is in the pantry right now. fields= trims
+        each recipe; only sourceUrl/readyInMinutes/servings cost extra upstream calls.
+        """
+        if request.args.get("from") != "pantry":
+            return jsonify({"error": "Use ?from=pantry, or POST ingredients to /recipes/suggest."}), 400
+        try:
+            number = max(1, min(int(request.args.get("number", 5)), 10))
+            ranking = int(request.args.get("ranking", 1))
+        except ValueError:
+            return jsonify({"error": "number and ranking must be integers"}), 400
+        try:
+            fields = parse_fields(request.args.get("fields"))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        # Same pantry revision and parameters -> same suggestions; the memo below is keyed on the same revision
+        revision = pantry.revision()
+        etag = make_etag("suggest", pantry.pantry_id, revision, number, ranking, fields)
+        if is_not_modified(etag):
+            return not_modified(etag, PANTRY_CACHE_CONTROL)
+
+        def compute():
+            ingredients = canonicalize_ingredients([item.get("name") for item in pantry.items()])
+            if not ingredients:
+                return []
+            stubs = find_by_ingredients(ingredients, number=number, ranking=ranking)
+            if fields is not None:
+                return enrich_with_links(stubs, fields=fields)
+            return [
+                {
+                    "id": r.get("id"),
+                    "title": r.get("title"),
+                    "image": r.get("image"),
+                    "usedIngredientCount": r.get("usedIngredientCount"),
+                    "missedIngredientCount": r.get("missedIngredientCount"),
+                }
+                for r in stubs
+            ]
+
+        try:
+            recipes, version, hit = pantry_suggestions.get(
+                pantry.pantry_id,
+                {"number": number, "ranking": ranking, "fields": ",".join(fields or ())},
+                compute,
+                version=revision,
+            )
+        except SpoonacularError as e:
+            return jsonify({"error": str(e)}), 502
+        response = jsonify({"recipes": image_proxy.rewrite_images(recipes), "pantryVersion": version})
+        response.headers["X-Cache"] = "HIT" if hit else "MISS"
+        return set_validators(response, etag, PANTRY_CACHE_CONTROL), 200
+
     @app.post("/recipes/suggest")
     def suggest_recipes():
         """
@@ -92,3 +277,20 @@ def create_app():
     @app.get("/env-check")
     def env_check():
         return {"hasKey": bool(os.getenv("SPOONACULAR_API_KEY"))}, 200
+
+    return app
+
+
+def _pantry_store(app: Flask) -> PantryStore:
+    backend = app.config["PANTRY_BACKEND"]
+    if backend not in BACKENDS:
+        raise ValueError(f"PANTRY_BACKEND must be one of {', '.join(BACKENDS)}, got {backend!r}")
+    if backend == BACKEND_MEMORY:
+        return MemoryPantryStore()
+
+    init_db(app, app.config["DATABASE_URL"])
+    from .models import PantryItem
+
+    with app.app_context():
+        db.create_all()
+    return SQLAlchemyPantryStore(db.session, PantryItem)
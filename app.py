@@ -5,6 +5,8 @@ from flask import Flask, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
 
+from services import compression, json_provider, metrics, retry_policy, timing
+
 def create_app():
     """Application factory that returns a configured Flask app."""
     # Load .env from repo root
@@ -14,6 +16,11 @@ def create_app():
 
     app = Flask(__name__)
     CORS(app, resources={r"/*": {"origins": "*"}})
+    json_provider.init_app(app)
+    compression.init_app(app)
+    retry_policy.init_app(app)
+    metrics.init_app(app)
+    timing.init_app(app)
 
     @app.get("/health")
     def health():
@@ -1,7 +1,12 @@
 from flask import Flask
 from app.routes.recipes import recipes_bp
+from services import image_proxy, metrics, retry_policy, timing
 
 def create_app():
     app = Flask(__name__)
+    retry_policy.init_app(app)
+    image_proxy.init_app(app)
+    metrics.init_app(app)
+    timing.init_app(app)
     app.register_blueprint(recipes_bp)
     return app
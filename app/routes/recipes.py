@@ -1,39 +1,81 @@
 from flask import Blueprint, request, jsonify
 from app.services.spoonacular_client import search_recipes_by_ingredients, SpoonacularError
+from backend.services.recipe_api import enrich_with_links, parse_fields
+from services.circuit_breaker import CircuitOpenError, StaleWhileRevalidate, get_circuit_breaker, stale_headers
+from services.conditional import (
+    STALE_CACHE_CONTROL, SUGGEST_CACHE_CONTROL, is_not_modified, not_modified, set_validators, suggest_etags
+)
+from services.image_proxy import rewrite_images
+from services.ingredients import canonicalize_ingredients
+from services.persistent_cache import make_key
 
 recipes_bp = Blueprint("recipes", __name__, url_prefix="/recipes")
 
+# Last good result per query, served while Spoonacular's circuit is open
+_suggest_swr = StaleWhileRevalidate(get_circuit_breaker())
+
 @recipes_bp.get("/suggest")
 def suggest():
     """
     ?ingredients=chicken,onion,garlic&number=5&ranking=1&ignorePantry=true
+    &fields=id,title,image,sourceUrl trims each recipe to those fields; only
+    sourceUrl/readyInMinutes/servings trigger the per-recipe information lookup.
     """
     try:
-        ingredients = request.args.get("ingredients", "")
+        fields = parse_fields(request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        ingredients = canonicalize_ingredients(request.args.get("ingredients", ""))
         if not ingredients:
             return jsonify({"error": "ingredients query param required"}), 400
         number = int(request.args.get("number", 5))
         ranking = int(request.args.get("ranking", 1))
         ignore_pantry = request.args.get("ignorePantry", "true").lower() == "true"
 
-        data = search_recipes_by_ingredients(
-            ingredients=ingredients.split(","),
-            number=number,
-            ranking=ranking,
-            ignore_pantry=ignore_pantry,
+        query = {
+            "ingredients": ",".join(ingredients),
+            "number": number,
+            "ranking": ranking,
+            "ignorePantry": ignore_pantry,
+        }
+        key = make_key("recipes/suggest", query)
+        etag_key = (key, tuple(fields or ()))
+        etag = suggest_etags.current(etag_key)
+        if etag and is_not_modified(etag):
+            return not_modified(etag, SUGGEST_CACHE_CONTROL)
+        data, stale_age = _suggest_swr.fetch(
+            key,
+            lambda: search_recipes_by_ingredients(
+                ingredients=ingredients,
+                number=number,
+                ranking=ranking,
+                ignore_pantry=ignore_pantry,
+            ),
         )
-        # Normalize minimal payload for UI cards
-        normalized = [
-            {
-                "id": r.get("id"),
-                "title": r.get("title"),
-                "image": r.get("image"),
-                "usedIngredientCount": r.get("usedIngredientCount"),
-                "missedIngredientCount": r.get("missedIngredientCount"),
-            }
-            for r in data
-        ]
-        return jsonify({"recipes": normalized})
+        if fields is not None:
+            normalized = enrich_with_links(data, fields=fields)
+        else:
+            # Normalize minimal payload for UI cards
+            normalized = [
+                {
+                    "id": r.get("id"),
+                    "title": r.get("title"),
+                    "image": r.get("image"),
+                    "usedIngredientCount": r.get("usedIngredientCount"),
+                    "missedIngredientCount": r.get("missedIngredientCount"),
+                }
+                for r in data
+            ]
+        response = jsonify({"recipes": rewrite_images(normalized)})
+        if stale_age is not None:
+            response.headers.update(stale_headers(stale_age))
+            response.headers["Cache-Control"] = STALE_CACHE_CONTROL
+            return response
+        return set_validators(response, suggest_etags.issue(etag_key, response.get_data()), SUGGEST_CACHE_CONTROL)
+    except CircuitOpenError as e:
+        # Circuit open and nothing stale to serve: fail fast
+        return jsonify({"error": str(e)}), 503
     except SpoonacularError as e:
         return jsonify({"error": str(e)}), 500
     except Exception as e:
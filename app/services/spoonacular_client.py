@@ -6,12 +6,24 @@ from typing import List, Dict, Any, Optional
 import requests
 from dotenv import load_dotenv
 
+from services.circuit_breaker import CircuitOpenError, get_circuit_breaker
+from services.http_session import get_session
+from services.metrics import record_retry, record_upstream
+from services.persistent_cache import make_key
+from services.rate_limiter import RateLimitExceeded, get_rate_limiter
+from services.retry_policy import RetryPolicy, get_retry_policy
+from services.singleflight import SingleFlight
+from services.timing import timed
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
 BASE_URL = "https://api.spoonacular.com"
 API_KEY = os.getenv("SPOONACULAR_API_KEY")
 
+# Identical concurrent searches share one upstream call
+_flight = SingleFlight("app_spoonacular_client")
+
 class SpoonacularError(Exception):
     """Raised for Spoonacular client-level errors."""
 
@@ -19,23 +31,64 @@ def _check_api_key():
     if not API_KEY:
         raise SpoonacularError("Missing SPOONACULAR_API_KEY. Set it in your .env file.")
 
-def _request_with_retry(url: str, params: Dict[str, Any], max_retries: int = 3, backoff_seconds: float = 1.0):
-    """Minimal retry with exponential backoff for transient errors."""
-    for attempt in range(1, max_retries + 1):
+@timed("spoonacular")
+def _request_with_retry(url: str, params: Dict[str, Any], policy: Optional[RetryPolicy] = None):
+    """Retry transient errors (network, 429, 5xx) under the shared retry policy."""
+    limiter = get_rate_limiter()
+    policy = policy or get_retry_policy()
+    breaker = get_circuit_breaker()
+    attempt = 0
+    while True:
+        attempt += 1
+        timeout = policy.begin_attempt(10)
+        if timeout is None:
+            raise SpoonacularError("Request deadline exceeded before Spoonacular call.")
+        if limiter is not None:
+            try:
+                limiter.acquire()
+            except RateLimitExceeded as e:
+                # Out of budget: fail fast rather than retrying into the limit
+                raise SpoonacularError(f"Rate limit exceeded: {e}") from e
+        if not breaker.allow_request():
+            # Not a SpoonacularError: routes answer this with a fast 503, not a 500
+            raise CircuitOpenError("Spoonacular is unavailable; no cached results for this query.")
+        started = time.monotonic()
         try:
-            resp = requests.get(url, params=params, timeout=10)
-            # Rate limiting commonly yields HTTP 429; treat 5xx/429 as retryable
-            if resp.status_code in (429, 500, 502, 503, 504):
-                raise SpoonacularError(f"Retryable status {resp.status_code}: {resp.text}")
-            resp.raise_for_status()
-            return resp
-        except (requests.exceptions.RequestException, SpoonacularError) as e:
-            if attempt == max_retries:
+            resp = get_session().get(url, params=params, timeout=timeout)
+        except requests.exceptions.RequestException as e:
+            elapsed = time.monotonic() - started
+            breaker.record(False, elapsed)
+            record_upstream(_flight.name, url, elapsed, None)
+            sleep_for = policy.next_delay(attempt)
+            if sleep_for is None:
                 logger.error("Spoonacular request failed after retries: %s", e)
                 raise
-            sleep_for = backoff_seconds * (2 ** (attempt - 1))
-            logger.warning("Request failed (attempt %d/%d). Retrying in %.1fs...", attempt, max_retries, sleep_for)
-            time.sleep(sleep_for)
+            logger.warning("Request failed (attempt %d). Retrying in %.1fs...", attempt, sleep_for)
+            record_retry(_flight.name, url)
+            policy.sleep(sleep_for)
+            continue
+        except BaseException:
+            # No upstream verdict; just give back a half-open trial slot
+            breaker.release()
+            raise
+
+        elapsed = time.monotonic() - started
+        breaker.record(not policy.is_retryable_status(resp.status_code), elapsed)
+        record_upstream(_flight.name, url, elapsed, resp.status_code)
+        if limiter is not None:
+            limiter.record_response(resp.status_code, resp.headers)
+        # Rate limiting commonly yields HTTP 429; treat 5xx/429 as retryable
+        if policy.is_retryable_status(resp.status_code):
+            sleep_for = policy.next_delay(attempt, resp.status_code, resp.headers.get("Retry-After"))
+            if sleep_for is None:
+                logger.error("Spoonacular request failed after retries: HTTP %d", resp.status_code)
+                raise SpoonacularError(f"Retryable status {resp.status_code}: {resp.text}")
+            logger.warning("Request failed (attempt %d). Retrying in %.1fs...", attempt, sleep_for)
+            record_retry(_flight.name, url)
+            policy.sleep(sleep_for)
+            continue
+        resp.raise_for_status()
+        return resp
 
 def search_recipes_by_ingredients(
     ingredients: List[str],
@@ -56,5 +109,4 @@ def search_recipes_by_ingredients(
         "ranking": ranking,         # 1=maximize used ingredients, 2=minimize missing
         "ignorePantry": str(ignore_pantry).lower(),
     }
-    resp = _request_with_retry(url, params)
-    return resp.json()
+    return _flight.do(make_key(url, params), lambda: _request_with_retry(url, params).json())
@@ -1,18 +1,45 @@
 # prepify/app_factory.py
+import os
+
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 
+from services import compression, json_provider, metrics, retry_policy, timing
+from services.db_engine import (
+    PROFILE_SQLITE, check_engine, engine_options, install_sqlite_pragmas, resolve_profile, sqlite_pragmas
+)
+
 db = SQLAlchemy()
 
+def init_db(app: Flask, uri: str) -> None:
+    """Bind db to app with the engine profile for uri (DB_PROFILE=sqlite|pooled, inferred when unset)."""
+    profile = resolve_profile(uri, app.config.get('DB_PROFILE') or os.getenv('DB_PROFILE'))
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=uri,
+        SQLALCHEMY_ENGINE_OPTIONS=engine_options(profile, uri),
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        DB_PROFILE=profile,
+    )
+    db.init_app(app)
+
+    pragmas = sqlite_pragmas() if profile == PROFILE_SQLITE else None
+    with app.app_context():
+        if pragmas:
+            install_sqlite_pragmas(db.engine, pragmas)
+        check_engine(db.engine, profile, pragmas)
+
 def create_app(testing: bool = False) -> Flask:
     app = Flask(__name__)
     app.config.from_mapping(
-        SQLALCHEMY_DATABASE_URI='sqlite:///:memory:' if testing else 'sqlite:///prepify.db',
-        SQLALCHEMY_TRACK_MODIFICATIONS=False,
         TESTING=testing,
         SECRET_KEY='dev',
     )
-    db.init_app(app)
+    json_provider.init_app(app)
+    compression.init_app(app)
+    retry_policy.init_app(app)
+    metrics.init_app(app)
+    timing.init_app(app)
+    init_db(app, 'sqlite:///:memory:' if testing else os.getenv('DATABASE_URL', 'sqlite:///prepify.db'))
 
     from . import models  # noqa: F401
 
@@ -0,0 +1,114 @@
+# asgi.py
+"""
+ASGI entry point for the async recipe suggestion path.
+
+    uvicorn asgi:app --workers 1
+
+One event loop holds every in-flight Spoonacular call, so a single process can
+serve hundreds of concurrent /recipes/suggest requests without tying up a
+thread per upstream call.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from dotenv import load_dotenv
+
+from services.async_spoonacular_client import AsyncSpoonacularClient
+from services.spoonacular_client import SpoonacularAPIError, SpoonacularConfigError
+
+root_env = Path(__file__).resolve().parent / ".env"
+if root_env.exists():
+    load_dotenv(root_env)
+
+
+class SuggestApp:
+    """Minimal ASGI app: GET /health and GET /recipes/suggest."""
+
+    def __init__(self, client_factory=AsyncSpoonacularClient):
+        self._client_factory = client_factory
+        self._client: Optional[AsyncSpoonacularClient] = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        path = scope["path"].rstrip("/") or "/"
+        if scope["method"] != "GET":
+            status, body = 405, {"error": "Method not allowed"}
+        elif path == "/health":
+            status, body = 200, {"status": "ok"}
+        elif path == "/recipes/suggest":
+            status, body = await self._suggest(parse_qs(scope.get("query_string", b"").decode()))
+        else:
+            status, body = 404, {"error": "Not found"}
+        await _send_json(send, status, body)
+
+    async def _suggest(self, query: Dict[str, List[str]]) -> Tuple[int, Any]:
+        """
+        ?ingredients=chicken,onion,garlic&number=5&ranking=1&ignorePantry=true
+        """
+        ingredients = (query.get("ingredients") or [""])[0]
+        if not ingredients.strip():
+            return 400, {"error": "ingredients query param required"}
+        try:
+            number = max(1, min(int((query.get("number") or ["5"])[0]), 10))
+            ranking = int((query.get("ranking") or ["1"])[0])
+        except ValueError:
+            return 400, {"error": "number and ranking must be integers"}
+        ignore_pantry = (query.get("ignorePantry") or ["true"])[0].lower() == "true"
+
+        try:
+            client = self._get_client()
+            recipes = await client.find_by_ingredients(
+                ingredients.split(","),
+                number=number,
+                ranking=ranking,
+                ignore_pantry=ignore_pantry,
+            )
+        except SpoonacularConfigError as e:
+            return 500, {"error": str(e)}
+        except SpoonacularAPIError as e:
+            return 502, {"error": str(e)}
+        return 200, {"recipes": recipes}
+
+    def _get_client(self) -> AsyncSpoonacularClient:
+        if self._client is None:
+            self._client = self._client_factory()
+        return self._client
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self._client is not None:
+                    await self._client.aclose()
+                    self._client = None
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+async def _send_json(send, status: int, body: Any) -> None:
+    payload = json.dumps(body).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode())],
+    })
+    await send({"type": "http.response.body", "body": payload})
+
+
+app = SuggestApp()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run("asgi:app", host="0.0.0.0", port=int(os.getenv("PORT", "8000")))
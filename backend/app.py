@@ -1,11 +1,22 @@
 import os
+import time
+from pathlib import Path
+
+import requests
+from dotenv import load_dotenv
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from dotenv import load_dotenv
-from pathlib import Path
 
-import requests as _requests
-requests = _requests 
+from backend.services.recipe_api import enrich_with_links, parse_fields
+from services import compression, image_proxy, json_provider, metrics, retry_policy, timing
+from services.circuit_breaker import CircuitOpenError, StaleWhileRevalidate, get_circuit_breaker, stale_headers
+from services.conditional import (
+    STALE_CACHE_CONTROL, SUGGEST_CACHE_CONTROL, is_not_modified, not_modified, set_validators, suggest_etags
+)
+from services.http_session import get_session
+from services.ingredients import canonical_query
+from services.persistent_cache import make_key
+from services.retry_policy import RetryPolicy
 
 backend_env = Path(__file__).parent / ".env"
 root_env = Path(__file__).resolve().parents[1] / ".env"
@@ -19,9 +30,18 @@ else:
 
 app = Flask(__name__)
 CORS(app)
+json_provider.init_app(app)
+compression.init_app(app)
+retry_policy.init_app(app)
+image_proxy.init_app(app)
+metrics.init_app(app)
+timing.init_app(app)
 
 API_KEY = os.getenv("SPOONACULAR_API_KEY", "")
 
+# Last good suggestion per query, served while Spoonacular's circuit is open
+_suggest_swr = StaleWhileRevalidate(get_circuit_breaker())
+
 @app.route("/env-check", methods=["GET"])
 def env_check():
     # Return whether the key exists; do not expose the key value.
@@ -36,6 +56,7 @@ def recipes_suggest():
     """
     Usage:
       GET /recipes/suggest?ingredients=chicken,tomato,rice&number=5
+      GET /recipes/suggest?ingredients=...&fields=id,title,image,sourceUrl
 
     Returns:
       A JSON list of recipe dicts:
@@ -44,10 +65,15 @@ def recipes_suggest():
         ...
       ]
     """
-    ingredients = (request.args.get("ingredients") or "").strip()
+    ingredients = canonical_query(request.args.get("ingredients") or "")
     if not ingredients:
         return jsonify({"error": "Missing required query parameter: ingredients"}), 400
 
+    try:
+        fields = parse_fields(request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     number_raw = request.args.get("number", "5")
     try:
         number = max(1, min(int(number_raw), 10))
@@ -65,28 +91,68 @@ def recipes_suggest():
         "apiKey": API_KEY,
     }
 
-    try:
-        resp = requests.get(url, params=params, timeout=15)
+    key = make_key(url, params)
+    etag_key = (key, tuple(fields or ()))
+    etag = suggest_etags.current(etag_key)
+    if etag and is_not_modified(etag):
+        return not_modified(etag, SUGGEST_CACHE_CONTROL)
+
+    @timing.timed("spoonacular")
+    def fetch():
+        breaker = _suggest_swr.breaker
+        if not breaker.allow_request():
+            raise CircuitOpenError("Spoonacular is unavailable; no cached results for this query.")
+        remaining = retry_policy.remaining_time()
+        timeout = 15 if remaining is None else max(0.1, min(15, remaining))
+        started = time.monotonic()
+        try:
+            resp = get_session().get(url, params=params, timeout=timeout)
+        except requests.RequestException:
+            elapsed = time.monotonic() - started
+            breaker.record(False, elapsed)
+            metrics.record_upstream("backend_app", url, elapsed, None)
+            raise
+        except BaseException:
+            # No upstream verdict; just give back a half-open trial slot
+            breaker.release()
+            raise
+        elapsed = time.monotonic() - started
+        breaker.record(not RetryPolicy.is_retryable_status(resp.status_code), elapsed)
+        metrics.record_upstream("backend_app", url, elapsed, resp.status_code)
         resp.raise_for_status()
-        data = resp.json()  # list of recipe dicts
+        return resp.json()  # list of recipe dicts
+
+    try:
+        data, stale_age = _suggest_swr.fetch(key, fetch)
+    except CircuitOpenError as e:
+        return jsonify({"error": str(e)}), 503
     except requests.RequestException as e:
         status = getattr(e.response, "status_code", 502)
         body = getattr(e.response, "text", str(e))
         return jsonify({"error": "Spoonacular request failed", "status": status, "details": body}), 502
 
-    # Return only fields the tests check
-    results = [
-        {
-            "id": r.get("id"),
-            "title": r.get("title"),
-            "image": r.get("image"),
-            "usedIngredientCount": r.get("usedIngredientCount"),
-            "missedIngredientCount": r.get("missedIngredientCount"),
-        }
-        for r in data
-    ]
-
-    return jsonify(results), 200
+    if fields is not None:
+        # Only sourceUrl/readyInMinutes/servings cost a recipe information lookup
+        results = enrich_with_links(data, fields=fields)
+    else:
+        # Return only fields the tests check
+        results = [
+            {
+                "id": r.get("id"),
+                "title": r.get("title"),
+                "image": r.get("image"),
+                "usedIngredientCount": r.get("usedIngredientCount"),
+                "missedIngredientCount": r.get("missedIngredientCount"),
+            }
+            for r in data
+        ]
+
+    response = jsonify(image_proxy.rewrite_images(results))
+    if stale_age is not None:
+        response.headers.update(stale_headers(stale_age))
+        response.headers["Cache-Control"] = STALE_CACHE_CONTROL
+        return response, 200
+    return set_validators(response, suggest_etags.issue(etag_key, response.get_data()), SUGGEST_CACHE_CONTROL), 200
 
 if __name__ == "__main__":
     app.run(debug=True)
@@ -2,19 +2,55 @@
 import os
 import time
 import logging
+import contextvars
 import requests
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Callable, Optional
 from urllib.parse import quote
 from dotenv import load_dotenv
 
+from services.cache import TTLCache
+from services.circuit_breaker import get_circuit_breaker
+from services.http_session import get_session
+from services.ingredients import canonical_query
+from services.metrics import record_retry, record_upstream, register_cache
+from services.persistent_cache import get_persistent_cache, make_key
+from services.rate_limiter import RateLimitExceeded, get_rate_limiter
+from services.recipe_index import get_recipe_index, local_index_max_age
+from services.recipe_scoring import Pantry, score_recipes
+from services.retry_policy import get_retry_policy
+from services.singleflight import SingleFlight
+from services.timing import timed
+
 load_dotenv()
 
 API_KEY = os.getenv("SPOONACULAR_API_KEY")
 BASE_URL = "https://api.spoonacular.com"
 TIMEOUT = 15
 
-_recipe_cache: Dict[int, Dict[str, Any]] = {}
+# Spoonacular's /informationBulk accepts a comma-separated id list; keep chunks modest
+BULK_MAX_IDS = 50
+# Upper bound on concurrent per-recipe lookups during enrichment
+ENRICH_MAX_WORKERS = int(os.getenv("SPOONACULAR_ENRICH_WORKERS", "4"))
+
+# Fields a suggest response can be projected to with ?fields=
+# Only INFO_FIELDS need /recipes/{id}/information; the rest come from findByIngredients
+INFO_FIELDS = ("sourceUrl", "readyInMinutes", "servings")
+SCORE_FIELDS = ("usedIngredientCount", "missedIngredientCount", "coverage")
+RECIPE_FIELDS = (
+    "id", "title", "image", "usedIngredients", "missedIngredients", "likes",
+) + INFO_FIELDS + SCORE_FIELDS
+
 _cache_ttl_seconds = 60 * 60 * 12  # 12 hours
+_recipe_cache = TTLCache(
+    max_entries=int(os.getenv("RECIPE_CACHE_MAX_ENTRIES", "2000")),
+    max_bytes=int(os.getenv("RECIPE_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+    ttl_seconds=_cache_ttl_seconds,
+)
+register_cache("recipe", _recipe_cache)
+
+# Identical concurrent upstream requests share one call
+_flight = SingleFlight("recipe_api")
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -24,34 +60,91 @@ class SpoonacularError(Exception):
     pass
 
 
-def _get(url: str, params: Dict[str, Any]) -> requests.Response:
-    """GET with basic retry/backoff and error handling."""
+@timed("spoonacular")
+def _get(url: str, params: Dict[str, Any], points: float = 1.0) -> requests.Response:
+    """
+    GET with basic retry/backoff and error handling.
+    `points` is the call's expected Spoonacular quota cost, charged to the shared rate limiter.
+    """
     if not API_KEY:
         raise SpoonacularError("Missing SPOONACULAR_API_KEY in environment.")
 
     # Always include API key
     params = {**params, "apiKey": API_KEY}
+    limiter = get_rate_limiter()
+    policy = get_retry_policy()
+    breaker = get_circuit_breaker()
+
+    attempt = 0
+    while True:
+        attempt += 1
+        timeout = policy.begin_attempt(TIMEOUT)
+        if timeout is None:
+            raise SpoonacularError("Request deadline exceeded before Spoonacular call.")
+        if limiter is not None:
+            try:
+                limiter.acquire(points)
+            except RateLimitExceeded as e:
+                raise SpoonacularError(f"Rate limit exceeded: {e}") from e
+        if not breaker.allow_request():
+            raise SpoonacularError("Spoonacular circuit is open; skipping upstream call.")
 
-    backoff = [0.5, 1.0, 2.0]  # simple exponential backoff
-    for i, sleep_s in enumerate(backoff + [0]):  # last attempt no sleep
+        started = time.monotonic()
         try:
-            resp = requests.get(url, params=params, timeout=TIMEOUT)
-            # Handle rate limiting (HTTP 429)
-            if resp.status_code == 429 and i < len(backoff):
-                time.sleep(sleep_s)
+            resp = get_session().get(url, params=params, timeout=timeout)
+        except requests.RequestException as e:
+            elapsed = time.monotonic() - started
+            breaker.record(False, elapsed)
+            record_upstream(_flight.name, url, elapsed, None)
+            delay = policy.next_delay(attempt)
+            if delay is None:
+                raise SpoonacularError(f"Network error: {e}") from e
+            record_retry(_flight.name, url)
+            policy.sleep(delay)
+            continue
+        except BaseException:
+            # No upstream verdict; just give back a half-open trial slot
+            breaker.release()
+            raise
+
+        elapsed = time.monotonic() - started
+        breaker.record(not policy.is_retryable_status(resp.status_code), elapsed)
+        record_upstream(_flight.name, url, elapsed, resp.status_code)
+        if limiter is not None:
+            limiter.record_response(resp.status_code, resp.headers)
+        if policy.is_retryable_status(resp.status_code):
+            delay = policy.next_delay(attempt, resp.status_code, resp.headers.get("Retry-After"))
+            if delay is not None:
+                record_retry(_flight.name, url)
+                policy.sleep(delay)
                 continue
+            if resp.status_code == 429:
+                raise SpoonacularError(f"Rate limit exceeded: HTTP 429: {resp.text}")
+
+        try:
             resp.raise_for_status()
-            return resp
         except requests.HTTPError as e:
-            # For non-429 errors, bubble up immediately
-            if resp is not None and resp.status_code != 429:
-                raise SpoonacularError(f"HTTP error {resp.status_code}: {resp.text}") from e
-            if i == len(backoff):  # final attempt failed
-                raise SpoonacularError(f"Rate limit exceeded: {e}") from e
-        except requests.RequestException as e:
-            if i == len(backoff):
-                raise SpoonacularError(f"Network error: {e}") from e
-            time.sleep(sleep_s)
+            raise SpoonacularError(f"HTTP error {resp.status_code}: {resp.text}") from e
+        return resp
+
+
+def _get_json(
+    url: str,
+    params: Dict[str, Any],
+    store: Optional[Callable[[Any], None]] = None,
+    points: float = 1.0,
+) -> Any:
+    """
+    GET and decode JSON, coalescing concurrent identical requests.
+    `store` runs once per upstream call (by the caller that made it) to fill caches.
+    """
+    def fetch():
+        data = _get(url, params, points=points).json()
+        if store is not None:
+            store(data)
+        return data
+
+    return _flight.do(make_key(url, params), fetch)
 
 
 def find_by_ingredients(ingredients: List[str], number: int = 5, ranking: int = 1) -> List[Dict[str, Any]]:
@@ -61,26 +154,65 @@ def find_by_ingredients(ingredients: List[str], number: int = 5, ranking: int =
     """
     url = f"{BASE_URL}/recipes/findByIngredients"
     params = {
-        "ingredients": ",".join(ingredients),
+        "ingredients": canonical_query(ingredients),
         "number": max(1, min(number, 10)),  # keep reasonable
         "ranking": ranking,  # 1: maximize used ingredients, 2: minimize missing ingredients
         "ignorePantry": True,
     }
-    resp = _get(url, params)
-    return resp.json()
+    index = get_recipe_index()
+    if index is not None:
+        local = index.lookup(
+            params["ingredients"], params["number"], ranking, ignore_pantry=True, max_age_seconds=local_index_max_age()
+        )
+        if local is not None:
+            return local
+
+    disk = get_persistent_cache()
+    if disk is not None:
+        cached = disk.get("recipes/findByIngredients", params)
+        if cached is not None:
+            if index is not None:
+                # Possibly written by another worker; make it searchable here too
+                index.add_find_results(cached)
+            return cached
+
+    store = (lambda data: disk.set("recipes/findByIngredients", params, data)) if disk is not None else None
+    data = _get_json(url, params, store=store)
+    if index is not None and isinstance(data, list):
+        index.add_find_results(data)
+    return data
 
 
 def _cache_get(recipe_id: int) -> Dict[str, Any] | None:
     item = _recipe_cache.get(recipe_id)
-    if not item:
-        return None
-    if time.time() - item.get("_cached_at", 0) > _cache_ttl_seconds:
-        # expired
-        _recipe_cache.pop(recipe_id, None)
+    if item:
+        return item
+    disk = get_persistent_cache()
+    if disk is None:
         return None
+    item = disk.get("recipes/information", {"id": recipe_id})
+    if item:
+        # Promote so the next lookup in this process stays in memory
+        _recipe_cache.set(recipe_id, item)
     return item
 
 
+def _cache_set(recipe_id: int, data: Dict[str, Any]) -> None:
+    _recipe_cache.set(recipe_id, data)
+    index = get_recipe_index()
+    if index is not None:
+        index.add_information(data)
+    disk = get_persistent_cache()
+    if disk is not None:
+        disk.set("recipes/information", {"id": recipe_id}, data)
+
+
+def _cache_bulk(items: List[Dict[str, Any]]) -> None:
+    for data in items or []:
+        if data.get("id") is not None:
+            _cache_set(data["id"], data)
+
+
 def recipe_information(recipe_id: int) -> Dict[str, Any]:
     """
     Get detailed info including sourceUrl.
@@ -92,50 +224,177 @@ def recipe_information(recipe_id: int) -> Dict[str, Any]:
 
     url = f"{BASE_URL}/recipes/{recipe_id}/information"
     params = {"includeNutrition": False}
-    resp = _get(url, params)
-    data = resp.json()
-    data["_cached_at"] = time.time()
-    _recipe_cache[recipe_id] = data
-    return data
+    return _get_json(url, params, store=lambda data: _cache_set(recipe_id, data))
+
+
+def recipe_information_bulk(recipe_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    Get detailed info for several recipes via /recipes/informationBulk.
+    Cached ids are served locally; only cache misses go upstream.
+    Returns a dict keyed by recipe id. Ids Spoonacular did not return are absent.
+    """
+    found: Dict[int, Dict[str, Any]] = {}
+    misses: List[int] = []
+    for rid in dict.fromkeys(recipe_ids):
+        if rid is None:
+            continue
+        cached = _cache_get(rid)
+        if cached:
+            found[rid] = cached
+        else:
+            misses.append(rid)
+
+    url = f"{BASE_URL}/recipes/informationBulk"
+    for start in range(0, len(misses), BULK_MAX_IDS):
+        chunk = misses[start:start + BULK_MAX_IDS]
+        params = {"ids": ",".join(str(rid) for rid in chunk), "includeNutrition": False}
+        # Spoonacular bills informationBulk at 1 point plus 0.5 per additional recipe
+        points = 1.0 + 0.5 * (len(chunk) - 1)
+        for data in _get_json(url, params, store=_cache_bulk, points=points) or []:
+            if data.get("id") is not None:
+                found[data["id"]] = data
+    return found
+
+
+def _information_or_empty(recipe_id: int) -> Dict[str, Any]:
+    try:
+        return recipe_information(recipe_id)
+    except SpoonacularError as e:
+        logger.warning(f"Failed to fetch info for recipe {recipe_id}: {e}")
+        return {}
+
+
+def _fetch_information(recipe_ids: List[int], max_workers: Optional[int] = None) -> Dict[int, Dict[str, Any]]:
+    """
+    Resolve recipe info for the given ids.
+    Misses are grouped into bulk calls; anything the bulk call could not
+    answer is fetched one by one on a bounded worker pool.
+    """
+    infos: Dict[int, Dict[str, Any]] = {}
+    try:
+        infos = recipe_information_bulk(recipe_ids)
+    except SpoonacularError as e:
+        logger.warning(f"Bulk info fetch failed, falling back to per-recipe calls: {e}")
+
+    remaining = [rid for rid in dict.fromkeys(recipe_ids) if rid is not None and rid not in infos]
+    if not remaining:
+        return infos
+
+    workers = max(1, min(max_workers or ENRICH_MAX_WORKERS, len(remaining)))
+    if workers == 1:
+        for rid in remaining:
+            infos[rid] = _information_or_empty(rid)
+        return infos
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Each task runs in a copy of the caller's context so the request deadline carries over
+        futures = [
+            pool.submit(contextvars.copy_context().run, _information_or_empty, rid)
+            for rid in remaining
+        ]
+        for rid, future in zip(remaining, futures):
+            infos[rid] = future.result()
+    return infos
 
 
 def slugify_title(title: str) -> str:
     return quote(title.lower().replace(" ", "-"))
 
 
-def enrich_with_links(recipes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def parse_fields(raw: Optional[str]) -> Optional[List[str]]:
+    """
+    ?fields=id,title,image -> ["id", "title", "image"]; None when absent or empty.
+    Raises ValueError naming any field not in RECIPE_FIELDS.
+    """
+    if not raw:
+        return None
+    fields = list(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+    unknown = [f for f in fields if f not in RECIPE_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(RECIPE_FIELDS)}")
+    return fields or None
+
+
+def needs_information(fields: Optional[List[str]], pantry: Optional[Pantry] = None) -> bool:
+    """Whether a response with these fields needs the per-recipe information lookup."""
+    if fields is None:
+        return True
+    if any(f in INFO_FIELDS for f in fields):
+        return True
+    # Pantry scoring reads each recipe's full ingredient list from its information
+    return pantry is not None and any(f in SCORE_FIELDS for f in fields)
+
+
+@timed("enrich")
+def enrich_with_links(
+    recipes: List[Dict[str, Any]],
+    max_workers: Optional[int] = None,
+    pantry: Optional[Pantry] = None,
+    fields: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
     """
     For each recipe stub, attach a 'sourceUrl' (preferred) or a Spoonacular web URL fallback.
     Also normalize fields for frontend.
+    Recipe info is fetched in bulk; max_workers caps concurrent per-recipe fallbacks.
+    With a pantry, used/missed counts and coverage are scored in one batch against
+    each recipe's full ingredient list.
+    With fields, each item is trimmed to those keys, and the information lookup
+    is skipped entirely when none of INFO_FIELDS (or pantry scores) is requested.
     """
-    enriched = []
-    for r in recipes:
-        rid = r.get("id")
-        info = {}
-        try:
-            info = recipe_information(rid)
-        except SpoonacularError as e:
-            logger.warning(f"Failed to fetch info for recipe {rid}: {e}")
-
-        source_url = info.get("sourceUrl")
-        if not source_url:
-            # Fallback to spoonacular recipe page
-            source_url = f"https://spoonacular.com/recipes/{slugify_title(r.get('title','recipe'))}-{rid}"
-
-        enriched.append({
-            "id": rid,
-            "title": r.get("title"),
-            "image": r.get("image"),
-            "sourceUrl": source_url,
-            "readyInMinutes": info.get("readyInMinutes"),
-            "servings": info.get("servings"),
-            "usedIngredients": [i.get("name") for i in r.get("usedIngredients", [])],
-            "missedIngredients": [i.get("name") for i in r.get("missedIngredients", [])],
-            "likes": r.get("likes"),
-        })
-    return enriched
-
-
-def get_recipes_with_links(ingredients: List[str], number: int = 5, ranking: int = 1) -> List[Dict[str, Any]]:
+    if not needs_information(fields, pantry):
+        return [_project(_normalize(r, {}), r, fields) for r in recipes]
+
+    infos = _fetch_information([r.get("id") for r in recipes], max_workers=max_workers)
+
+    enriched = [_normalize(r, infos.get(r.get("id")) or {}) for r in recipes]
+
+    if pantry is not None:
+        scored = score_recipes(
+            [{**r, "extendedIngredients": (infos.get(r.get("id")) or {}).get("extendedIngredients")} for r in recipes],
+            pantry,
+            ignore_pantry=True,
+        )
+        for item, score in zip(enriched, scored):
+            for field in ("usedIngredientCount", "missedIngredientCount", "coverage"):
+                if field in score:
+                    item[field] = score[field]
+    if fields is None:
+        return enriched
+    return [_project(item, r, fields) for item, r in zip(enriched, recipes)]
+
+
+def _normalize(r: Dict[str, Any], info: Dict[str, Any]) -> Dict[str, Any]:
+    rid = r.get("id")
+    source_url = info.get("sourceUrl")
+    if not source_url:
+        # Fallback to spoonacular recipe page
+        source_url = f"https://spoonacular.com/recipes/{slugify_title(r.get('title','recipe'))}-{rid}"
+    return {
+        "id": rid,
+        "title": r.get("title"),
+        "image": r.get("image"),
+        "sourceUrl": source_url,
+        "readyInMinutes": info.get("readyInMinutes"),
+        "servings": info.get("servings"),
+        "usedIngredients": [i.get("name") for i in r.get("usedIngredients", [])],
+        "missedIngredients": [i.get("name") for i in r.get("missedIngredients", [])],
+        "likes": r.get("likes"),
+    }
+
+
+def _project(item: Dict[str, Any], stub: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    if fields is None:
+        return item
+    # Counts not rescored against a pantry come straight from findByIngredients
+    return {f: item[f] if f in item else stub.get(f) for f in fields}
+
+
+def get_recipes_with_links(
+    ingredients: List[str],
+    number: int = 5,
+    ranking: int = 1,
+    max_workers: Optional[int] = None,
+    fields: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
     stubs = find_by_ingredients(ingredients, number=number, ranking=ranking)
-    return enrich_with_links(stubs)
+    return enrich_with_links(stubs, max_workers=max_workers, fields=fields)
@@ -1,57 +1,111 @@
 # services/weekly_menu.py
-from typing import List, Dict, Any
+from collections import deque
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+from services.recipe_scoring import Pantry, score_recipes
+from services.timing import timed
+
+DAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+# How many of the most recent days must not share a primary ingredient
+DEFAULT_DIVERSITY_WINDOW = 3
+
 
 def primary_ingredient(recipe: Dict[str, Any]) -> str:
     used = recipe.get("usedIngredients") or []
     missed = recipe.get("missedIngredients") or []
-    if used:
-        return used[0].lower()
-    if missed:
-        return missed[0].lower()
-    return ""
-
-def generate_weekly_menu(recipes: List[Dict[str, Any]], days: int = 7) -> List[Dict[str, Any]]:
-    if not recipes:
+    first = used[0] if used else (missed[0] if missed else "")
+    if isinstance(first, dict):
+        first = first.get("name") or ""
+    return first.lower()
+
+
+@timed("menu")
+def generate_weekly_menu(
+    recipes: List[Dict[str, Any]],
+    days: int = 7,
+    pantry: Optional[Pantry] = None,
+    diversity_window: int = DEFAULT_DIVERSITY_WINDOW,
+    allow_repeats: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Spread recipes over `days`, rotating between primary-ingredient buckets so
+    that no primary repeats within `diversity_window` consecutive days.
+
+    Buckets sit in a deque in first-seen order; the front bucket that is not
+    blocked by the window serves its next unused recipe and moves to the back.
+    When every remaining bucket is blocked, the least recently served one is
+    used anyway rather than cutting the menu short. With allow_repeats, long
+    horizons (e.g. 28 days) cycle through the pool again once it is exhausted;
+    otherwise the menu stops at the number of distinct recipes.
+    Runs in O(n + days * diversity_window), plus O(n log n) for pantry ordering.
+
+    Menus match the original index-based rotation until a bucket runs dry or
+    is blocked by the window. The original dropped such a bucket, even a
+    blocked one, and the list.remove() index shift also passed over the bucket
+    after it. Here an empty bucket drops out without taking a turn, so an id
+    shared by two buckets can reorder the menu: 13(b), 13(d), 4(a), 7(c) used
+    to give [13, 7, 4] and now gives [13, 4, 7].
+    """
+    if not recipes or days <= 0:
         return []
-    selected = []
-    recent_primary: List[str] = []
-    by_primary: Dict[str, List[Dict[str, Any]]] = {}
+    if pantry is not None:
+        # Prefer what the pantry already covers; scored in one batch, stable for ties
+        coverage = {r.get("id"): r.get("coverage", 0.0) for r in score_recipes(recipes, pantry, ignore_pantry=True)}
+        recipes = sorted(recipes, key=lambda r: -coverage.get(r.get("id"), 0.0))
+
+    unique_ids = {r.get("id") for r in recipes}
+    target = days if allow_repeats else min(days, len(unique_ids))
 
+    selected: List[Dict[str, Any]] = []
+    recent: deque = deque(maxlen=max(0, diversity_window))
+    while len(selected) < target:
+        before = len(selected)
+        _fill(_buckets(recipes), selected, recent, target)
+        if len(selected) == before:
+            break
+
+    return [
+        {"dayIndex": i, "dayName": DAY_NAMES[i % 7], "recipe": r}
+        for i, r in enumerate(selected)
+    ]
+
+
+def _buckets(recipes: List[Dict[str, Any]]) -> deque:
+    by_primary: Dict[str, deque] = {}
     for r in recipes:
-        p = primary_ingredient(r)
-        by_primary.setdefault(p, []).append(r)
+        by_primary.setdefault(primary_ingredient(r), deque()).append(r)
+    return deque(by_primary.items())
 
-    primaries = list(by_primary.keys())
-    idx = 0
 
-    while len(selected) < min(days, len(set([r["id"] for r in recipes]))):
-        if not primaries:
-            break
-        p = primaries[idx % len(primaries)]
-        bucket = by_primary.get(p, [])
+def _fill(buckets: deque, selected: List[Dict[str, Any]], recent: deque, target: int) -> None:
+    """One pass over the pool: every recipe id is used at most once."""
+    used_ids: Set[Any] = set()
+    while buckets and len(selected) < target:
+        blocked: List[Tuple[str, deque]] = []
         chosen = None
-        for r in bucket:
-            if any(r["id"] == sr["id"] for sr in selected):
-                continue
-            if p and p in recent_primary[-3:]:
+        while buckets:
+            primary, bucket = buckets.popleft()
+            while bucket and bucket[0].get("id") in used_ids:
+                bucket.popleft()
+            if not bucket:
+                continue  # exhausted buckets drop out for good
+            if primary and primary in recent:
+                blocked.append((primary, bucket))
                 continue
-            chosen = r
+            chosen = (primary, bucket)
             break
-        if chosen:
-            selected.append(chosen)
-            recent_primary.append(p)
-        else:
-            primaries.remove(p)
-        idx += 1
-        if idx > 1000:
-            break
-
-    day_names = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-    menu = []
-    for i, r in enumerate(selected[:days]):
-        menu.append({
-            "dayIndex": i,
-            "dayName": day_names[i % 7],
-            "recipe": r
-        })
-    return menu
+        if chosen is None:
+            if not blocked:
+                return
+            # Everything left is inside the window: relax it for the longest-waiting bucket
+            chosen = blocked.pop(0)
+        # Blocked buckets keep their place ahead of the one just served
+        buckets.extendleft(reversed(blocked))
+        primary, bucket = chosen
+        recipe = bucket.popleft()
+        used_ids.add(recipe.get("id"))
+        selected.append(recipe)
+        recent.append(primary)
+        if bucket:
+            buckets.append((primary, bucket))
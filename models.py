@@ -1,4 +1,9 @@
 # prepify/models.py
+from sqlalchemy import event
+
+from services.pantry_revision import track_revisions
+from services.pantry_search import install_search_index
+from services.pantry_suggestions import DB_PANTRY_ID, pantry_versions
 from . import db
 
 class PantryItem(db.Model):
@@ -11,5 +16,27 @@ class PantryItem(db.Model):
     quantity = db.Column(db.String(50), nullable=True, default='')
     category = db.Column(db.String(50), nullable=True, default='')
 
+    # Category browse/autocomplete: WHERE category = ? ORDER BY name is a pure index scan
+    __table_args__ = (db.Index('ix_pantry_items_category_name', 'category', 'name'),)
+
     def __repr__(self) -> str:
         return f"<PantryItem id={self.id} name={self.name!r}>"
+
+
+# pantry_items_revision: the DB-backed revision behind pantry ETags, shared by every worker
+track_revisions(PantryItem)
+
+
+@event.listens_for(PantryItem, 'after_insert')
+@event.listens_for(PantryItem, 'after_update')
+@event.listens_for(PantryItem, 'after_delete')
+def _bump_pantry_version(mapper, connection, target):
+    # Any row change invalidates the table pantry's cached suggestions.
+    # Bulk Query.update()/delete() skip these hooks; bump pantry_versions by hand there.
+    pantry_versions.bump(DB_PANTRY_ID)
+
+
+@event.listens_for(PantryItem.__table__, 'after_create')
+def _create_search_index(table, connection, **kw):
+    # FTS5 shadow table + sync triggers for /pantry/search (no-op outside SQLite)
+    install_search_index(connection, PantryItem)
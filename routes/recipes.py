@@ -1,8 +1,17 @@
-from flask import Blueprint, request, render_template
+from flask import Blueprint, request, render_template, make_response
 from services.spoonacular_client import find_by_ingredients, SpoonacularClientError
+from services.circuit_breaker import StaleWhileRevalidate, get_circuit_breaker, stale_headers
+from services.conditional import (
+    STALE_CACHE_CONTROL, SUGGEST_CACHE_CONTROL, is_not_modified, not_modified, set_validators, suggest_etags
+)
+from services.ingredients import canonicalize_ingredients
+from services.persistent_cache import make_key
 
 recipes_bp = Blueprint("recipes", __name__, url_prefix="/recipes")
 
+# Last good result per query, served while Spoonacular's circuit is open
+_suggest_swr = StaleWhileRevalidate(get_circuit_breaker())
+
 @recipes_bp.route("/suggest", methods=["GET", "POST"])
 def suggest():
     # Accept "ingredients" as comma-separated text
@@ -12,14 +21,30 @@ def suggest():
     else:
         ing_raw = (request.args.get("ingredients") or "").strip()
 
-    ingredients = [i.strip() for i in ing_raw.split(",") if i.strip()]
+    ingredients = canonicalize_ingredients(ing_raw)
 
     if not ingredients:
         return render_template("recipes.html", recipes=[], error="Provide ingredients (comma-separated).")
 
+    key = make_key("recipes/suggest", {"ingredients": ",".join(ingredients)})
+    # Only GETs are conditional; a POST always renders
+    etag = suggest_etags.current(key) if request.method == "GET" else None
+    if etag and is_not_modified(etag):
+        return not_modified(etag, SUGGEST_CACHE_CONTROL)
+
     try:
-        recipes = find_by_ingredients(ingredients, number=5, ranking=1, ignore_pantry=True)
+        recipes, stale_age = _suggest_swr.fetch(
+            key,
+            lambda: find_by_ingredients(ingredients, number=5, ranking=1, ignore_pantry=True),
+        )
     except SpoonacularClientError as e:
         return render_template("recipes.html", recipes=[], error=str(e)), 502
 
-    return render_template("recipes.html", recipes=recipes, error=None)
+    response = make_response(render_template("recipes.html", recipes=recipes, error=None))
+    if stale_age is not None:
+        response.headers.update(stale_headers(stale_age))
+        response.headers["Cache-Control"] = STALE_CACHE_CONTROL
+        return response
+    if request.method == "GET":
+        set_validators(response, suggest_etags.issue(key, response.get_data()), SUGGEST_CACHE_CONTROL)
+    return response
@@ -0,0 +1,87 @@
+"""
+Serialization and wire-size benchmark for recipe payloads.
+
+  python scripts/bench_json.py
+  python scripts/bench_json.py --sizes 10 100 1000 10000 --repeat 200
+
+Builds lists shaped like enrich_with_links() output and compares, per list
+size, the stock Flask provider (stdlib json, sorted keys) against
+FastJSONProvider, plus the bytes on the wire uncompressed, gzipped and (when
+the brotli module is installed) brotli-encoded at the levels the app uses.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+from services import compression  # noqa: E402
+from services.json_provider import FastJSONProvider, orjson  # noqa: E402
+
+WORDS = "chicken tomato rice garlic onion basil lemon pepper olive oil pasta beans cheese spinach".split()
+
+
+def synthetic_recipes(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    recipes = []
+    for i in range(n):
+        rid = 600000 + i
+        title = " ".join(rng.sample(WORDS, 3)).title()
+        recipes.append({
+            "id": rid,
+            "title": title,
+            "image": f"https://img.spoonacular.com/recipes/{rid}-312x231.jpg",
+            "sourceUrl": f"https://www.example-food-blog.com/{title.lower().replace(' ', '-')}-{rid}",
+            "readyInMinutes": rng.choice([15, 20, 30, 45, 60]),
+            "servings": rng.randint(1, 8),
+            "usedIngredients": rng.sample(WORDS, rng.randint(1, 5)),
+            "missedIngredients": rng.sample(WORDS, rng.randint(0, 6)),
+            "likes": rng.randint(0, 5000),
+            "usedIngredientCount": rng.randint(1, 5),
+            "missedIngredientCount": rng.randint(0, 6),
+            "coverage": round(rng.random(), 4),
+        })
+    return recipes
+
+
+def time_per_call(fn, repeat: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=300)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    stock, fast = DefaultJSONProvider(app), FastJSONProvider(app)
+    print(f"orjson: {'yes' if orjson else 'no (stdlib fallback)'}   brotli: {'yes' if compression.brotli else 'no'}")
+    print(f"{'recipes':>8} {'stdlib ms':>10} {'fast ms':>9} {'speedup':>8} {'raw B':>9} {'gzip B':>8} {'br B':>8} {'gzip ms':>8}")
+    with app.app_context():
+        for n in args.sizes:
+            recipes = synthetic_recipes(n)
+            repeat = max(5, args.repeat * 100 // max(n, 100))
+            t_stock = time_per_call(lambda: stock.response(recipes), repeat)
+            t_fast = time_per_call(lambda: fast.response(recipes), repeat)
+            body = fast.response(recipes).get_data()
+            gz = compression._compress_bytes(body, "gzip")
+            t_gzip = time_per_call(lambda: compression._compress_bytes(body, "gzip"), repeat)
+            br = len(compression._compress_bytes(body, "br")) if compression.brotli else "-"
+            print(
+                f"{n:>8} {t_stock * 1000:>10.3f} {t_fast * 1000:>9.3f} {t_stock / t_fast:>7.1f}x "
+                f"{len(body):>9} {len(gz):>8} {br:>8} {t_gzip * 1000:>8.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Throughput benchmark for the recipe x ingredient scoring matrix.
+
+  python scripts/bench_recipe_scoring.py                      # 100k recipes, best backend available
+  python scripts/bench_recipe_scoring.py --recipes 20000 --pantries 500 --backend python
+
+Builds a synthetic corpus (Zipf-like ingredient popularity, 5-15 ingredients
+per recipe) and reports build time, single-pantry latency, batch throughput
+and peak RSS. The batch is streamed through iter_scores(), so peak RSS should
+not grow with --pantries.
+"""
+import argparse
+import itertools
+import os
+import random
+import resource
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.recipe_scoring import ScoringMatrix, sparse  # noqa: E402
+
+
+def synthetic_corpus(n_recipes: int, vocab_size: int, seed: int):
+    rng = random.Random(seed)
+    vocab = [f"ingredient{i}" for i in range(vocab_size)]
+    # Popular ingredients (salt, onion, garlic...) appear far more often than rare ones
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(vocab_size)))
+    return [(rid, set(rng.choices(vocab, cum_weights=cum_weights, k=rng.randint(5, 15)))) for rid in range(n_recipes)]
+
+
+def synthetic_pantries(n_pantries: int, vocab_size: int, seed: int):
+    rng = random.Random(seed + 1)
+    vocab = [f"ingredient{i}" for i in range(vocab_size)]
+    return [rng.sample(vocab[: vocab_size // 4], rng.randint(5, 30)) for _ in range(n_pantries)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark recipe scoring throughput.")
+    parser.add_argument("--recipes", type=int, default=100_000)
+    parser.add_argument("--vocab", type=int, default=2_000)
+    parser.add_argument("--pantries", type=int, default=1_000)
+    parser.add_argument("--backend", choices=["sparse", "python"], default=None)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    backend = args.backend or ("sparse" if sparse is not None else "python")
+    print(f"backend={backend} recipes={args.recipes} vocab={args.vocab} pantries={args.pantries}")
+
+    corpus = synthetic_corpus(args.recipes, args.vocab, args.seed)
+    started = time.perf_counter()
+    matrix = ScoringMatrix(corpus, backend=backend)
+    print(f"build: {time.perf_counter() - started:.2f}s")
+
+    pantries = synthetic_pantries(args.pantries, args.vocab, args.seed)
+
+    started = time.perf_counter()
+    for pantry in pantries[:20]:
+        matrix.score(pantry)
+    single = (time.perf_counter() - started) / min(20, len(pantries))
+    print(f"score (1 pantry): {single * 1000:.1f} ms  -> {args.recipes / single:,.0f} recipe scores/s")
+
+    started = time.perf_counter()
+    matrix.rank(pantries[0], number=10)
+    print(f"rank top-10: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    started = time.perf_counter()
+    for _ in matrix.iter_scores(pantries):
+        pass
+    batch = time.perf_counter() - started
+    print(
+        f"iter_scores ({len(pantries)} pantries): {batch:.2f}s  -> "
+        f"{len(pantries) * args.recipes / batch:,.0f} recipe scores/s"
+    )
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"peak RSS: {peak / (1024 * 1024 if sys.platform == 'darwin' else 1024):,.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Scaling benchmark for backend/services/weekly_menu.generate_weekly_menu.
+
+  python scripts/bench_weekly_menu.py
+  python scripts/bench_weekly_menu.py --sizes 10 1000 100000 --days 7 28 --primaries 50
+
+Candidates get primary ingredients drawn from a skewed distribution, so a few
+buckets are large and many are small, like real suggestion pools.
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.services.weekly_menu import generate_weekly_menu  # noqa: E402
+
+
+def candidates(n: int, n_primaries: int, seed: int):
+    rng = random.Random(seed)
+    primaries = [f"ingredient{i}" for i in range(n_primaries)]
+    cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(n_primaries)))
+    return [
+        {"id": i, "usedIngredients": rng.choices(primaries, cum_weights=cum_weights, k=1), "missedIngredients": []}
+        for i in range(n)
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark weekly menu generation.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1_000, 10_000, 100_000])
+    parser.add_argument("--days", type=int, nargs="+", default=[7, 28, 365])
+    parser.add_argument("--primaries", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'candidates':>10} {'days':>5} {'menu':>5} {'best ms':>9}")
+    for n in args.sizes:
+        pool = candidates(n, args.primaries, seed=n)
+        for days in args.days:
+            best = float("inf")
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                menu = generate_weekly_menu(pool, days=days)
+                best = min(best, time.perf_counter() - started)
+            print(f"{n:>10} {days:>5} {len(menu):>5} {best * 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Inspect and maintain the persistent Spoonacular response cache.
+
+  python scripts/spoonacular_cache.py stats
+  python scripts/spoonacular_cache.py list --endpoint recipes/findByIngredients --limit 20
+  python scripts/spoonacular_cache.py purge [--endpoint ...] [--all]
+  python scripts/spoonacular_cache.py vacuum
+"""
+import argparse
+import os
+import sys
+import time
+
+from dotenv import load_dotenv
+load_dotenv()
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.persistent_cache import SQLiteCache  # noqa: E402
+
+
+def _fmt_ts(ts: float) -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the persistent Spoonacular cache.")
+    parser.add_argument("--path", default=os.getenv("SPOONACULAR_CACHE_PATH"), help="SQLite cache file")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("stats", help="Entry counts and sizes per endpoint")
+
+    list_p = sub.add_parser("list", help="Most recently stored entries")
+    list_p.add_argument("--endpoint")
+    list_p.add_argument("--limit", type=int, default=50)
+
+    purge_p = sub.add_parser("purge", help="Delete expired entries (or everything with --all)")
+    purge_p.add_argument("--endpoint")
+    purge_p.add_argument("--all", action="store_true", help="Also delete entries that are still fresh")
+
+    sub.add_parser("vacuum", help="Checkpoint the WAL and compact the database file")
+
+    args = parser.parse_args(argv)
+    cache = SQLiteCache(args.path or None)
+    print(f"Cache file: {cache.path}")
+
+    if args.command == "stats":
+        rows = cache.stats()
+        if not rows:
+            print("Cache is empty.")
+        for row in rows:
+            print(f"{row['endpoint']}: {row['entries']} entries ({row['expired']} expired), {row['bytes']} bytes")
+    elif args.command == "list":
+        for entry in cache.entries(endpoint=args.endpoint, limit=args.limit):
+            print(f"{_fmt_ts(entry['created_at'])}  expires {_fmt_ts(entry['expires_at'])}  "
+                  f"{entry['bytes']:>8}B  {entry['key']}")
+    elif args.command == "purge":
+        removed = cache.purge(endpoint=args.endpoint, expired_only=not args.all)
+        print(f"Removed {removed} entries.")
+    elif args.command == "vacuum":
+        cache.vacuum()
+        print("Vacuum complete.")
+
+
+if __name__ == "__main__":
+    main()
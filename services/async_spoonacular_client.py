@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+try:
+    import httpx
+except ImportError:  # optional dependency: pip install httpx
+    httpx = None
+
+from services.circuit_breaker import CircuitBreaker, get_circuit_breaker
+from services.ingredients import canonicalize_ingredients
+from services.metrics import record_retry, record_upstream
+from services.rate_limiter import RateLimiter, RateLimitExceeded, get_rate_limiter
+from services.retry_policy import RetryPolicy, get_retry_policy
+from services.spoonacular_client import (
+    DEFAULT_BASE_URL,
+    FIND_BY_INGREDIENTS_PATH,
+    SpoonacularAPIError,
+    SpoonacularConfigError,
+    _extract_error_message,
+    _normalize_recipe,
+    _safe_json,
+)
+from services.timing import span, timed
+
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("SPOONACULAR_ASYNC_MAX_CONCURRENCY", "200"))
+# Client label on upstream metrics
+METRICS_CLIENT = "async_spoonacular_client"
+
+
+class AsyncSpoonacularClient:
+    """
+    asyncio counterpart of SpoonacularClient.
+
+    Same find_by_ingredients surface, error types and retry semantics, but
+    backoff sleeps yield to the event loop, connections come from one shared
+    httpx pool, and a semaphore caps concurrent upstream calls (the pool
+    defaults to one connection per slot). Calls go through the same
+    RateLimiter as the sync client; its blocking acquire() and record_response()
+    run in a worker thread so limiter state never stalls the loop.
+    Use as `async with AsyncSpoonacularClient() as client:` or call aclose().
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        timeout_seconds: float = 10.0,
+        max_retries: int = 3,
+        backoff_seconds: float = 1.0,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: int = 20,
+        transport: Optional[Any] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        if httpx is None:
+            raise SpoonacularConfigError("AsyncSpoonacularClient requires httpx (pip install httpx).")
+
+        self.api_key = api_key or os.getenv("SPOONACULAR_API_KEY")
+        self.base_url = base_url or DEFAULT_BASE_URL
+        self.timeout_seconds = timeout_seconds
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        if retry_policy is None and (max_retries, backoff_seconds) != (3, 1.0):
+            retry_policy = RetryPolicy(max_attempts=max_retries, base_delay=backoff_seconds)
+        self.retry_policy = retry_policy or get_retry_policy()
+        self.circuit_breaker = circuit_breaker or get_circuit_breaker()
+        self.rate_limiter = rate_limiter if rate_limiter is not None else get_rate_limiter()
+
+        if not self.api_key:
+            raise SpoonacularConfigError(
+                "SPOONACULAR_API_KEY is missing. Set it in .env or pass explicitly to AsyncSpoonacularClient(api_key=...)."
+            )
+        if not isinstance(self.base_url, str) or not self.base_url.startswith("https://"):
+            raise SpoonacularConfigError("Invalid base URL. Must start with 'https://'.")
+
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client = httpx.AsyncClient(
+            timeout=timeout_seconds,
+            limits=httpx.Limits(
+                # One connection per admitted call by default, so none of them queue again on the pool
+                max_connections=max_connections or max_concurrency,
+                max_keepalive_connections=max_keepalive_connections,
+            ),
+            transport=transport,
+        )
+
+    async def __aenter__(self) -> "AsyncSpoonacularClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def find_by_ingredients(
+        self,
+        ingredients: List[str],
+        number: int = 5,
+        ranking: int = 1,
+        ignore_pantry: bool = False,
+    ) -> List[Dict[str, Any]]:
+        # Calls Spoonacular /recipes/findByIngredients and normalizes results.
+        ingredients = canonicalize_ingredients(ingredients)
+        if not ingredients:
+            return []
+
+        params = {
+            "ingredients": ",".join(ingredients),
+            "number": number,
+            "ranking": ranking,
+            "ignorePantry": str(ignore_pantry).lower(),
+            "apiKey": self.api_key,
+        }
+
+        raw = await self._get(FIND_BY_INGREDIENTS_PATH, params=params)
+        return [_normalize_recipe(item) for item in raw]
+
+    # ---------- Internal Helpers ----------
+
+    def _build_url(self, path: str) -> str:
+        """Safe join without double slashes."""
+        return f"{self.base_url.rstrip('/')}/{path.lstrip('/')}"
+
+    @timed("spoonacular")
+    async def _get(self, path: str, params: Optional[dict] = None) -> Any:
+        """
+        GET with the same retry rules as SpoonacularClient._request.
+        The semaphore is held only while a request is on the wire, not while backing off.
+        """
+        url = self._build_url(path)
+        policy = self.retry_policy
+
+        attempt = 0
+        while True:
+            attempt += 1
+            timeout = policy.begin_attempt(self.timeout_seconds)
+            if timeout is None:
+                raise SpoonacularAPIError(-1, "Request deadline exceeded before Spoonacular call.")
+            if self.rate_limiter is not None:
+                try:
+                    await asyncio.to_thread(self.rate_limiter.acquire)
+                except RateLimitExceeded as e:
+                    raise SpoonacularAPIError(
+                        429,
+                        f"Local rate limit: {e}",
+                        payload={"retry_after": e.retry_after},
+                    ) from e
+            if not self.circuit_breaker.allow_request():
+                raise SpoonacularAPIError(503, "Spoonacular circuit is open; skipping upstream call.")
+            try:
+                async with self._semaphore:
+                    # Time the call, not the wait for a slot: queueing must not look like a slow upstream
+                    started = time.monotonic()
+                    response = await self._client.get(url, params=params, timeout=timeout)
+                    elapsed = time.monotonic() - started
+            except httpx.HTTPError as e:
+                elapsed = time.monotonic() - started
+                self.circuit_breaker.record(False, elapsed)
+                record_upstream(METRICS_CLIENT, path, elapsed, None)
+                # Network errors/timeouts: backoff then retry
+                delay = policy.next_delay(attempt)
+                if delay is not None:
+                    record_retry(METRICS_CLIENT, path)
+                    with span("spoonacular_wait"):
+                        await asyncio.sleep(delay)
+                    continue
+
+                raise SpoonacularAPIError(
+                    -1,
+                    f"Request failed: {e.__class__.__name__}: {str(e)}",
+                    payload={"url": url, "params": {k: v for k, v in (params or {}).items() if k != "apiKey"}},
+                ) from e
+            except BaseException:
+                # No upstream verdict (including cancellation); just give back a half-open trial slot
+                self.circuit_breaker.release()
+                raise
+
+            self.circuit_breaker.record(not policy.is_retryable_status(response.status_code), elapsed)
+            record_upstream(METRICS_CLIENT, path, elapsed, response.status_code)
+            if self.rate_limiter is not None:
+                # May write the shared SQLite state; keep that off the event loop
+                await asyncio.to_thread(self.rate_limiter.record_response, response.status_code, response.headers)
+
+            # --- 2xx success ---
+            if 200 <= response.status_code < 300:
+                try:
+                    return response.json()
+                except ValueError:
+                    return response.text
+
+            # --- 429 / 5xx: retry under the shared policy, without blocking the loop ---
+            if policy.is_retryable_status(response.status_code):
+                delay = policy.next_delay(attempt, response.status_code, response.headers.get("Retry-After"))
+                if delay is not None:
+                    record_retry(METRICS_CLIENT, path)
+                    with span("spoonacular_wait"):
+                        await asyncio.sleep(delay)
+                    continue
+
+                if response.status_code == 429:
+                    raise SpoonacularAPIError(
+                        response.status_code,
+                        "Rate limited by Spoonacular (429). Retries exhausted.",
+                        payload=_safe_json(response),
+                    )
+                raise SpoonacularAPIError(
+                    response.status_code,
+                    f"Server error from Spoonacular ({response.status_code}). "
+                    "Retries exhausted.",
+                    payload=_safe_json(response),
+                )
+
+            # --- Other non-success (4xx not 429, or unusual status) ---
+            raise SpoonacularAPIError(
+                response.status_code,
+                _extract_error_message(response),
+                payload=_safe_json(response),
+            )
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import heapq
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+_MISSING = object()
+
+
+def approx_size(value: Any) -> int:
+    """Rough byte size of a JSON-like payload (what it would cost on the wire)."""
+    try:
+        return len(json.dumps(value, default=str, separators=(",", ":")))
+    except (TypeError, ValueError):
+        return len(repr(value))
+
+
+class TTLCache:
+    """
+    Thread-safe in-process cache with LRU eviction and per-entry TTL.
+
+    - max_entries / max_bytes bound the cache; least recently used entries go first.
+    - Expired entries are dropped when read and by periodic sweeps driven by
+      an expiry heap, so idle keys do not linger until they are read again.
+    - Bookkeeping (expiry, size) lives beside the value; payloads are returned untouched.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        sweep_interval_seconds: float = 60.0,
+        sizeof: Callable[[Any], int] = approx_size,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive.")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._sizeof = sizeof
+        self._clock = clock
+
+        self._lock = threading.RLock()
+        # key -> (value, expires_at or None, size)
+        self._data: "OrderedDict[Hashable, Tuple[Any, Optional[float], int]]" = OrderedDict()
+        self._expiry_heap: List[Tuple[float, int, Hashable]] = []
+        self._heap_seq = 0
+        self._bytes = 0
+        self._next_sweep = clock() + sweep_interval_seconds
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    # ---------- Public API ----------
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            now = self._clock()
+            self._maybe_sweep(now)
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at, _ = entry
+            if expires_at is not None and expires_at <= now:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        size = self._sizeof(value) if self.max_bytes is not None else 0
+        with self._lock:
+            now = self._clock()
+            if key in self._data:
+                self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                # Would evict everything else and still not fit
+                return
+            expires_at = now + ttl if ttl is not None else None
+            self._data[key] = (value, expires_at, size)
+            self._bytes += size
+            if expires_at is not None:
+                self._heap_seq += 1
+                heapq.heappush(self._expiry_heap, (expires_at, self._heap_seq, key))
+            self._maybe_sweep(now)
+            self._evict()
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key not in self._data:
+                return default
+            return self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._expiry_heap.clear()
+            self._bytes = 0
+
+    def sweep(self) -> int:
+        """Drop every expired entry now. Returns how many were removed."""
+        with self._lock:
+            return self._sweep(self._clock())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return False
+            expires_at = entry[1]
+            return expires_at is None or expires_at > self._clock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    # ---------- Internal Helpers ----------
+
+    def _remove(self, key: Hashable) -> Any:
+        value, _, size = self._data.pop(key)
+        self._bytes -= size
+        return value
+
+    def _evict(self) -> None:
+        while len(self._data) > self.max_entries or (
+            self.max_bytes is not None and self._bytes > self.max_bytes
+        ):
+            key = next(iter(self._data))
+            self._remove(key)
+            self.evictions += 1
+
+    def _maybe_sweep(self, now: float) -> None:
+        if now >= self._next_sweep:
+            self._sweep(now)
+
+    def _sweep(self, now: float) -> int:
+        removed = 0
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, _, key = heapq.heappop(heap)
+            entry = self._data.get(key, _MISSING)
+            # Skip heap records left behind by overwritten or evicted keys
+            if entry is _MISSING or entry[1] != expires_at:
+                continue
+            self._remove(key)
+            removed += 1
+        # Heap records for keys removed early accumulate; rebuild when they dominate
+        if len(heap) > 2 * len(self._data) + 64:
+            self._expiry_heap = [rec for rec in heap if rec[2] in self._data and self._data[rec[2]][1] == rec[0]]
+            heapq.heapify(self._expiry_heap)
+        self.expirations += removed
+        self._next_sweep = now + self.sweep_interval_seconds
+        return removed
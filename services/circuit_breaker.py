@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+from services.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is short-circuited because the upstream is considered unhealthy."""
+
+
+class CircuitBreaker:
+    """
+    Error-rate and latency driven circuit breaker.
+
+    closed    -> every call allowed; outcomes tracked over a sliding window.
+    open      -> calls rejected without touching upstream, for open_seconds.
+    half_open -> up to half_open_max_calls trial calls; a success closes the
+                 circuit, a failure re-opens it.
+    The circuit opens once min_calls have been seen in the window and either the
+    failure rate or the slow-call rate (latency >= slow_call_seconds) crosses its threshold.
+    Every allow_request() that returns True must be followed by record() or,
+    when the attempt ends without an upstream verdict, release().
+    """
+
+    def __init__(
+        self,
+        name: str = "spoonacular",
+        failure_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 5.0,
+        slow_call_rate_threshold: float = 0.8,
+        min_calls: int = 10,
+        window_seconds: float = 30.0,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._half_open_in_flight = 0
+        # (timestamp, ok, slow)
+        self._window: Deque[Tuple[float, bool, bool]] = deque()
+        self._listeners: List[Callable[[str, str], None]] = []
+
+        self.rejected = 0
+        self.transitions = 0
+
+    # ---------- Public API ----------
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == OPEN
+
+    def allow_request(self) -> bool:
+        """Call before each upstream attempt; False means fail fast."""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._half_open_in_flight < self.half_open_max_calls:
+                self._half_open_in_flight += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def record(self, ok: bool, latency: float) -> None:
+        """Report one upstream attempt: ok=False for 5xx/429/network errors."""
+        slow = latency >= self.slow_call_seconds
+        with self._lock:
+            now = self._clock()
+            if self._state == HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+                if ok and not slow:
+                    self._window.clear()
+                    self._transition(CLOSED, now)
+                else:
+                    self._transition(OPEN, now)
+                return
+            if self._state == OPEN:
+                return
+
+            self._window.append((now, ok, slow))
+            self._trim(now)
+            total = len(self._window)
+            if total < self.min_calls:
+                return
+            failures = sum(1 for _, good, _ in self._window if not good)
+            slow_calls = sum(1 for _, _, was_slow in self._window if was_slow)
+            if failures / total >= self.failure_rate_threshold or slow_calls / total >= self.slow_call_rate_threshold:
+                self._transition(OPEN, now)
+
+    def release(self) -> None:
+        """
+        End an allowed attempt without recording an outcome, e.g. when the
+        caller raised something that says nothing about upstream health
+        (a ValueError building the request, a cancelled task). Frees the
+        half-open trial slot so the circuit cannot wedge in half_open.
+        """
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+
+    def call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run fn under the breaker; any exception counts as a failure."""
+        if not self.allow_request():
+            raise CircuitOpenError(f"Circuit '{self.name}' is open.")
+        start = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self.record(False, time.monotonic() - start)
+            raise
+        except BaseException:
+            self.release()
+            raise
+        self.record(True, time.monotonic() - start)
+        return result
+
+    def add_listener(self, listener: Callable[[str, str], None]) -> None:
+        """listener(old_state, new_state) runs after every transition (outside the lock)."""
+        self._listeners.append(listener)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._maybe_half_open()
+            total = len(self._window)
+            failures = sum(1 for _, good, _ in self._window if not good)
+            return {
+                "name": self.name,
+                "state": self._state,
+                "window_calls": total,
+                "window_failures": failures,
+                "rejected": self.rejected,
+                "transitions": self.transitions,
+            }
+
+    # ---------- Internal Helpers ----------
+
+    def _trim(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while self._window and self._window[0][0] < cutoff:
+            self._window.popleft()
+
+    def _maybe_half_open(self) -> None:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN, self._clock())
+
+    def _transition(self, new_state: str, now: float) -> None:
+        old_state = self._state
+        if old_state == new_state:
+            return
+        self._state = new_state
+        self.transitions += 1
+        if new_state == OPEN:
+            self._opened_at = now
+            self._half_open_in_flight = 0
+        logger.warning("Circuit '%s' %s -> %s", self.name, old_state, new_state)
+        listeners = list(self._listeners)
+        # Listeners may take time (e.g. schedule refreshes); never run them under our lock
+        threading.Thread(target=_notify, args=(listeners, old_state, new_state), daemon=True).start()
+
+
+def _notify(listeners, old_state: str, new_state: str) -> None:
+    for listener in listeners:
+        try:
+            listener(old_state, new_state)
+        except Exception:  # noqa: BLE001
+            logger.exception("Circuit listener failed")
+
+
+class StaleWhileRevalidate:
+    """
+    Keep the last good result per request key and serve it while the circuit is open.
+
+    fetch() returns (value, stale_age_seconds). stale_age is None for fresh results.
+    Keys served stale are remembered and refreshed on a background thread once
+    the breaker closes again.
+    """
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        max_entries: int = 1000,
+        stale_max_age_seconds: float = 60 * 60 * 24,
+        max_pending_refreshes: int = 256,
+    ):
+        self.breaker = breaker
+        self._store = TTLCache(max_entries=max_entries, ttl_seconds=stale_max_age_seconds)
+        self._pending: Dict[Hashable, Callable[[], Any]] = {}
+        self._pending_lock = threading.Lock()
+        self.max_pending_refreshes = max_pending_refreshes
+        self.served_stale = 0
+        self.refreshed = 0
+        breaker.add_listener(self._on_transition)
+
+    def fetch(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, Optional[float]]:
+        if self.breaker.is_open:
+            stale = self._stale(key, fn)
+            if stale is not None:
+                return stale
+        try:
+            value = fn()
+        except Exception:
+            # The failure may just have tripped the breaker, or trial slots are taken
+            if self.breaker.state != CLOSED:
+                stale = self._stale(key, fn)
+                if stale is not None:
+                    return stale
+            raise
+        self._store.set(key, (value, time.time()))
+        return value, None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._pending_lock:
+            pending = len(self._pending)
+        return {"served_stale": self.served_stale, "refreshed": self.refreshed, "pending_refreshes": pending}
+
+    # ---------- Internal Helpers ----------
+
+    def _stale(self, key: Hashable, fn: Callable[[], Any]) -> Optional[Tuple[Any, float]]:
+        entry = self._store.get(key)
+        if entry is None:
+            return None
+        value, stored_at = entry
+        with self._pending_lock:
+            if key in self._pending or len(self._pending) < self.max_pending_refreshes:
+                self._pending[key] = fn
+        self.served_stale += 1
+        return value, max(0.0, time.time() - stored_at)
+
+    def _on_transition(self, old_state: str, new_state: str) -> None:
+        if new_state == CLOSED:
+            self._refresh_pending()
+
+    def _refresh_pending(self) -> None:
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        for key, fn in pending.items():
+            if self.breaker.is_open:
+                # Upstream fell over again; keep the rest for the next recovery
+                with self._pending_lock:
+                    self._pending.setdefault(key, fn)
+                continue
+            try:
+                self._store.set(key, (fn(), time.time()))
+                self.refreshed += 1
+            except Exception as e:  # noqa: BLE001
+                logger.warning("Background refresh failed for %r: %s", key, e)
+
+
+def stale_headers(age_seconds: float) -> Dict[str, str]:
+    """Response headers marking a body served stale by StaleWhileRevalidate."""
+    return {
+        "Age": str(int(age_seconds)),
+        "X-Cache": "STALE",
+        "Warning": '110 - "Response is Stale"',
+    }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str = "spoonacular") -> CircuitBreaker:
+    """Process-wide breaker per upstream, tuned by SPOONACULAR_CIRCUIT_* environment variables."""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    name=name,
+                    failure_rate_threshold=float(os.getenv("SPOONACULAR_CIRCUIT_FAILURE_RATE", "0.5")),
+                    slow_call_seconds=float(os.getenv("SPOONACULAR_CIRCUIT_SLOW_SECONDS", "5")),
+                    min_calls=int(os.getenv("SPOONACULAR_CIRCUIT_MIN_CALLS", "10")),
+                    open_seconds=float(os.getenv("SPOONACULAR_CIRCUIT_OPEN_SECONDS", "30")),
+                )
+                _breakers[name] = breaker
+    return breaker
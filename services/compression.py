@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import gzip
+import os
+import zlib
+from typing import Iterable, Iterator, Optional
+
+from flask import Flask, Response, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSION_ENABLED = os.getenv("RESPONSE_COMPRESSION", "true").lower() in ("1", "true", "yes")
+# Below this many bytes the headers and CPU cost more than the savings
+MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "4"))
+# Streamed bodies are flushed to the client after roughly this much input
+STREAM_FLUSH_BYTES = int(os.getenv("COMPRESS_STREAM_FLUSH_BYTES", str(16 * 1024)))
+
+COMPRESSIBLE_MIMETYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "image/svg+xml",
+)
+
+
+def available_encodings() -> tuple:
+    """Content codings this process can produce, most preferred first."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(response: Response) -> Optional[str]:
+    """Content coding to apply to response for the current request, or None."""
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return None
+    if response.direct_passthrough or "Content-Encoding" in response.headers:
+        return None
+    if "no-transform" in response.headers.get("Cache-Control", ""):
+        return None
+    if not is_compressible(response.mimetype):
+        return None
+    if not response.is_streamed and (response.content_length or 0) < MIN_SIZE:
+        return None
+    # Honours q-values, including gzip;q=0
+    return request.accept_encodings.best_match(available_encodings())
+
+
+def is_compressible(mimetype: Optional[str]) -> bool:
+    return bool(mimetype) and (mimetype.startswith("text/") or mimetype in COMPRESSIBLE_MIMETYPES)
+
+
+def compress_response(response: Response) -> Response:
+    """
+    after_request hook: gzip/brotli-encode compressible bodies when the client
+    accepts it. Buffered bodies under MIN_SIZE are left alone. Streamed bodies
+    are compressed incrementally and flushed every STREAM_FLUSH_BYTES of input,
+    so a long NDJSON export starts arriving at once without paying a flush
+    (and a few bytes of framing) per line.
+    """
+    if is_compressible(response.mimetype):
+        response.vary.add("Accept-Encoding")
+    encoding = choose_encoding(response)
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = _compress_stream(response.response, encoding)
+        response.headers.pop("Content-Length", None)
+    else:
+        response.set_data(_compress_bytes(response.get_data(), encoding))
+    response.headers["Content-Encoding"] = encoding
+
+    # The encoded bytes differ from the identity representation, so a strong
+    # validator must not be reused for them; weak comparison still matches it
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_app(app: Flask) -> Flask:
+    if COMPRESSION_ENABLED:
+        app.after_request(compress_response)
+    return app
+
+
+# ---------- Internal Helpers ----------
+
+
+def _compress_bytes(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _compress_stream(chunks: Iterable, encoding: str) -> Iterator[bytes]:
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        compress, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        # wbits=31: zlib deflate with a gzip header and trailer
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        compress, flush, finish = compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+    pending = 0
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            out = compress(chunk)
+            pending += len(chunk)
+            if pending >= STREAM_FLUSH_BYTES:
+                out += flush()
+                pending = 0
+            if out:
+                yield out
+        yield finish()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
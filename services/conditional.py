@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import time
+import uuid
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+from flask import Response, request
+
+from services.cache import TTLCache
+
+# Pantry data is per user: browsers may store it, shared caches may not, and
+# every use must be revalidated (which is a cheap 304 when nothing changed).
+PANTRY_CACHE_CONTROL = "private, no-cache"
+# Suggestions depend only on the query string, so shared caches may keep them too.
+SUGGEST_CACHE_CONTROL = "public, no-cache"
+# Stale fallbacks (circuit open) get no validator and must not be stored
+STALE_CACHE_CONTROL = "no-store"
+
+SUGGEST_ETAG_TTL_SECONDS = float(os.getenv("SUGGEST_ETAG_TTL_SECONDS", str(60 * 60)))
+
+# Differs per process and per restart, so two processes never hand out the same
+# tag for different content (their version counters are independent)
+_EPOCH = uuid.uuid4().hex[:8]
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Strong entity tag (unquoted) for a cheap description of the content, such as
+    a pantry version plus the query string. The body itself is never hashed.
+    """
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=8).hexdigest()
+    return f"{_EPOCH}-{digest}"
+
+
+def is_not_modified(etag: str) -> bool:
+    """True if the current request's If-None-Match already names etag (or is *)."""
+    # If-None-Match uses weak comparison (RFC 9110 13.1.2)
+    return request.if_none_match.contains_weak(etag)
+
+
+def not_modified(etag: str, cache_control: str, vary: Iterable[str] = ()) -> Response:
+    return set_validators(Response(status=304), etag, cache_control, vary)
+
+
+def set_validators(response: Response, etag: str, cache_control: str, vary: Iterable[str] = ()) -> Response:
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = cache_control
+    for header in vary:
+        response.vary.add(header)
+    return response
+
+
+class ETagRegistry:
+    """
+    Current ETag per response-cache key, for responses that are expensive to
+    rebuild (upstream calls) but stable for a while.
+
+    issue() derives the tag from the body just built, so one tag always names
+    one representation: a fresh fetch that changes the body replaces the key's
+    tag, and an identical body gets the same tag back. The tag stays current
+    for ttl_seconds, during which a poll with a matching If-None-Match is
+    answered with 304 before any upstream call or serialization.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = SUGGEST_ETAG_TTL_SECONDS,
+        max_entries: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._tags = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds, clock=clock)
+
+    def current(self, key: Hashable) -> Optional[str]:
+        return self._tags.get(key)
+
+    def issue(self, key: Hashable, body: bytes) -> str:
+        """Tag for the body just built for key; it becomes the key's current tag."""
+        tag = make_etag(key, hashlib.blake2b(body, digest_size=16).hexdigest())
+        self._tags.set(key, tag)
+        return tag
+
+    def invalidate(self, key: Hashable) -> None:
+        self._tags.pop(key)
+
+
+suggest_etags = ETagRegistry()
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import logging
+import os
+from typing import Any, Dict, Mapping, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import SQLAlchemyError
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SQLITE = "sqlite"
+PROFILE_POOLED = "pooled"
+PROFILES = (PROFILE_SQLITE, PROFILE_POOLED)
+
+
+def _env_bool(env: Mapping[str, str], name: str, default: str) -> bool:
+    return env.get(name, default).lower() in ("1", "true", "yes")
+
+
+def resolve_profile(uri: str, profile: Optional[str] = None) -> str:
+    """Explicit profile if given, else inferred from the database URI."""
+    if profile:
+        if profile not in PROFILES:
+            raise ValueError(f"DB_PROFILE must be one of {', '.join(PROFILES)}, got {profile!r}")
+        return profile
+    return PROFILE_SQLITE if make_url(uri).get_backend_name() == "sqlite" else PROFILE_POOLED
+
+
+def sqlite_pragmas(env: Mapping[str, str] = os.environ) -> Dict[str, Any]:
+    """
+    PRAGMAs run on every new SQLite connection.
+
+    WAL lets readers proceed while one writer commits; synchronous=NORMAL only
+    fsyncs at checkpoints (safe under WAL, may lose the last commits on power
+    loss but never corrupts); busy_timeout makes a writer wait for the lock
+    instead of failing with "database is locked".
+    """
+    return {
+        "journal_mode": env.get("SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous": env.get("SQLITE_SYNCHRONOUS", "NORMAL"),
+        "busy_timeout": int(env.get("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        "mmap_size": int(env.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+        # Negative = KiB, so -65536 is a 64 MiB page cache per connection
+        "cache_size": int(env.get("SQLITE_CACHE_SIZE", "-65536")),
+    }
+
+
+def engine_options(profile: str, uri: str, env: Mapping[str, str] = os.environ) -> Dict[str, Any]:
+    """SQLALCHEMY_ENGINE_OPTIONS for a profile."""
+    options: Dict[str, Any] = {
+        # SQLAlchemy's compiled-statement cache, shared by all connections
+        "query_cache_size": int(env.get("DB_QUERY_CACHE_SIZE", "500")),
+    }
+    if profile == PROFILE_SQLITE:
+        # Driver-level lock wait, matching busy_timeout for the first statement
+        timeout_ms = sqlite_pragmas(env)["busy_timeout"]
+        options["connect_args"] = {"timeout": timeout_ms / 1000}
+        return options
+
+    options.update(
+        pool_size=int(env.get("DB_POOL_SIZE", "10")),
+        max_overflow=int(env.get("DB_MAX_OVERFLOW", "20")),
+        pool_timeout=float(env.get("DB_POOL_TIMEOUT", "30")),
+        pool_recycle=int(env.get("DB_POOL_RECYCLE", "1800")),
+        pool_pre_ping=_env_bool(env, "DB_POOL_PRE_PING", "true"),
+    )
+    # Server-side prepared statements, for the drivers that support them
+    driver = make_url(uri).get_driver_name()
+    if driver == "psycopg":
+        options["connect_args"] = {"prepare_threshold": int(env.get("DB_PREPARE_THRESHOLD", "5"))}
+    elif driver == "asyncpg":
+        options["connect_args"] = {"statement_cache_size": int(env.get("DB_STATEMENT_CACHE_SIZE", "100"))}
+    return options
+
+
+def install_sqlite_pragmas(engine: Engine, pragmas: Mapping[str, Any]) -> None:
+    """Apply pragmas to every connection the engine's pool opens."""
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def effective_settings(engine: Engine, profile: str) -> Dict[str, Any]:
+    """What the database actually reports, which may differ from what was asked for."""
+    settings: Dict[str, Any] = {"profile": profile, "url": engine.url.render_as_string(hide_password=True)}
+    if profile == PROFILE_SQLITE:
+        with engine.connect() as connection:
+            for name in ("journal_mode", "synchronous", "busy_timeout", "mmap_size", "cache_size"):
+                settings[name] = connection.execute(text(f"PRAGMA {name}")).scalar()
+    else:
+        pool = engine.pool
+        settings.update(
+            pool=type(pool).__name__,
+            pool_size=getattr(pool, "size", lambda: None)(),
+            max_overflow=getattr(pool, "_max_overflow", None),
+            pool_pre_ping=getattr(pool, "_pre_ping", None),
+        )
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    return settings
+
+
+def check_engine(engine: Engine, profile: str, requested: Optional[Mapping[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Startup check: connect once, log the effective settings, and warn about
+    a journal_mode the database refused (e.g. WAL on a read-only filesystem).
+    Returns None if the database is unreachable; the app still starts.
+    """
+    try:
+        settings = effective_settings(engine, profile)
+    except SQLAlchemyError as e:
+        logger.warning("Database startup check failed for %s: %s", engine.url.render_as_string(hide_password=True), e)
+        return None
+    logger.info("Database engine: %s", ", ".join(f"{k}={v}" for k, v in settings.items()))
+    wanted = (requested or {}).get("journal_mode")
+    actual = str(settings.get("journal_mode")).lower()
+    # In-memory databases always report "memory"; nothing to warn about
+    if wanted and actual not in (str(wanted).lower(), "memory"):
+        logger.warning("SQLite journal_mode is %s, requested %s", settings.get("journal_mode"), wanted)
+    return settings
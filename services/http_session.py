@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from services.metrics import register_http_pool
+
+DEFAULT_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))
+DEFAULT_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "20"))
+DEFAULT_POOL_BLOCK = os.getenv("HTTP_POOL_BLOCK", "false").lower() in ("1", "true", "yes")
+DEFAULT_KEEPALIVE = os.getenv("HTTP_KEEPALIVE", "true").lower() in ("1", "true", "yes")
+
+
+class _StatsAdapter(HTTPAdapter):
+    """HTTPAdapter that counts requests so pool utilization can be reported."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        self.requests_sent = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._counter_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, *args: Any, **kwargs: Any):
+        with self._counter_lock:
+            self.requests_sent += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            return super().send(request, *args, **kwargs)
+        finally:
+            with self._counter_lock:
+                self.in_flight -= 1
+
+
+class SessionProvider:
+    """
+    Process-wide pooled requests.Session.
+
+    One Session (and one urllib3 pool per host) is shared by every thread, so
+    TCP/TLS connections are reused across upstream calls. The session is
+    rebuilt automatically in a child process after fork, because sockets
+    inherited from a preloading master must never be shared between workers.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        pool_block: bool = DEFAULT_POOL_BLOCK,
+        keep_alive: bool = DEFAULT_KEEPALIVE,
+    ):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self._lock = threading.Lock()
+        self._session: Optional[requests.Session] = None
+        self._adapter: Optional[_StatsAdapter] = None
+        self._pid: Optional[int] = None
+        self.rebuilds = 0
+
+    def get(self) -> requests.Session:
+        session = self._session
+        if session is not None and self._pid == os.getpid():
+            return session
+        with self._lock:
+            if self._session is None or self._pid != os.getpid():
+                self._build()
+            return self._session
+
+    def reset(self) -> None:
+        """Drop the current session and its pooled connections (rebuilt lazily)."""
+        with self._lock:
+            if self._session is not None and self._pid == os.getpid():
+                self._session.close()
+            self._session = None
+            self._adapter = None
+
+    def stats(self) -> Dict[str, Any]:
+        adapter = self._adapter
+        pools: Dict[str, Dict[str, int]] = {}
+        if adapter is not None and self._pid == os.getpid():
+            for key in list(adapter.poolmanager.pools.keys()):
+                pool = adapter.poolmanager.pools.get(key)
+                if pool is None:
+                    continue
+                # pool.pool is urllib3's LIFO of kept-alive connections, padded with
+                # None placeholders up to maxsize (and itself None once closed)
+                queue = pool.pool
+                idle = sum(conn is not None for conn in list(queue.queue)) if queue is not None else 0
+                pools[f"{key.key_scheme}://{key.key_host}:{key.key_port}"] = {
+                    "connections_opened": pool.num_connections,
+                    "requests": pool.num_requests,
+                    "idle": idle,
+                    "maxsize": queue.maxsize if queue is not None else self.pool_maxsize,
+                }
+        return {
+            "pool_connections": self.pool_connections,
+            "pool_maxsize": self.pool_maxsize,
+            "requests_sent": adapter.requests_sent if adapter else 0,
+            "in_flight": adapter.in_flight if adapter else 0,
+            "peak_in_flight": adapter.peak_in_flight if adapter else 0,
+            "rebuilds": self.rebuilds,
+            "pools": pools,
+        }
+
+    # ---------- Internal Helpers ----------
+
+    def _build(self) -> None:
+        if self._session is not None and self._pid == os.getpid():
+            self._session.close()
+        session = requests.Session()
+        adapter = _StatsAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        self._session = session
+        self._adapter = adapter
+        self._pid = os.getpid()
+        self.rebuilds += 1
+
+
+_provider = SessionProvider()
+# Connection reuse shows on /metrics: host requests vs connections opened
+register_http_pool("default", _provider)
+
+if hasattr(os, "register_at_fork"):
+    # Children of a preloading server must not touch the parent's sockets
+    os.register_at_fork(after_in_child=lambda: setattr(_provider, "_session", None))
+
+
+def get_session() -> requests.Session:
+    """Shared pooled session for outbound HTTP (Spoonacular)."""
+    return _provider.get()
+
+
+def session_stats() -> Dict[str, Any]:
+    return _provider.stats()
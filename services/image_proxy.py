@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from services.http_session import get_session
+from services.metrics import register_cache
+from services.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+IMAGE_PROXY_ENABLED = os.getenv("IMAGE_PROXY", "true").lower() in ("1", "true", "yes")
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "prepify-images"))
+IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+IMAGE_BASE_URL = os.getenv("SPOONACULAR_IMAGE_BASE_URL", "https://img.spoonacular.com/recipes")
+IMAGE_TIMEOUT = 10
+# Recipe photos practically never change upstream; clients keep them a year
+IMAGE_MAX_AGE = 60 * 60 * 24 * 365
+
+# Sizes Spoonacular renders for recipe images
+SIZES = ("90x90", "240x150", "312x150", "312x231", "480x360", "556x370", "636x393")
+DEFAULT_SIZE = "312x231"
+IMAGE_TYPES = {"jpg": "image/jpeg", "jpeg": "image/jpeg", "png": "image/png", "webp": "image/webp"}
+
+# url -> (body, content_type); raises ImageNotFound / ImageFetchError
+Fetcher = Callable[[str], Tuple[bytes, str]]
+
+
+class ImageNotFound(Exception):
+    pass
+
+
+class ImageFetchError(Exception):
+    pass
+
+
+def upstream_image_url(recipe_id: int, size: str = DEFAULT_SIZE, image_type: str = "jpg") -> str:
+    return f"{IMAGE_BASE_URL}/{recipe_id}-{size}.{image_type}"
+
+
+def proxied_image_url(recipe_id: Any, image: Optional[str] = None) -> Optional[str]:
+    """Proxy path for a recipe's image, keeping a non-jpg upstream type."""
+    if recipe_id is None or not image:
+        return image
+    image_type = os.path.splitext(urlparse(image).path)[1].lstrip(".").lower()
+    if image_type in IMAGE_TYPES and image_type not in ("jpg", "jpeg"):
+        return f"/images/{recipe_id}?type={image_type}"
+    return f"/images/{recipe_id}"
+
+
+def rewrite_images(recipes: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Copies of recipes whose "image" points at /images/<id> instead of the CDN,
+    when the current Flask app has the proxy registered; otherwise unchanged.
+    """
+    from flask import current_app
+
+    recipes = list(recipes)
+    if "image_proxy" not in current_app.extensions:
+        return recipes
+    out = []
+    for r in recipes:
+        if "image" in r:
+            r = {**r, "image": proxied_image_url(r.get("id"), r.get("image"))}
+        out.append(r)
+    return out
+
+
+def fetch_with_session(url: str) -> Tuple[bytes, str]:
+    """Default fetcher: the shared pooled requests session."""
+    try:
+        resp = get_session().get(url, timeout=IMAGE_TIMEOUT)
+    except Exception as e:
+        raise ImageFetchError(f"Image fetch failed: {e}") from e
+    if resp.status_code == 404:
+        raise ImageNotFound(url)
+    if resp.status_code != 200:
+        raise ImageFetchError(f"Image fetch returned HTTP {resp.status_code}")
+    return resp.content, resp.headers.get("Content-Type", "application/octet-stream").split(";")[0]
+
+
+class ImageCache:
+    """
+    Content-addressed disk cache with LRU eviction by total bytes.
+
+    blobs/<aa>/<sha256>  image bytes, stored once however many keys share them
+    refs/<key>           "<sha256> <content-type>" for a recipe/size/type key
+
+    Writes go through a temp file and os.replace, so readers (including other
+    worker processes) never see partial files. Each process keeps its own LRU
+    order, seeded from blob mtimes at startup; a hit refreshes the mtime so the
+    order survives restarts. A ref whose blob was evicted is treated as a miss.
+    """
+
+    def __init__(self, directory: str = IMAGE_CACHE_DIR, max_bytes: int = IMAGE_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._blobs = os.path.join(directory, "blobs")
+        self._refs = os.path.join(directory, "refs")
+        os.makedirs(self._blobs, exist_ok=True)
+        os.makedirs(self._refs, exist_ok=True)
+        self._lock = threading.Lock()
+        # digest -> size, least recently used first
+        self._lru: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load()
+
+    def get(self, key: str) -> Optional[Tuple[str, str]]:
+        """(blob path, content type) for key, or None."""
+        found = self.lookup(key)
+        with self._lock:
+            if found is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return found
+
+    def lookup(self, key: str) -> Optional[Tuple[str, str]]:
+        """Like get(), but not counted in hits/misses (for re-checks after a miss)."""
+        ref = self._read_ref(key)
+        if ref is not None:
+            digest, content_type = ref
+            path = self._blob_path(digest)
+            if os.path.exists(path):
+                self._touch(digest, path)
+                return path, content_type
+        return None
+
+    def put(self, key: str, body: bytes, content_type: str) -> Tuple[str, str]:
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._atomic_write(path, body)
+        self._atomic_write(os.path.join(self._refs, key), f"{digest} {content_type}".encode())
+        with self._lock:
+            if digest not in self._lru:
+                self._bytes += len(body)
+            self._lru[digest] = len(body)
+            self._lru.move_to_end(digest)
+            self._evict_locked(keep=digest)
+        return path, content_type
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "blobs": len(self._lru),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    # ---------- Internal Helpers ----------
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self._blobs, digest[:2], digest)
+
+    def _load(self) -> None:
+        found = []
+        for root, _, files in os.walk(self._blobs):
+            for name in files:
+                if name.startswith("."):
+                    continue
+                st = os.stat(os.path.join(root, name))
+                found.append((st.st_mtime, name, st.st_size))
+        for _, digest, size in sorted(found):
+            self._lru[digest] = size
+            self._bytes += size
+        with self._lock:
+            self._evict_locked()
+
+    def _read_ref(self, key: str) -> Optional[Tuple[str, str]]:
+        try:
+            with open(os.path.join(self._refs, key), "rb") as f:
+                digest, content_type = f.read().decode().split(" ", 1)
+        except (OSError, ValueError):
+            return None
+        return digest, content_type
+
+    def _touch(self, digest: str, path: str) -> None:
+        with self._lock:
+            if digest in self._lru:
+                self._lru.move_to_end(digest)
+            else:
+                # Written by another worker since we loaded
+                size = os.path.getsize(path)
+                self._lru[digest] = size
+                self._bytes += size
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _evict_locked(self, keep: Optional[str] = None) -> None:
+        while self._bytes > self.max_bytes and self._lru:
+            digest, size = next(iter(self._lru.items()))
+            if digest == keep:
+                break
+            del self._lru[digest]
+            self._bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(self._blob_path(digest))
+            except OSError:
+                pass
+
+    def _atomic_write(self, path: str, data: bytes) -> None:
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+
+
+class ImageProxy:
+    """
+    Recipe images fetched from Spoonacular once, then served from ImageCache.
+    `fetcher` (url -> (bytes, content_type)) is injectable for tests and for
+    pointing at a local stand-in CDN.
+    """
+
+    def __init__(self, cache: ImageCache, fetcher: Fetcher = fetch_with_session):
+        self.cache = cache
+        self.fetcher = fetcher
+        self._flight = SingleFlight("image_proxy")
+
+    def get(self, recipe_id: int, size: str = DEFAULT_SIZE, image_type: str = "jpg") -> Tuple[str, str]:
+        """(path, content type); raises ValueError for an unknown size/type."""
+        if size not in SIZES:
+            raise ValueError(f"size must be one of {', '.join(SIZES)}")
+        if image_type not in IMAGE_TYPES:
+            raise ValueError(f"type must be one of {', '.join(IMAGE_TYPES)}")
+        key = f"{recipe_id}-{size}.{image_type}"
+        hit = self.cache.get(key)
+        if hit is not None:
+            return hit
+        # Concurrent requests for the same cold image share one download
+        return self._flight.do(key, self._fill, key, upstream_image_url(recipe_id, size, image_type))
+
+    def _fill(self, key: str, url: str) -> Tuple[str, str]:
+        # get() already counted this request's miss; an earlier flight may have filled it since
+        hit = self.cache.lookup(key)
+        if hit is not None:
+            return hit
+        body, content_type = self.fetcher(url)
+        if not content_type.startswith("image/"):
+            content_type = IMAGE_TYPES[key.rsplit(".", 1)[-1]]
+        return self.cache.put(key, body, content_type)
+
+
+def init_app(app, proxy: Optional[ImageProxy] = None) -> Optional[ImageProxy]:
+    """
+    Register GET /images/<recipe_id>?size=312x231&type=jpg on a Flask app.
+
+    Responses are sent with send_file (X-Sendfile when USE_X_SENDFILE is set,
+    so the front-end server streams the file) and cached by clients for a year.
+    """
+    from flask import jsonify, request, send_file
+
+    if proxy is None:
+        if not IMAGE_PROXY_ENABLED:
+            return None
+        proxy = ImageProxy(ImageCache())
+    app.config.setdefault("USE_X_SENDFILE", os.getenv("IMAGE_X_SENDFILE", "false").lower() in ("1", "true", "yes"))
+    app.extensions["image_proxy"] = proxy
+    register_cache("images", proxy.cache, entries_key="blobs")
+
+    def recipe_image(recipe_id: int):
+        try:
+            path, content_type = proxy.get(
+                recipe_id, request.args.get("size", DEFAULT_SIZE), request.args.get("type", "jpg").lower()
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except ImageNotFound:
+            return jsonify({"error": "Image not found"}), 404
+        except ImageFetchError as e:
+            logger.warning("Image proxy upstream failure for %s: %s", recipe_id, e)
+            return jsonify({"error": "Image unavailable"}), 502
+        response = send_file(path, mimetype=content_type, max_age=IMAGE_MAX_AGE, etag=os.path.basename(path))
+        return response
+
+    app.add_url_rule("/images/<int:recipe_id>", "recipe_image", recipe_image, methods=["GET"])
+    return proxy
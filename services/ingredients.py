@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Iterable, List, Union
+
+# Regional / alternate names mapped onto the name Spoonacular matches best.
+SYNONYMS = {
+    "scallion": "green onion",
+    "spring onion": "green onion",
+    "garbanzo bean": "chickpea",
+    "garbanzo": "chickpea",
+    "courgette": "zucchini",
+    "aubergine": "eggplant",
+    "capsicum": "bell pepper",
+    "coriander leaf": "cilantro",
+    "minced beef": "ground beef",
+    "beef mince": "ground beef",
+    "rocket": "arugula",
+    "prawn": "shrimp",
+    "caster sugar": "superfine sugar",
+    "icing sugar": "powdered sugar",
+    "double cream": "heavy cream",
+    "plain flour": "all purpose flour",
+    "all-purpose flour": "all purpose flour",
+}
+
+# Words that end in "s" but are not plurals
+_SINGULAR_S = {
+    "asparagus", "couscous", "hummus", "molasses", "swiss", "citrus", "bass",
+    "grits", "oats", "brussels", "watercress", "cress", "greens", "floss",
+}
+
+_IRREGULAR_PLURALS = {
+    "leaves": "leaf",
+    "loaves": "loaf",
+    "halves": "half",
+    "knives": "knife",
+    "geese": "goose",
+    "teeth": "tooth",
+    "pies": "pie",
+    "cookies": "cookie",
+    "brownies": "brownie",
+    "smoothies": "smoothie",
+}
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def singularize(word: str) -> str:
+    """Fold an English plural to its singular form (cooking vocabulary only)."""
+    if word in _SINGULAR_S or len(word) <= 3:
+        return word
+    if word in _IRREGULAR_PLURALS:
+        return _IRREGULAR_PLURALS[word]
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith("oes") or word.endswith(("ches", "shes", "xes", "sses")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+@lru_cache(maxsize=4096)
+def canonical_ingredient(term: str) -> str:
+    """'  Cherry Tomatoes ' -> 'cherry tomato'. Returns '' for blank input."""
+    term = _WHITESPACE.sub(" ", term.strip().lower())
+    if not term:
+        return ""
+    if term in SYNONYMS:
+        return SYNONYMS[term]
+    words = term.split(" ")
+    # Only the head noun carries the plural: "green beans" -> "green bean"
+    words[-1] = singularize(words[-1])
+    term = " ".join(words)
+    return SYNONYMS.get(term, term)
+
+
+def canonicalize_ingredients(ingredients: Union[str, Iterable[str]]) -> List[str]:
+    """
+    Trim, lowercase, singularize, map synonyms, dedupe and sort an ingredient list.
+    Accepts either a comma-separated string or an iterable of names.
+    "Tomato, chicken", "chicken,tomato" and "chicken, tomatoes" all give ['chicken', 'tomato'].
+    """
+    if isinstance(ingredients, str):
+        ingredients = ingredients.split(",")
+    seen = {canonical_ingredient(i) for i in ingredients if isinstance(i, str)}
+    seen.discard("")
+    return sorted(seen)
+
+
+def canonical_query(ingredients: Union[str, Iterable[str]]) -> str:
+    """Comma-joined canonical form, suitable as a cache key or upstream parameter."""
+    return ",".join(canonicalize_ingredients(ingredients))
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from services.timing import span
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that serializes with orjson when it is installed and
+    falls back to the stdlib provider otherwise.
+
+    Parsed values match the stdlib provider for what routes return: dates,
+    datetimes, decimals, UUIDs and dataclasses still go through Flask's
+    `default` hook (so datetimes are HTTP dates, not ISO 8601), and indentation
+    follows `compact`/debug. The bytes differ, and so do a few edge cases:
+
+    - dumps() is compact (no spaces after "," and ":") unless indent is given;
+      a `separators` argument is ignored.
+    - Keys keep insertion order instead of being sorted, which is most of the
+      saving on wide recipe objects; set sort_keys = True to restore sorting.
+    - Non-ASCII text is written as UTF-8, not as \\u escapes.
+    - NaN and +/-Infinity become null (the stdlib writes invalid JSON).
+    - Non-str keys never fail: datetime keys become ISO 8601 strings (the
+      stdlib raises TypeError), and mixed int/str keys can produce duplicates.
+    - Floats use the shortest form orjson picks, e.g. 1e20 not 1e+20.
+    """
+
+    sort_keys = False
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is None or set(kwargs) - {"indent", "separators"}:
+            return super().dumps(obj, **kwargs)
+        return self._orjson_bytes(obj, indent=bool(kwargs.get("indent"))).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        with span("serialize"):
+            if orjson is None:
+                return super().response(*args, **kwargs)
+            obj = self._prepare_response_obj(args, kwargs)
+            indent = (self.compact is None and self._app.debug) or self.compact is False
+            # Build the body as bytes directly; no str round trip
+            body = self._orjson_bytes(obj, indent=indent) + b"\n"
+            return self._app.response_class(body, mimetype=self.mimetype)
+
+    # ---------- Internal Helpers ----------
+
+    def _orjson_bytes(self, obj: Any, indent: bool = False) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=self.default, option=option)
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits; the stdlib handles them
+            return super().dumps(obj, indent=2 if indent else None, separators=None if indent else (",", ":")).encode()
+
+
+def init_app(app: Flask) -> Flask:
+    app.json = FastJSONProvider(app)
+    if orjson is None:
+        logger.info("orjson not installed; JSON responses use the stdlib encoder")
+    return app
@@ -0,0 +1,396 @@
+from __future__ import annotations
+
+import math
+import re
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers a cached 2 ms answer up to a request that ran out its deadline
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Finished threads' shards are folded into one once this many have accumulated
+_RETIRE_AFTER_SHARDS = 64
+
+_NUMERIC_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+# Label values are kept as passed (e.g. an int status code) and stringified when rendered
+LabelValues = Tuple[Any, ...]
+
+
+class _Shards:
+    """
+    Per-thread value dicts. A thread only ever writes its own dict, so updates
+    take no lock; the lock is held only when a thread first records something
+    and while a scrape collects the dicts. A scrape may see an observation
+    half-applied (e.g. a histogram bucket bumped before its count), which is
+    within what Prometheus tolerates between scrapes.
+    """
+
+    def __init__(self, merge: Callable[[Any, Any], Any]):
+        self._merge = merge
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._live: List[Tuple["weakref.ref[threading.Thread]", Dict[LabelValues, Any]]] = []
+        self._retired: Dict[LabelValues, Any] = {}
+
+    def mine(self) -> Dict[LabelValues, Any]:
+        values = getattr(self._local, "values", None)
+        if values is None:
+            values = self._local.values = {}
+            with self._lock:
+                self._live.append((weakref.ref(threading.current_thread()), values))
+                if len(self._live) > _RETIRE_AFTER_SHARDS:
+                    self._retire_locked()
+        return values
+
+    def collect(self) -> Dict[LabelValues, Any]:
+        with self._lock:
+            self._retire_locked()
+            shards = [self._retired] + [values for _, values in self._live]
+        total: Dict[LabelValues, Any] = {}
+        for shard in shards:
+            # dict.copy is atomic under the GIL, so a concurrent insert cannot break the scrape
+            for key, value in shard.copy().items():
+                total[key] = self._merge(total.get(key), value)
+        return total
+
+    # ---------- Internal Helpers ----------
+
+    def _retire_locked(self) -> None:
+        keep = []
+        for ref, values in self._live:
+            thread = ref()
+            if thread is not None and thread.is_alive():
+                keep.append((ref, values))
+                continue
+            # Nobody writes to a finished thread's dict any more
+            for key, value in values.items():
+                self._retired[key] = self._merge(self._retired.get(key), value)
+        self._live = keep
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._shards = _Shards(lambda a, b: b if a is None else a + b)
+
+    def inc(self, *labelvalues: Any, amount: float = 1) -> None:
+        values = self._shards.mine()
+        values[labelvalues] = values.get(labelvalues, 0) + amount
+
+    def collect(self) -> Dict[LabelValues, float]:
+        return self._shards.collect()
+
+    def render(self) -> Iterable[str]:
+        yield from _header(self.name, self.documentation, "counter")
+        for key, value in _sorted(self.collect()):
+            yield f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Row per label set: one count per bucket (non-cumulative), +Inf, sum, count
+        self._shards = _Shards(lambda a, b: list(b) if a is None else [x + y for x, y in zip(a, b)])
+
+    def observe(self, value: float, *labelvalues: Any) -> None:
+        values = self._shards.mine()
+        row = values.get(labelvalues)
+        if row is None:
+            row = values[labelvalues] = [0] * (len(self.buckets) + 3)
+        row[bisect_left(self.buckets, value)] += 1
+        row[-2] += value
+        row[-1] += 1
+
+    def collect(self) -> Dict[LabelValues, List[float]]:
+        return self._shards.collect()
+
+    def render(self) -> Iterable[str]:
+        yield from _header(self.name, self.documentation, "histogram")
+        for key, row in _sorted(self.collect()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (math.inf,), row):
+                cumulative += n
+                le = _labels(self.labelnames + ("le",), key + (_number(bound),))
+                yield f"{self.name}_bucket{le} {_number(cumulative)}"
+            labels = _labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_number(row[-2])}"
+            yield f"{self.name}_count{labels} {_number(row[-1])}"
+
+
+class Registry:
+    """
+    Metrics for one process, rendered in the Prometheus text format.
+
+    Counters and histograms are recorded in-process (see _Shards). Caches and
+    outbound HTTP pools are not instrumented on their hot path at all:
+    register_cache / register_http_pool keep a weak reference and read the
+    object's own stats() when /metrics is scraped.
+    Under a multi-worker server every worker reports its own numbers; scrape
+    each one (or aggregate by instance) as usual.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Any] = {}
+        self._caches: Dict[str, Tuple["weakref.ref[Any]", str]] = {}
+        self._http_pools: Dict[str, "weakref.ref[Any]"] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(name, Counter, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(name, Histogram, documentation, labelnames, buckets)
+
+    def register_cache(self, name: str, cache: Any, entries_key: str = "entries") -> None:
+        """
+        Export a cache's stats() as prepify_cache_* series labelled cache=name.
+        Reads hits/misses/evictions/expirations and bytes when present, and
+        the size from stats()[entries_key]. Re-registering a name replaces it.
+        """
+        with self._lock:
+            self._caches[name] = (weakref.ref(cache), entries_key)
+
+    def register_http_pool(self, name: str, provider: Any) -> None:
+        """
+        Export a pooled session's stats() (services.http_session.SessionProvider)
+        as prepify_outbound_http_* series labelled pool=name, per host where the
+        stats are per host. Requests over connections opened is the reuse rate.
+        """
+        with self._lock:
+            self._http_pools[name] = weakref.ref(provider)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+            caches = sorted(self._caches.items())
+            http_pools = sorted(self._http_pools.items())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        lines.extend(self._render_caches(caches))
+        lines.extend(self._render_http_pools(http_pools))
+        return "\n".join(lines) + "\n"
+
+    # ---------- Internal Helpers ----------
+
+    def _get_or_create(self, name: str, cls: type, *args: Any) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {type(metric).__name__}")
+            return metric
+
+    def _render_caches(self, caches: List[Tuple[str, Tuple["weakref.ref[Any]", str]]]) -> Iterable[str]:
+        series: Dict[str, List[str]] = {}
+        for cache_name, (ref, entries_key) in caches:
+            cache = ref()
+            if cache is None:
+                continue
+            stats = cache.stats()
+            label = _labels(("cache",), (cache_name,))
+            for stat, metric in _CACHE_SERIES:
+                key = entries_key if stat == "entries" else stat
+                if stats.get(key) is not None:
+                    series.setdefault(metric, []).append(f"{metric}{label} {_number(stats[key])}")
+        for stat, metric in _CACHE_SERIES:
+            if metric in series:
+                kind = "gauge" if stat in ("entries", "bytes") else "counter"
+                yield from _header(metric, _CACHE_HELP[stat], kind)
+                yield from series[metric]
+
+    def _render_http_pools(self, pools: List[Tuple[str, "weakref.ref[Any]"]]) -> Iterable[str]:
+        series: Dict[str, List[str]] = {}
+        for pool_name, ref in pools:
+            provider = ref()
+            if provider is None:
+                continue
+            stats = provider.stats()
+            label = _labels(("pool",), (pool_name,))
+            for stat, metric, _, _ in _HTTP_POOL_SERIES:
+                if stats.get(stat) is not None:
+                    series.setdefault(metric, []).append(f"{metric}{label} {_number(stats[stat])}")
+            for host, host_stats in sorted(stats.get("pools", {}).items()):
+                host_label = _labels(("pool", "host"), (pool_name, host))
+                for stat, metric, _, _ in _HTTP_HOST_SERIES:
+                    if host_stats.get(stat) is not None:
+                        series.setdefault(metric, []).append(f"{metric}{host_label} {_number(host_stats[stat])}")
+        for _, metric, kind, documentation in _HTTP_POOL_SERIES + _HTTP_HOST_SERIES:
+            if metric in series:
+                yield from _header(metric, documentation, kind)
+                yield from series[metric]
+
+
+_CACHE_SERIES = (
+    ("hits", "prepify_cache_hits_total"),
+    ("misses", "prepify_cache_misses_total"),
+    ("evictions", "prepify_cache_evictions_total"),
+    ("expirations", "prepify_cache_expirations_total"),
+    ("entries", "prepify_cache_entries"),
+    ("bytes", "prepify_cache_bytes"),
+)
+_CACHE_HELP = {
+    "hits": "Cache lookups answered from the cache.",
+    "misses": "Cache lookups that found nothing usable.",
+    "evictions": "Entries dropped to stay within the size bounds.",
+    "expirations": "Entries dropped because their TTL passed.",
+    "entries": "Entries currently held.",
+    "bytes": "Approximate bytes currently held.",
+}
+
+# (stats key, metric, type, help) for SessionProvider.stats() and its per-host "pools"
+_HTTP_POOL_SERIES = (
+    ("requests_sent", "prepify_outbound_http_requests_total", "counter", "Requests sent through the pooled session."),
+    ("in_flight", "prepify_outbound_http_in_flight", "gauge", "Requests currently on the wire."),
+    ("peak_in_flight", "prepify_outbound_http_in_flight_peak", "gauge", "Most requests on the wire at once."),
+    ("rebuilds", "prepify_outbound_http_session_rebuilds_total", "counter", "Sessions built (first use, fork, reset)."),
+)
+_HTTP_HOST_SERIES = (
+    ("requests", "prepify_outbound_http_host_requests_total", "counter", "Requests sent to this host."),
+    ("connections_opened", "prepify_outbound_http_connections_opened_total", "counter", "TCP/TLS connections opened to this host."),
+    ("idle", "prepify_outbound_http_idle_connections", "gauge", "Kept-alive connections waiting in the pool."),
+    ("maxsize", "prepify_outbound_http_pool_maxsize", "gauge", "Connections the pool keeps per host."),
+)
+
+REGISTRY = Registry()
+
+http_request_duration = REGISTRY.histogram(
+    "prepify_http_request_duration_seconds",
+    "Time from request start until the response is handed to the server.",
+    ("method", "route"),
+)
+http_requests = REGISTRY.counter(
+    "prepify_http_requests_total", "HTTP responses by route and status code.", ("method", "route", "status")
+)
+upstream_duration = REGISTRY.histogram(
+    "prepify_spoonacular_request_duration_seconds",
+    "Duration of each HTTP attempt to Spoonacular, retries included as separate attempts.",
+    ("client", "endpoint"),
+)
+upstream_requests = REGISTRY.counter(
+    "prepify_spoonacular_requests_total",
+    "HTTP attempts to Spoonacular by status code (\"error\" for network failures).",
+    ("client", "endpoint", "code"),
+)
+upstream_errors = REGISTRY.counter(
+    "prepify_spoonacular_errors_total",
+    "Spoonacular attempts that failed: network errors and non-2xx responses.",
+    ("client", "endpoint"),
+)
+upstream_rate_limited = REGISTRY.counter(
+    "prepify_spoonacular_rate_limited_total", "Spoonacular attempts answered with HTTP 429.", ("client", "endpoint")
+)
+upstream_retries = REGISTRY.counter(
+    "prepify_spoonacular_retries_total", "Spoonacular attempts that were retried after a backoff.", ("client", "endpoint")
+)
+
+
+def upstream_endpoint(url_or_path: str) -> str:
+    """/recipes/716429/information -> /recipes/{id}/information, so ids never become labels."""
+    return _NUMERIC_SEGMENT.sub("/{id}", urlparse(url_or_path).path or "/")
+
+
+def record_upstream(client: str, url_or_path: str, seconds: float, status_code: Optional[int]) -> None:
+    """One Spoonacular HTTP attempt; status_code None means it failed before a response."""
+    endpoint = upstream_endpoint(url_or_path)
+    upstream_duration.observe(seconds, client, endpoint)
+    upstream_requests.inc(client, endpoint, "error" if status_code is None else status_code)
+    if status_code is None or not 200 <= status_code < 300:
+        upstream_errors.inc(client, endpoint)
+    if status_code == 429:
+        upstream_rate_limited.inc(client, endpoint)
+
+
+def record_retry(client: str, url_or_path: str) -> None:
+    upstream_retries.inc(client, upstream_endpoint(url_or_path))
+
+
+def register_cache(name: str, cache: Any, entries_key: str = "entries") -> None:
+    REGISTRY.register_cache(name, cache, entries_key)
+
+
+def register_http_pool(name: str, provider: Any) -> None:
+    REGISTRY.register_http_pool(name, provider)
+
+
+def init_app(app, registry: Registry = REGISTRY) -> None:
+    """
+    Time every request by route template (so /pantry/<int:item_id> is one
+    series) and serve GET /metrics. Streamed responses are timed until their
+    headers are ready, not until the last chunk is sent.
+    """
+    from flask import Response, g, request
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        started = g.pop("_metrics_started", None)
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+            http_request_duration.observe(time.perf_counter() - started, request.method, route)
+            http_requests.inc(request.method, route, response.status_code)
+        return response
+
+    def metrics():
+        return Response(registry.render(), mimetype=None, content_type=PROMETHEUS_CONTENT_TYPE)
+
+    app.add_url_rule("/metrics", "metrics", metrics, methods=["GET"])
+
+
+# ---------- Internal Helpers ----------
+
+
+def _header(name: str, documentation: str, kind: str) -> Iterable[str]:
+    yield f"# HELP {name} {documentation}"
+    yield f"# TYPE {name} {kind}"
+
+
+def _sorted(values: Dict[LabelValues, Any]) -> List[Tuple[LabelValues, Any]]:
+    return sorted(values.items(), key=lambda item: tuple(map(str, item[0])))
+
+
+def _labels(names: Sequence[str], values: Sequence[Any]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import base64
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_BATCH_SIZE = 500
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+class InvalidCursor(ValueError):
+    """Raised for a cursor that was not produced by encode_cursor()."""
+
+
+def encode_cursor(after: Any) -> str:
+    """Opaque, URL-safe cursor for 'everything after this key'."""
+    raw = json.dumps({"after": after}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Any:
+    """Key encoded by encode_cursor(), or None for a missing cursor."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode()))["after"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+
+def parse_limit(raw: Optional[str], default: int = DEFAULT_PAGE_SIZE, maximum: int = MAX_PAGE_SIZE) -> int:
+    """Clamp a ?limit= value to [1, maximum]; raises ValueError for non-integers."""
+    if raw in (None, ""):
+        return default
+    return max(1, min(int(raw), maximum))
+
+
+def keyset_page(
+    session,
+    model,
+    columns: Sequence[str],
+    limit: int,
+    after: Any = None,
+    key: str = "id",
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Up to `limit` rows ordered by `key`, starting after the key value `after`
+    (None for the first page), and whether more rows follow.
+
+    Uses WHERE key > :after ORDER BY key LIMIT n+1, so every page costs an index
+    range scan no matter how deep it is (unlike OFFSET). Callers turn the last
+    row's key into the next cursor with encode_cursor().
+    """
+    key_col = getattr(model, key)
+    stmt = select(*(getattr(model, c) for c in columns)).order_by(key_col).limit(limit + 1)
+    if after is not None:
+        stmt = stmt.where(key_col > after)
+    rows = [dict(row._mapping) for row in session.execute(stmt)]
+    return rows[:limit], len(rows) > limit
+
+
+def stream_rows(session, model, columns: Sequence[str], key: str = "id", batch_size: int = STREAM_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Every row ordered by `key`, fetched from a server-side cursor in batches of
+    batch_size. Plain column tuples skip the ORM identity map, so memory stays
+    flat however large the table is.
+    """
+    stmt = select(*(getattr(model, c) for c in columns)).order_by(getattr(model, key))
+    result = session.execute(stmt.execution_options(stream_results=True, yield_per=batch_size))
+    try:
+        for row in result:
+            yield dict(row._mapping)
+    finally:
+        result.close()
+
+
+def ndjson_lines(rows: Iterable[Any], dumps: Callable[[Any], str] = json.dumps) -> Iterator[str]:
+    for row in rows:
+        yield dumps(row) + "\n"
+
+
+def json_array_chunks(rows: Iterable[Any], dumps: Callable[[Any], str] = json.dumps) -> Iterator[str]:
+    """A JSON array emitted element by element; never holds the whole document."""
+    yield "["
+    first = True
+    for row in rows:
+        yield dumps(row) if first else "," + dumps(row)
+        first = False
+    yield "]"
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from services.pantry_revision import bump_revision
+from services.pantry_suggestions import DB_PANTRY_ID, pantry_versions
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_OPERATIONS = 500
+OPERATIONS = ("create", "update", "delete")
+# Column -> max length, mirroring PantryItem
+FIELDS = {"name": 100, "quantity": 50, "category": 50}
+
+
+def apply_batch(
+    session,
+    model,
+    operations: Any,
+    atomic: bool = False,
+) -> Tuple[Dict[str, Any], int]:
+    """
+    Validate and apply a list of pantry operations in one transaction.
+
+      {"op": "create", "name": "Rice", "quantity": "2 cups", "category": "grains"}
+      {"op": "update", "id": 3, "quantity": "1 cup"}
+      {"op": "delete", "id": 7}
+
+    Everything is validated up front (including one query for the referenced
+    ids). Valid operations are then written with one bulk INSERT, one bulk
+    UPDATE and one DELETE, followed by a single commit. Invalid operations are
+    reported per item; with atomic=True any invalid operation rejects the whole batch.
+
+    Returns (body, status): 200 when everything applied, 207 on partial
+    success, 400 when nothing was applied.
+    """
+    if not isinstance(operations, list) or not operations:
+        return {"error": "operations must be a non-empty list"}, 400
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        return {"error": f"at most {MAX_BATCH_OPERATIONS} operations per batch"}, 400
+
+    results: List[Dict[str, Any]] = []
+    for index, op in enumerate(operations):
+        error = _validate(op)
+        results.append({"index": index, "op": op.get("op") if isinstance(op, dict) else None, "error": error})
+
+    _check_references(session, model, operations, results)
+
+    failed = [r for r in results if r["error"]]
+    if failed and (atomic or len(failed) == len(results)):
+        for r in results:
+            r["status"] = "error" if r["error"] else "skipped"
+        return _body(results, atomic, applied=0), 400
+
+    valid = [(r, operations[r["index"]]) for r in results if not r["error"]]
+    try:
+        _write(session, model, valid)
+        # Bulk statements bypass the mapper hooks; bump the DB revision in the same transaction
+        bump_revision(session.connection(), model)
+        session.commit()
+    except SQLAlchemyError as e:
+        session.rollback()
+        logger.exception("Pantry batch failed")
+        for r in results:
+            r["status"] = "error"
+            r["error"] = r["error"] or f"database error: {e.__class__.__name__}"
+        return _body(results, atomic, applied=0), 500
+
+    # Bulk statements bypass the PantryItem mapper hooks
+    pantry_versions.bump(DB_PANTRY_ID)
+
+    _attach_items(session, model, results)
+    for r in results:
+        r["status"] = "error" if r["error"] else "ok"
+    applied = len(valid)
+    return _body(results, atomic, applied), 200 if applied == len(results) else 207
+
+
+# ---------- Internal Helpers ----------
+
+
+def _validate(op: Any) -> Optional[str]:
+    if not isinstance(op, dict):
+        return "operation must be an object"
+    kind = op.get("op")
+    if kind not in OPERATIONS:
+        return f"op must be one of {', '.join(OPERATIONS)}"
+    if kind in ("update", "delete"):
+        if not isinstance(op.get("id"), int) or isinstance(op.get("id"), bool):
+            return "id must be an integer"
+    if kind == "delete":
+        return None
+
+    for field, max_len in FIELDS.items():
+        value = op.get(field)
+        if value is None:
+            continue
+        if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+            return f"{field} must be a string"
+        if len(str(value)) > max_len:
+            return f"{field} must be at most {max_len} characters"
+    if kind == "create" and not str(op.get("name") or "").strip():
+        return "name is required"
+    if kind == "update":
+        if not any(field in op for field in FIELDS):
+            return "update needs at least one of name, quantity, category"
+        if "name" in op and not str(op.get("name") or "").strip():
+            return "name cannot be empty"
+    return None
+
+
+def _check_references(session, model, operations: List[Any], results: List[Dict[str, Any]]) -> None:
+    """One query for every id the batch touches; flags unknown ids and use-after-delete."""
+    ids = {operations[r["index"]]["id"] for r in results if not r["error"] and r["op"] in ("update", "delete")}
+    existing = set(session.scalars(select(model.id).where(model.id.in_(ids)))) if ids else set()
+    deleted = set()
+    for r in results:
+        if r["error"] or r["op"] not in ("update", "delete"):
+            continue
+        item_id = operations[r["index"]]["id"]
+        if item_id not in existing:
+            r["error"] = "Item not found"
+        elif item_id in deleted:
+            r["error"] = "Item deleted earlier in this batch"
+        elif r["op"] == "delete":
+            deleted.add(item_id)
+
+
+def _row(op: Dict[str, Any]) -> Dict[str, Any]:
+    row = {}
+    for field in FIELDS:
+        if field in op:
+            value = op[field]
+            # _validate lets numbers through (e.g. "name": 5); store them as text
+            row[field] = str(value).strip() if field == "name" else ("" if value is None else str(value))
+    return row
+
+
+def _write(session, model, valid: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> None:
+    creates = [(r, {"quantity": "", "category": "", **_row(op)}) for r, op in valid if r["op"] == "create"]
+    updates: Dict[int, Dict[str, Any]] = {}
+    for r, op in valid:
+        if r["op"] == "update":
+            # Several updates to one row collapse into one, last write wins per field
+            updates.setdefault(op["id"], {"id": op["id"]}).update(_row(op))
+            r["id"] = op["id"]
+    delete_ids = []
+    for r, op in valid:
+        if r["op"] == "delete":
+            delete_ids.append(op["id"])
+            r["id"] = op["id"]
+
+    if creates:
+        new_ids = session.scalars(
+            insert(model).returning(model.id, sort_by_parameter_order=True),
+            [row for _, row in creates],
+        ).all()
+        for (r, _), new_id in zip(creates, new_ids):
+            r["id"] = new_id
+    if updates:
+        session.execute(update(model), list(updates.values()))
+    if delete_ids:
+        session.execute(delete(model).where(model.id.in_(delete_ids)))
+
+
+def _attach_items(session, model, results: List[Dict[str, Any]]) -> None:
+    ids = {r["id"] for r in results if not r["error"] and r["op"] in ("create", "update")}
+    if not ids:
+        return
+    rows = {
+        item.id: {"id": item.id, "name": item.name, "quantity": item.quantity, "category": item.category}
+        for item in session.scalars(select(model).where(model.id.in_(ids)))
+    }
+    for r in results:
+        if not r["error"] and r["op"] in ("create", "update"):
+            r["item"] = rows.get(r["id"])
+
+
+def _body(results: List[Dict[str, Any]], atomic: bool, applied: int) -> Dict[str, Any]:
+    for r in results:
+        if r["error"] is None:
+            del r["error"]
+    failed = sum(1 for r in results if r["status"] == "error")
+    return {"atomic": atomic, "applied": applied, "failed": failed, "results": results}
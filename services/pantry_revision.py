@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from sqlalchemy import Column, Integer, Table, event, insert, select, update
+
+# Single-row table beside each tracked pantry table: "<table>_revision"
+REVISION_SUFFIX = "_revision"
+
+
+def track_revisions(model) -> Table:
+    """
+    Keep a revision counter for model's table in the database itself.
+
+    Adds "<table>_revision" (one row) to the model's metadata, so create_all
+    creates and seeds it, and bumps it from the mapper hooks in the same
+    transaction as every ORM insert, update and delete. Any worker sharing the
+    database therefore sees every committed write, including in-place updates.
+    Bulk statements skip mapper hooks; call bump_revision() next to them.
+    """
+    existing = revision_table(model)
+    if existing is not None:
+        return existing
+    table = Table(
+        model.__tablename__ + REVISION_SUFFIX,
+        model.metadata,
+        Column("id", Integer, primary_key=True),
+        Column("revision", Integer, nullable=False),
+    )
+
+    @event.listens_for(table, "after_create")
+    def _seed(target, connection, **kw):
+        connection.execute(insert(target).values(id=1, revision=0))
+
+    @event.listens_for(model, "after_insert")
+    @event.listens_for(model, "after_update")
+    @event.listens_for(model, "after_delete")
+    def _bump(mapper, connection, target):
+        bump_revision(connection, model)
+
+    return table
+
+
+def revision_table(model) -> Optional[Table]:
+    return model.metadata.tables.get(model.__tablename__ + REVISION_SUFFIX)
+
+
+def bump_revision(connection, model) -> None:
+    """Bump model's revision on connection, inside the writing transaction. No-op if untracked."""
+    table = revision_table(model)
+    if table is not None:
+        connection.execute(update(table).where(table.c.id == 1).values(revision=table.c.revision + 1))
+
+
+def read_revision(session, model) -> int:
+    """The committed revision as this session sees it; one primary-key lookup."""
+    table = revision_table(model)
+    if table is None:
+        raise RuntimeError(f"{model.__tablename__} has no revision table; call track_revisions({model.__name__})")
+    return session.execute(select(table.c.revision).where(table.c.id == 1)).scalar() or 0
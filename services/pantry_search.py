@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import weakref
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+SEARCH_CANDIDATES = 500
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# External-content FTS5 table over pantry_items.name, kept in sync by triggers.
+# prefix='1 2 3' adds prefix indexes so autocomplete on short input stays an index lookup.
+_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+        name,
+        content='{table}',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='1 2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+        INSERT INTO {fts}(rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+        INSERT INTO {fts}({fts}, rowid, name) VALUES ('delete', old.id, old.name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF name ON {table} BEGIN
+        INSERT INTO {fts}({fts}, rowid, name) VALUES ('delete', old.id, old.name);
+        INSERT INTO {fts}(rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+]
+
+# engine -> {table: has FTS5 index}; cleared with the engine
+_ensured: "weakref.WeakKeyDictionary[Any, Dict[str, bool]]" = weakref.WeakKeyDictionary()
+_ensured_lock = threading.Lock()
+
+
+def fts_table(model) -> str:
+    return f"{model.__tablename__}_fts"
+
+
+def install_search_index(connection, model) -> bool:
+    """
+    Create the FTS5 shadow table and sync triggers (idempotent) and backfill
+    existing rows when the shadow table is new. Returns False when the database
+    is not SQLite or was built without FTS5; search then falls back to LIKE.
+    """
+    if connection.dialect.name != "sqlite":
+        return False
+    table, fts = model.__tablename__, fts_table(model)
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": fts}
+    ).first()
+    try:
+        for ddl in _FTS_DDL:
+            connection.exec_driver_sql(ddl.format(table=table, fts=fts))
+    except OperationalError as e:
+        logger.warning("FTS5 unavailable, pantry search will use LIKE: %s", e)
+        return False
+    if not exists:
+        connection.exec_driver_sql(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+    return True
+
+
+def search_items(
+    session,
+    model,
+    q: str,
+    category: Optional[str] = None,
+    limit: int = DEFAULT_SEARCH_LIMIT,
+) -> List[Dict[str, Any]]:
+    """
+    Pantry items with a word starting with each word of q ("tom sau" finds
+    "Tomato Sauce"), best matches first. With an empty q,
+    browses the category in name order via the (category, name) index.
+    """
+    tokens = _TOKEN.findall(q or "")
+    if not tokens:
+        return browse_items(session, model, category, limit)
+    if _has_fts(session, model):
+        return _fts_search(session, model, tokens, category, limit)
+    return _like_search(session, model, tokens, category, limit)
+
+
+def browse_items(session, model, category: Optional[str], limit: int = DEFAULT_SEARCH_LIMIT) -> List[Dict[str, Any]]:
+    stmt = select(model.id, model.name, model.quantity, model.category)
+    if category is not None:
+        stmt = stmt.where(model.category == category)
+    stmt = stmt.order_by(model.category, model.name).limit(limit)
+    return [dict(row._mapping) for row in session.execute(stmt)]
+
+
+# ---------- Internal Helpers ----------
+
+
+def _has_fts(session, model) -> bool:
+    """
+    Whether the shadow table exists, installing it on first use for databases
+    created before it was added to the schema. Runs inside the session's
+    transaction, so the install commits (or rolls back) with the caller's work;
+    only definitive answers are cached.
+    """
+    bind = session.get_bind()
+    table = model.__tablename__
+    with _ensured_lock:
+        known = _ensured.get(bind, {}).get(table)
+    if known is not None:
+        return known
+    connection = session.connection()
+    if connection.dialect.name != "sqlite":
+        available = False
+    elif connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": fts_table(model)}
+    ).first():
+        available = True
+    elif install_search_index(connection, model):
+        return True
+    else:
+        available = False
+    with _ensured_lock:
+        _ensured.setdefault(bind, {})[table] = available
+    return available
+
+
+def _match_expression(tokens: List[str]) -> str:
+    # Quote every word so user input can never be parsed as FTS5 operators
+    return " ".join('"' + token.replace('"', '""') + '"*' for token in tokens)
+
+
+def _fts_search(session, model, tokens: List[str], category: Optional[str], limit: int) -> List[Dict[str, Any]]:
+    # bm25 is only computed for the first SEARCH_CANDIDATES matches: a one-letter
+    # prefix can match most of the table, and ranking all of it costs tens of ms.
+    table, fts = model.__tablename__, fts_table(model)
+    where = f"{fts} MATCH :match"
+    params: Dict[str, Any] = {"match": _match_expression(tokens), "candidates": SEARCH_CANDIDATES, "limit": limit}
+    if category is not None:
+        where += " AND p.category = :category"
+        params["category"] = category
+    sql = (
+        "SELECT id, name, quantity, category FROM ("
+        f"SELECT p.id, p.name, p.quantity, p.category, bm25({fts}) AS score FROM {fts} "
+        # CROSS JOIN pins the FTS table as the outer loop; otherwise SQLite may
+        # drive from the category index and run MATCH once per row in the category
+        f"CROSS JOIN {table} AS p ON p.id = {fts}.rowid WHERE {where} LIMIT :candidates"
+        ") ORDER BY score, name LIMIT :limit"
+    )
+    return [dict(row._mapping) for row in session.execute(text(sql), params)]
+
+
+def _like_search(session, model, tokens: List[str], category: Optional[str], limit: int) -> List[Dict[str, Any]]:
+    stmt = select(model.id, model.name, model.quantity, model.category)
+    for token in tokens:
+        stmt = stmt.where(model.name.ilike(f"%{token}%"))
+    if category is not None:
+        stmt = stmt.where(model.category == category)
+    stmt = stmt.order_by(model.name).limit(limit)
+    return [dict(row._mapping) for row in session.execute(stmt)]
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from services.pagination import keyset_page, stream_rows
+from services.pantry_batch import apply_batch
+from services.pantry_revision import read_revision
+from services.pantry_search import search_items
+from services.pantry_suggestions import DB_PANTRY_ID, PantryVersions, pantry_versions
+
+BACKEND_MEMORY = "memory"
+BACKEND_SQL = "sql"
+BACKENDS = (BACKEND_MEMORY, BACKEND_SQL)
+
+Item = Dict[str, Any]
+
+
+class PantryStore(ABC):
+    """
+    Storage behind the root app's /pantry routes.
+
+    Items are dicts with a stable integer "id" that never changes or gets
+    reused, so an id handed to a client stays valid until that item is
+    deleted. Every write bumps `versions` for `pantry_id`, which is what
+    invalidates memoized pantry suggestions.
+    """
+
+    pantry_id: str
+    versions: PantryVersions
+
+    @abstractmethod
+    def revision(self) -> int:
+        """Cheap counter that moves whenever the pantry does; keys ETags and memoized suggestions."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def page(self, after: Optional[int], limit: int) -> Tuple[List[Item], bool]:
+        """Up to `limit` items with id > after, in id order, and whether more follow."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def items(self) -> Iterator[Item]:
+        """Every item in id order."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get(self, item_id: int) -> Optional[Item]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def add(self, fields: Dict[str, Any]) -> Item:
+        raise NotImplementedError
+
+    @abstractmethod
+    def update(self, item_id: int, fields: Dict[str, Any]) -> Optional[Item]:
+        """The updated item, or None if there is no such id."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, item_id: int) -> bool:
+        raise NotImplementedError
+
+
+class MemoryPantryStore(PantryStore):
+    """
+    Per-process pantry: a dict keyed by id, so get/update/delete are O(1).
+
+    Ids are handed out in increasing order and dicts keep insertion order, so
+    iteration is already id order. Good for tests and a single worker; every
+    process has its own copy.
+    """
+
+    def __init__(self, pantry_id: str = BACKEND_MEMORY):
+        self.pantry_id = pantry_id
+        self.versions = PantryVersions()
+        self._items: Dict[int, Item] = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def revision(self) -> int:
+        return self.versions.current(self.pantry_id)
+
+    def page(self, after: Optional[int], limit: int) -> Tuple[List[Item], bool]:
+        # Walk ids upward from the cursor: O(limit + deleted ids skipped), not O(n)
+        with self._lock:
+            item_id = 1 if after is None else max(after + 1, 1)
+            out: List[Item] = []
+            while item_id < self._next_id and len(out) <= limit:
+                item = self._items.get(item_id)
+                if item is not None:
+                    out.append(dict(item))
+                item_id += 1
+        return out[:limit], len(out) > limit
+
+    def items(self) -> Iterator[Item]:
+        with self._lock:
+            snapshot = [dict(item) for item in self._items.values()]
+        return iter(snapshot)
+
+    def get(self, item_id: int) -> Optional[Item]:
+        item = self._items.get(item_id)
+        return dict(item) if item is not None else None
+
+    def add(self, fields: Dict[str, Any]) -> Item:
+        with self._lock:
+            item = {"id": self._next_id, **fields}
+            self._items[self._next_id] = item
+            self._next_id += 1
+        self.versions.bump(self.pantry_id)
+        return dict(item)
+
+    def update(self, item_id: int, fields: Dict[str, Any]) -> Optional[Item]:
+        with self._lock:
+            item = self._items.get(item_id)
+            if item is None:
+                return None
+            item.update(fields)
+            updated = dict(item)
+        self.versions.bump(self.pantry_id)
+        return updated
+
+    def delete(self, item_id: int) -> bool:
+        with self._lock:
+            if self._items.pop(item_id, None) is None:
+                return False
+        self.versions.bump(self.pantry_id)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class SQLAlchemyPantryStore(PantryStore):
+    """
+    Pantry rows in a database table (models.PantryItem), shared by every worker.
+
+    `session` is normally Flask-SQLAlchemy's scoped db.session, and `model`
+    must be registered with services.pantry_revision.track_revisions. revision()
+    reads that DB-backed counter, so a write committed by any worker changes
+    it. Each write also bumps the process-wide pantry_versions for DB_PANTRY_ID
+    after it commits, the same key PantryItem's mapper hooks and /pantry/batch bump.
+    """
+
+    COLUMNS = ("id", "name", "quantity", "category")
+
+    def __init__(self, session, model):
+        self.session = session
+        self.model = model
+        self.pantry_id = DB_PANTRY_ID
+        self.versions = pantry_versions
+
+    def revision(self) -> int:
+        return read_revision(self.session, self.model)
+
+    def page(self, after: Optional[int], limit: int) -> Tuple[List[Item], bool]:
+        return keyset_page(self.session, self.model, self.COLUMNS, limit, after)
+
+    def items(self) -> Iterator[Item]:
+        return stream_rows(self.session, self.model, self.COLUMNS)
+
+    def get(self, item_id: int) -> Optional[Item]:
+        obj = self.session.get(self.model, item_id)
+        return self._to_dict(obj) if obj is not None else None
+
+    def add(self, fields: Dict[str, Any]) -> Item:
+        obj = self.model(**fields)
+        self.session.add(obj)
+        self._commit()
+        return self._to_dict(obj)
+
+    def update(self, item_id: int, fields: Dict[str, Any]) -> Optional[Item]:
+        obj = self.session.get(self.model, item_id)
+        if obj is None:
+            return None
+        for key, value in fields.items():
+            setattr(obj, key, value)
+        self._commit()
+        return self._to_dict(obj)
+
+    def delete(self, item_id: int) -> bool:
+        obj = self.session.get(self.model, item_id)
+        if obj is None:
+            return False
+        self.session.delete(obj)
+        self._commit()
+        return True
+
+    def apply_batch(self, operations: Any, atomic: bool = False) -> Tuple[Dict[str, Any], int]:
+        """Bulk create/update/delete in one transaction; see services.pantry_batch.apply_batch."""
+        return apply_batch(self.session, self.model, operations, atomic=atomic)
+
+    def search(self, q: str, category: Optional[str], limit: int) -> List[Item]:
+        """Word-prefix search (FTS5 on SQLite); see services.pantry_search.search_items."""
+        return search_items(self.session, self.model, q, category, limit)
+
+    # ---------- Internal Helpers ----------
+
+    def _commit(self) -> None:
+        try:
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        self.versions.bump(self.pantry_id)
+
+    def _to_dict(self, obj) -> Item:
+        return {c: getattr(obj, c) for c in self.COLUMNS}
+
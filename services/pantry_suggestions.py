@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from services.persistent_cache import make_key
+
+# The PantryItem table holds a single shared pantry
+DB_PANTRY_ID = "db"
+
+
+class PantryVersions:
+    """
+    Monotonically increasing version per pantry.
+
+    Every add, update or delete calls bump(); anything derived from a pantry
+    (suggestions, ingredient sets) stays valid while the version is unchanged.
+    Listeners are told which pantry changed so they can drop just its entries.
+    Versions are process-local.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions: Dict[Hashable, int] = {}
+        self._listeners: List[Callable[[Hashable, int], None]] = []
+
+    def current(self, pantry_id: Hashable) -> int:
+        with self._lock:
+            return self._versions.get(pantry_id, 0)
+
+    def bump(self, pantry_id: Hashable) -> int:
+        with self._lock:
+            version = self._versions.get(pantry_id, 0) + 1
+            self._versions[pantry_id] = version
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(pantry_id, version)
+        return version
+
+    def add_listener(self, listener: Callable[[Hashable, int], None]) -> None:
+        """listener(pantry_id, new_version) runs after every bump."""
+        self._listeners.append(listener)
+
+
+class PantrySuggestionCache:
+    """
+    Suggestions memoized per (pantry, pantry version, query).
+
+    Repeated calls for an unchanged pantry never rebuild the ingredient set or
+    call upstream. A bump drops only that pantry's entries; a result computed
+    while the pantry changed underneath it is returned but not stored.
+
+    `revision(pantry_id)` supplies the version (default: versions.current).
+    Pass the store's own revision when writes can come from other processes,
+    e.g. the DB-backed one of SQLAlchemyPantryStore: local bumps still free
+    entries early, and a version read from the database catches the rest.
+    """
+
+    def __init__(
+        self,
+        versions: PantryVersions,
+        max_pantries: int = 1024,
+        max_queries_per_pantry: int = 16,
+        revision: Optional[Callable[[Hashable], int]] = None,
+    ):
+        self.versions = versions
+        self._revision = revision or versions.current
+        self.max_pantries = max_pantries
+        self.max_queries_per_pantry = max_queries_per_pantry
+        self._lock = threading.Lock()
+        # pantry_id -> (version, {query_key: value}); LRU over pantries
+        self._entries: "OrderedDict[Hashable, Tuple[int, OrderedDict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        versions.add_listener(self._on_bump)
+
+    # ---------- Public API ----------
+
+    def get(
+        self,
+        pantry_id: Hashable,
+        query: Optional[Dict[str, Any]],
+        compute: Callable[[], Any],
+        version: Optional[int] = None,
+    ) -> Tuple[Any, int, bool]:
+        """
+        Returns (value, pantry_version, cache_hit). Pass `version` when the
+        caller already read it (e.g. for an ETag) so both agree.
+        """
+        query_key = make_key("pantry/suggest", query)
+        if version is None:
+            version = self._revision(pantry_id)
+        with self._lock:
+            entry = self._entries.get(pantry_id)
+            if entry is not None and entry[0] == version and query_key in entry[1]:
+                self._entries.move_to_end(pantry_id)
+                entry[1].move_to_end(query_key)
+                self.hits += 1
+                return entry[1][query_key], version, True
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            if self._revision(pantry_id) != version:
+                return value, version, False
+            entry = self._entries.get(pantry_id)
+            if entry is None or entry[0] != version:
+                entry = (version, OrderedDict())
+                self._entries[pantry_id] = entry
+            self._entries.move_to_end(pantry_id)
+            entry[1][query_key] = value
+            while len(entry[1]) > self.max_queries_per_pantry:
+                entry[1].popitem(last=False)
+            while len(self._entries) > self.max_pantries:
+                self._entries.popitem(last=False)
+        return value, version, False
+
+    def invalidate(self, pantry_id: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(pantry_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"pantries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    # ---------- Internal Helpers ----------
+
+    def _on_bump(self, pantry_id: Hashable, version: int) -> None:
+        self.invalidate(pantry_id)
+
+
+# Shared by the PantryItem model hooks and anything serving the table-backed pantry
+pantry_versions = PantryVersions()
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parents[1] / "instance" / "spoonacular_cache.sqlite3"
+
+# Seconds each endpoint's responses stay fresh. Recipe details rarely change;
+# search results drift as Spoonacular's catalogue changes.
+DEFAULT_TTLS: Dict[str, float] = {
+    "recipes/information": 60 * 60 * 24 * 7,
+    "recipes/informationBulk": 60 * 60 * 24 * 7,
+    "recipes/findByIngredients": 60 * 60 * 6,
+}
+FALLBACK_TTL = 60 * 60
+
+# Never part of a cache key: credentials must not end up on disk
+_EXCLUDED_PARAMS = {"apiKey"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    endpoint TEXT NOT NULL,
+    body TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_responses_expires_at ON responses (expires_at);
+CREATE INDEX IF NOT EXISTS ix_responses_endpoint ON responses (endpoint);
+"""
+
+
+def normalize_endpoint(path: str) -> str:
+    """'/recipes/findByIngredients' -> 'recipes/findByIngredients'."""
+    return path.strip("/")
+
+
+def make_key(endpoint: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Canonical cache key: endpoint plus params sorted by name, credentials dropped."""
+    canonical = {
+        k: str(v).lower() if isinstance(v, bool) else str(v)
+        for k, v in (params or {}).items()
+        if k not in _EXCLUDED_PARAMS and v is not None
+    }
+    return f"{normalize_endpoint(endpoint)}?{json.dumps(canonical, sort_keys=True, separators=(',', ':'))}"
+
+
+class SQLiteCache:
+    """
+    Persistent response cache shared by every worker process on a host.
+
+    Backed by SQLite in WAL mode, so readers never block the single writer and
+    several gunicorn workers can use the same file. Each thread (and each forked
+    process) opens its own connection.
+    """
+
+    def __init__(
+        self,
+        path: Optional[os.PathLike | str] = None,
+        ttls: Optional[Dict[str, float]] = None,
+        busy_timeout_ms: int = 5000,
+    ):
+        self.path = Path(path or DEFAULT_CACHE_PATH)
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn().executescript(_SCHEMA)
+
+    # ---------- Public API ----------
+
+    def ttl_for(self, endpoint: str) -> float:
+        return self.ttls.get(normalize_endpoint(endpoint), FALLBACK_TTL)
+
+    def get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """Return the cached payload, or None when missing or expired."""
+        row = self._conn().execute(
+            "SELECT body FROM responses WHERE key = ? AND expires_at > ?",
+            (make_key(endpoint, params), time.time()),
+        ).fetchone()
+        if row is None:
+            return None
+        try:
+            return json.loads(row[0])
+        except ValueError:
+            return None
+
+    def set(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        value: Any,
+        ttl_seconds: Optional[float] = None,
+    ) -> None:
+        ttl = self.ttl_for(endpoint) if ttl_seconds is None else ttl_seconds
+        now = time.time()
+        try:
+            body = json.dumps(value, separators=(",", ":"))
+        except (TypeError, ValueError):
+            logger.warning("Not caching non-JSON payload for %s", endpoint)
+            return
+        try:
+            with self._conn() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, endpoint, body, created_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (make_key(endpoint, params), normalize_endpoint(endpoint), body, now, now + ttl),
+                )
+        except sqlite3.OperationalError as e:
+            # A busy cache must never fail the request that produced the data
+            logger.warning("Persistent cache write failed: %s", e)
+
+    def purge(self, endpoint: Optional[str] = None, expired_only: bool = True) -> int:
+        """Delete entries (optionally one endpoint, optionally only expired). Returns count."""
+        clauses, args = [], []
+        if endpoint:
+            clauses.append("endpoint = ?")
+            args.append(normalize_endpoint(endpoint))
+        if expired_only:
+            clauses.append("expires_at <= ?")
+            args.append(time.time())
+        sql = "DELETE FROM responses"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        with self._conn() as conn:
+            return conn.execute(sql, args).rowcount
+
+    def vacuum(self) -> None:
+        conn = self._conn()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("VACUUM")
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-endpoint entry counts, expired counts and stored bytes."""
+        rows = self._conn().execute(
+            "SELECT endpoint, COUNT(*), SUM(expires_at <= ?), SUM(LENGTH(body)) "
+            "FROM responses GROUP BY endpoint ORDER BY endpoint",
+            (time.time(),),
+        ).fetchall()
+        return [
+            {"endpoint": ep, "entries": n, "expired": expired or 0, "bytes": size or 0}
+            for ep, n, expired, size in rows
+        ]
+
+    def entries(self, endpoint: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        sql = "SELECT key, endpoint, LENGTH(body), created_at, expires_at FROM responses"
+        args: List[Any] = []
+        if endpoint:
+            sql += " WHERE endpoint = ?"
+            args.append(normalize_endpoint(endpoint))
+        sql += " ORDER BY created_at DESC LIMIT ?"
+        args.append(limit)
+        return [
+            {"key": key, "endpoint": ep, "bytes": size, "created_at": created, "expires_at": expires}
+            for key, ep, size, created, expires in self._conn().execute(sql, args).fetchall()
+        ]
+
+    def iter_payloads(self, endpoint: str) -> Iterator[Tuple[Any, float]]:
+        """Yield (payload, created_at) for every unexpired response cached for endpoint."""
+        rows = self._conn().execute(
+            "SELECT body, created_at FROM responses WHERE endpoint = ? AND expires_at > ?",
+            (normalize_endpoint(endpoint), time.time()),
+        ).fetchall()
+        for body, created_at in rows:
+            try:
+                yield json.loads(body), created_at
+            except ValueError:
+                continue
+
+    # ---------- Internal Helpers ----------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.path), timeout=self.busy_timeout_ms / 1000, isolation_level=None)
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    def _conn(self) -> sqlite3.Connection:
+        # Connections must not cross threads or survive a fork
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+
+_shared_cache: Optional[SQLiteCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_persistent_cache() -> Optional[SQLiteCache]:
+    """
+    Process-wide cache instance, or None when disabled.
+    Enabled by SPOONACULAR_PERSISTENT_CACHE=1; SPOONACULAR_CACHE_PATH overrides the file location.
+    """
+    global _shared_cache
+    if os.getenv("SPOONACULAR_PERSISTENT_CACHE", "").lower() not in ("1", "true", "yes"):
+        return None
+    if _shared_cache is None:
+        with _shared_lock:
+            if _shared_cache is None:
+                _shared_cache = SQLiteCache(os.getenv("SPOONACULAR_CACHE_PATH") or None)
+    return _shared_cache
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitExceeded(Exception):
+    """Raised when an outbound call is rejected by the local rate limiter or quota budget."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _utc_day(ts: float) -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime(ts))
+
+
+def _header_float(headers: Mapping[str, Any], name: str) -> Optional[float]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class _MemoryState:
+    """Limiter state for a single process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state: Dict[str, Any] = {}
+
+    def update(self, fn: Callable[[Dict[str, Any]], Any]) -> Any:
+        with self._lock:
+            return fn(self._state)
+
+
+class _SQLiteState:
+    """Limiter state shared by every process on the host through one SQLite row."""
+
+    def __init__(self, path: Path, name: str):
+        self.path = Path(path)
+        self.name = name
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn().execute("CREATE TABLE IF NOT EXISTS limiter_state (name TEXT PRIMARY KEY, body TEXT NOT NULL)")
+
+    def update(self, fn: Callable[[Dict[str, Any]], Any]) -> Any:
+        conn = self._conn()
+        # IMMEDIATE takes the write lock up front so read-modify-write is atomic across processes
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT body FROM limiter_state WHERE name = ?", (self.name,)).fetchone()
+            state = json.loads(row[0]) if row else {}
+            result = fn(state)
+            conn.execute(
+                "INSERT OR REPLACE INTO limiter_state (name, body) VALUES (?, ?)",
+                (self.name, json.dumps(state)),
+            )
+            conn.execute("COMMIT")
+            return result
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(str(self.path), timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode = WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+
+class RateLimiter:
+    """
+    Token bucket (requests per second) plus a daily points budget for Spoonacular.
+
+    - acquire() takes a token and reserves the call's points, waiting at most
+      max_wait_seconds for a token; otherwise it raises RateLimitExceeded
+      immediately instead of letting work queue up behind sleeps.
+    - record_response() feeds back X-API-Quota-Used / X-API-Quota-Left and 429s,
+      so the local view converges on Spoonacular's.
+    - With state_path set, all processes on the host share one bucket and budget.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float = 5.0,
+        burst: Optional[float] = None,
+        points_per_day: Optional[float] = None,
+        reserve_points: float = 0.0,
+        max_wait_seconds: float = 0.5,
+        state_path: Optional[os.PathLike | str] = None,
+        name: str = "spoonacular",
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if requests_per_second <= 0:
+            raise ValueError("requests_per_second must be positive.")
+        self.rate = requests_per_second
+        self.burst = burst if burst is not None else max(1.0, requests_per_second)
+        self.points_per_day = points_per_day
+        self.reserve_points = reserve_points
+        self.max_wait_seconds = max_wait_seconds
+        self._clock = clock
+        self._sleep = sleep
+        self._store = _SQLiteState(Path(state_path), name) if state_path else _MemoryState()
+
+        self.accepted = 0
+        self.rejected = 0
+        self.waited_seconds = 0.0
+
+    # ---------- Public API ----------
+
+    def acquire(self, points: float = 1.0) -> None:
+        deadline = self._clock() + self.max_wait_seconds
+        while True:
+            wait, reason = self._store.update(lambda state: self._try_take(state, points))
+            if wait == 0:
+                self.accepted += 1
+                return
+            now = self._clock()
+            if reason or now + wait > deadline:
+                self.rejected += 1
+                raise RateLimitExceeded(reason or "Spoonacular request rate limit reached.", retry_after=wait)
+            self.waited_seconds += wait
+            self._sleep(wait)
+
+    def record_response(self, status_code: int, headers: Optional[Mapping[str, Any]] = None) -> None:
+        headers = headers or {}
+        used = _header_float(headers, "X-API-Quota-Used")
+        left = _header_float(headers, "X-API-Quota-Left")
+        retry_after = _header_float(headers, "Retry-After") if status_code == 429 else None
+        if used is None and left is None and status_code != 429:
+            return
+
+        def apply(state: Dict[str, Any]) -> None:
+            now = self._clock()
+            self._roll_day(state, now)
+            if used is not None:
+                state["points_used"] = used
+            if left is not None:
+                state["quota_left"] = left
+            if status_code == 429:
+                # Upstream disagrees with our bucket: drain it and honor Retry-After
+                state["tokens"] = 0.0
+                state["updated_at"] = now
+                state["blocked_until"] = now + (retry_after or 1.0 / self.rate)
+
+        self._store.update(apply)
+
+    def stats(self) -> Dict[str, Any]:
+        state = self._store.update(lambda s: dict(s))
+        return {
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "waited_seconds": round(self.waited_seconds, 3),
+            "tokens": state.get("tokens"),
+            "points_used": state.get("points_used", 0.0),
+            "quota_left": state.get("quota_left"),
+            "points_per_day": self.points_per_day,
+        }
+
+    # ---------- Internal Helpers ----------
+
+    def _roll_day(self, state: Dict[str, Any], now: float) -> None:
+        day = _utc_day(now)
+        if state.get("day") != day:
+            state["day"] = day
+            state["points_used"] = 0.0
+            state["quota_left"] = None
+
+    def _try_take(self, state: Dict[str, Any], points: float) -> Tuple[float, Optional[str]]:
+        """Returns (0, None) on success, else (seconds to wait, reason if waiting cannot help)."""
+        now = self._clock()
+        self._roll_day(state, now)
+
+        blocked_until = state.get("blocked_until") or 0.0
+        if blocked_until > now:
+            return blocked_until - now, None
+
+        used = state.get("points_used", 0.0)
+        if self.points_per_day is not None and used + points > self.points_per_day - self.reserve_points:
+            return self._seconds_to_reset(now), "Spoonacular daily points budget exhausted."
+        left = state.get("quota_left")
+        if left is not None and left - points < self.reserve_points:
+            return self._seconds_to_reset(now), "Spoonacular quota exhausted for today."
+
+        tokens = state.get("tokens", self.burst)
+        updated_at = state.get("updated_at", now)
+        tokens = min(self.burst, tokens + max(0.0, now - updated_at) * self.rate)
+        state["updated_at"] = now
+        if tokens >= 1.0:
+            state["tokens"] = tokens - 1.0
+            state["points_used"] = used + points
+            if left is not None:
+                state["quota_left"] = left - points
+            return 0.0, None
+        state["tokens"] = tokens
+        return (1.0 - tokens) / self.rate, None
+
+    @staticmethod
+    def _seconds_to_reset(now: float) -> float:
+        return 86400 - (now % 86400)
+
+
+_shared_limiter: Optional[RateLimiter] = None
+_shared_lock = threading.Lock()
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """
+    Process-wide limiter, or None when disabled.
+    Enabled by SPOONACULAR_RATE_LIMIT=1. Tuned with SPOONACULAR_RPS, SPOONACULAR_BURST,
+    SPOONACULAR_DAILY_POINTS and SPOONACULAR_RATE_LIMIT_STATE (SQLite file shared by processes).
+    """
+    global _shared_limiter
+    if os.getenv("SPOONACULAR_RATE_LIMIT", "").lower() not in ("1", "true", "yes"):
+        return None
+    if _shared_limiter is None:
+        with _shared_lock:
+            if _shared_limiter is None:
+                daily = os.getenv("SPOONACULAR_DAILY_POINTS")
+                burst = os.getenv("SPOONACULAR_BURST")
+                _shared_limiter = RateLimiter(
+                    requests_per_second=float(os.getenv("SPOONACULAR_RPS", "5")),
+                    burst=float(burst) if burst else None,
+                    points_per_day=float(daily) if daily else None,
+                    state_path=os.getenv("SPOONACULAR_RATE_LIMIT_STATE") or None,
+                )
+    return _shared_limiter
@@ -0,0 +1,323 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from services.ingredients import canonical_ingredient, canonicalize_ingredients, singularize
+from services.metrics import register_cache
+from services.persistent_cache import get_persistent_cache
+
+logger = logging.getLogger(__name__)
+
+RANK_MAXIMIZE_USED = 1
+RANK_MINIMIZE_MISSING = 2
+
+# What Spoonacular leaves out of missed counts when ignorePantry=true
+PANTRY_STAPLES = frozenset({
+    "water", "ice", "salt", "pepper", "black pepper", "salt and pepper", "flour",
+    "all purpose flour", "sugar", "oil", "olive oil", "vegetable oil",
+    "baking soda", "baking powder",
+})
+
+FIND_ENDPOINT = "recipes/findByIngredients"
+INFORMATION_ENDPOINTS = ("recipes/information", "recipes/informationBulk")
+
+
+class _Recipe:
+    __slots__ = ("id", "title", "image", "image_type", "likes", "ingredients", "names", "staple_mask", "indexed_at")
+
+    def __init__(self, recipe_id: int, indexed_at: float):
+        self.id = recipe_id
+        self.title: Optional[str] = None
+        self.image: Optional[str] = None
+        self.image_type: Optional[str] = None
+        self.likes = 0
+        # Upstream ingredient dicts in index order; bit i of a mask refers to ingredients[i]
+        self.ingredients: List[Dict[str, Any]] = []
+        self.names: List[str] = []
+        self.staple_mask = 0
+        self.indexed_at = indexed_at
+
+
+class RecipeIndex:
+    """
+    In-memory recipe corpus with an ingredient-token inverted index.
+
+    Each posting list maps a token ("tomato") to {recipe_id: bitmask}, where the
+    bitmask marks which of that recipe's ingredients contain the token. A query
+    ingredient matches a recipe ingredient when all of its tokens do, so
+    "tomato" matches "cherry tomato" and "chicken breast" matches
+    "boneless chicken breast", much like upstream's matching. OR-ing the masks
+    of every query ingredient gives the recipe's used ingredients in one pass
+    over the postings, without touching recipes that share nothing with the query.
+
+    The corpus is filled from findByIngredients and recipe information payloads,
+    so search() can answer repeated suggest queries without an upstream call.
+    """
+
+    def __init__(self, max_recipes: int = 50_000, clock: Callable[[], float] = time.time):
+        self.max_recipes = max_recipes
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._recipes: "OrderedDict[int, _Recipe]" = OrderedDict()
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    # ---------- Public API ----------
+
+    def add_find_results(self, items: Iterable[Dict[str, Any]], indexed_at: Optional[float] = None) -> int:
+        """Index findByIngredients items (used + missed ingredients). Returns how many were indexed."""
+        count = 0
+        for item in items or []:
+            if not isinstance(item, dict) or item.get("id") is None:
+                continue
+            ingredients = list(item.get("usedIngredients") or []) + list(item.get("missedIngredients") or [])
+            self._add(item, ingredients, item.get("likes"), indexed_at)
+            count += 1
+        return count
+
+    def add_information(self, infos: Union[Dict[str, Any], Iterable[Dict[str, Any]]], indexed_at: Optional[float] = None) -> int:
+        """Index recipe information payloads (single or bulk). Returns how many were indexed."""
+        if isinstance(infos, dict):
+            infos = [infos]
+        count = 0
+        for info in infos or []:
+            if not isinstance(info, dict) or info.get("id") is None or not info.get("extendedIngredients"):
+                continue
+            self._add(info, info["extendedIngredients"], info.get("aggregateLikes"), indexed_at)
+            count += 1
+        return count
+
+    def search(
+        self,
+        ingredients: Union[str, Iterable[str]],
+        number: int = 10,
+        ranking: int = RANK_MAXIMIZE_USED,
+        ignore_pantry: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Local findByIngredients. Returns items in the upstream shape, including
+        usedIngredientCount / missedIngredientCount, ordered like upstream:
+        ranking=1 maximizes used ingredients, ranking=2 minimizes missing ones.
+        """
+        return [item for item, _ in self._search(ingredients, number, ranking, ignore_pantry)]
+
+    def lookup(
+        self,
+        ingredients: Union[str, Iterable[str]],
+        number: int = 10,
+        ranking: int = RANK_MAXIMIZE_USED,
+        ignore_pantry: bool = False,
+        max_age_seconds: Optional[float] = None,
+        min_results: Optional[int] = None,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        search(), but None when the local answer is not good enough: fewer than
+        min_results (default: number) matches, or any match older than max_age_seconds.
+        Callers fall back to upstream on None.
+        """
+        needed = number if min_results is None else min_results
+        found = self._search(ingredients, number, ranking, ignore_pantry)
+        now = self._clock()
+        if len(found) < needed or (
+            max_age_seconds is not None and any(now - indexed_at > max_age_seconds for _, indexed_at in found)
+        ):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return [item for item, _ in found]
+
+    def load_from_cache(self, cache) -> int:
+        """Bootstrap from a persistent response cache (SQLiteCache). Returns recipes indexed."""
+        count = 0
+        for payload, created_at in cache.iter_payloads(FIND_ENDPOINT):
+            count += self.add_find_results(payload if isinstance(payload, list) else [], indexed_at=created_at)
+        for endpoint in INFORMATION_ENDPOINTS:
+            for payload, created_at in cache.iter_payloads(endpoint):
+                count += self.add_information(payload, indexed_at=created_at)
+        return count
+
+    def ingredient_lists(self) -> List[Tuple[int, List[str]]]:
+        """Snapshot of (recipe_id, canonical ingredient names) for every indexed recipe."""
+        with self._lock:
+            return [(recipe.id, list(recipe.names)) for recipe in self._recipes.values()]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._recipes.clear()
+            self._postings.clear()
+
+    def __len__(self) -> int:
+        return len(self._recipes)
+
+    def __contains__(self, recipe_id: int) -> bool:
+        return recipe_id in self._recipes
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "recipes": len(self._recipes),
+                "tokens": len(self._postings),
+                "postings": sum(len(p) for p in self._postings.values()),
+                "max_recipes": self.max_recipes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    # ---------- Internal Helpers ----------
+
+    def _add(self, payload: Dict[str, Any], ingredients: Iterable[Dict[str, Any]], likes: Any, indexed_at: Optional[float]) -> None:
+        recipe_id = int(payload["id"])
+        indexed_at = self._clock() if indexed_at is None else indexed_at
+        with self._lock:
+            existing = self._recipes.get(recipe_id)
+            if existing is not None and existing.indexed_at > indexed_at:
+                # Never let an older cached payload overwrite a fresher one
+                return
+            recipe = _Recipe(recipe_id, indexed_at)
+            recipe.title = payload.get("title")
+            recipe.image = payload.get("image")
+            recipe.image_type = payload.get("imageType")
+            recipe.likes = likes if isinstance(likes, int) else 0
+            for ing in ingredients:
+                name = canonical_ingredient(ing.get("name") or "") if isinstance(ing, dict) else ""
+                if not name or name in recipe.names:
+                    continue
+                if name in PANTRY_STAPLES:
+                    recipe.staple_mask |= 1 << len(recipe.names)
+                recipe.names.append(name)
+                recipe.ingredients.append(ing)
+
+            if existing is not None:
+                self._unindex(existing)
+                del self._recipes[recipe_id]
+            self._recipes[recipe_id] = recipe
+            for bit, name in enumerate(recipe.names):
+                for token in _tokens(name):
+                    posting = self._postings.setdefault(token, {})
+                    posting[recipe_id] = posting.get(recipe_id, 0) | (1 << bit)
+
+            while len(self._recipes) > self.max_recipes:
+                _, evicted = self._recipes.popitem(last=False)
+                self._unindex(evicted)
+
+    def _unindex(self, recipe: _Recipe) -> None:
+        for name in recipe.names:
+            for token in _tokens(name):
+                posting = self._postings.get(token)
+                if posting is None:
+                    continue
+                posting.pop(recipe.id, None)
+                if not posting:
+                    del self._postings[token]
+
+    def _search(
+        self,
+        ingredients: Union[str, Iterable[str]],
+        number: int,
+        ranking: int,
+        ignore_pantry: bool,
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        query = canonicalize_ingredients(ingredients)
+        if not query or number <= 0:
+            return []
+        with self._lock:
+            used_masks: Dict[int, int] = {}
+            for term in query:
+                for recipe_id, mask in self._match(term).items():
+                    used_masks[recipe_id] = used_masks.get(recipe_id, 0) | mask
+
+            scored = []
+            for recipe_id, used_mask in used_masks.items():
+                recipe = self._recipes[recipe_id]
+                all_mask = (1 << len(recipe.names)) - 1
+                missed_mask = all_mask & ~used_mask
+                if ignore_pantry:
+                    missed_mask &= ~recipe.staple_mask
+                used, missed = used_mask.bit_count(), missed_mask.bit_count()
+                if ranking == RANK_MINIMIZE_MISSING:
+                    key = (missed, -used, -recipe.likes, recipe_id)
+                else:
+                    key = (-used, missed, -recipe.likes, recipe_id)
+                scored.append((key, recipe, used_mask, missed_mask))
+
+            scored.sort(key=lambda entry: entry[0])
+            return [
+                (_to_item(recipe, used_mask, missed_mask, query), recipe.indexed_at)
+                for _, recipe, used_mask, missed_mask in scored[:number]
+            ]
+
+    def _match(self, term: str) -> Dict[int, int]:
+        """{recipe_id: mask of ingredients containing every token of term}."""
+        tokens = _tokens(term)
+        postings = [self._postings.get(token) for token in tokens]
+        if not postings or any(p is None for p in postings):
+            return {}
+        postings.sort(key=len)
+        matched = dict(postings[0])
+        for posting in postings[1:]:
+            matched = {rid: mask & posting[rid] for rid, mask in matched.items() if rid in posting}
+            matched = {rid: mask for rid, mask in matched.items() if mask}
+        return matched
+
+
+def _tokens(name: str) -> List[str]:
+    return [singularize(word) for word in name.split(" ") if word]
+
+
+def _to_item(recipe: _Recipe, used_mask: int, missed_mask: int, query: List[str]) -> Dict[str, Any]:
+    used = [ing for bit, ing in enumerate(recipe.ingredients) if used_mask >> bit & 1]
+    missed = [ing for bit, ing in enumerate(recipe.ingredients) if missed_mask >> bit & 1]
+    used_names = [name for bit, name in enumerate(recipe.names) if used_mask >> bit & 1]
+    unused = [
+        {"name": term}
+        for term in query
+        if not any(set(_tokens(term)) <= set(_tokens(name)) for name in used_names)
+    ]
+    return {
+        "id": recipe.id,
+        "title": recipe.title,
+        "image": recipe.image,
+        "imageType": recipe.image_type,
+        "usedIngredientCount": len(used),
+        "missedIngredientCount": len(missed),
+        "usedIngredients": used,
+        "missedIngredients": missed,
+        "unusedIngredients": unused,
+        "likes": recipe.likes,
+    }
+
+
+_shared_index: Optional[RecipeIndex] = None
+_shared_lock = threading.Lock()
+
+
+def local_index_max_age() -> float:
+    """Seconds a locally indexed recipe may answer queries (SPOONACULAR_LOCAL_INDEX_MAX_AGE, default 6h)."""
+    return float(os.getenv("SPOONACULAR_LOCAL_INDEX_MAX_AGE", str(60 * 60 * 6)))
+
+
+def get_recipe_index() -> Optional[RecipeIndex]:
+    """
+    Process-wide local index, or None when disabled.
+    Enabled by SPOONACULAR_LOCAL_INDEX=1; bootstrapped from the persistent cache when one is configured.
+    """
+    global _shared_index
+    if os.getenv("SPOONACULAR_LOCAL_INDEX", "").lower() not in ("1", "true", "yes"):
+        return None
+    if _shared_index is None:
+        with _shared_lock:
+            if _shared_index is None:
+                index = RecipeIndex(max_recipes=int(os.getenv("SPOONACULAR_LOCAL_INDEX_MAX_RECIPES", "50000")))
+                disk = get_persistent_cache()
+                if disk is not None:
+                    loaded = index.load_from_cache(disk)
+                    logger.info("Local recipe index loaded %d recipes from the persistent cache", loaded)
+                register_cache("recipe_index", index, entries_key="recipes")
+                _shared_index = index
+    return _shared_index
@@ -0,0 +1,297 @@
+from __future__ import annotations
+
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # optional dependency: pip install numpy scipy
+    np = None
+    sparse = None
+
+from services.ingredients import canonical_ingredient, canonicalize_ingredients
+from services.recipe_index import PANTRY_STAPLES, RANK_MINIMIZE_MISSING, _tokens
+
+Pantry = Union[str, Iterable[str]]
+
+# Pantry x recipe cells per block on the sparse backend. Each block's dense
+# intermediates are a handful of float32 arrays of this size (~16 MB each),
+# whatever the batch size.
+SCORE_BLOCK_CELLS = 4_000_000
+
+
+class Scores:
+    """Per-recipe results for one pantry, aligned with ScoringMatrix.recipe_ids."""
+
+    __slots__ = ("used", "missed", "coverage")
+
+    def __init__(self, used: Sequence[int], missed: Sequence[int], coverage: Sequence[float]):
+        self.used = used
+        self.missed = missed
+        self.coverage = coverage
+
+
+class ScoringMatrix:
+    """
+    Recipe x ingredient incidence matrix for scoring pantries in bulk.
+
+    For each recipe r and pantry p:
+      used[r]     = ingredients of r found in p
+      missed[r]   = ingredients of r not in p (pantry staples excluded with ignore_pantry)
+      coverage[r] = weight of used ingredients / weight of all of r's ingredients
+
+    With numpy and scipy installed the matrix is a CSR sparse matrix and a block
+    of pantries is scored with one sparse product. Without them each
+    recipe row is an int bitmask over the ingredient vocabulary and scoring is
+    an AND plus popcount per recipe, which is still far cheaper than walking
+    ingredient lists. A pantry item matches an ingredient the way RecipeIndex
+    does: "tomato" covers "cherry tomato".
+    """
+
+    def __init__(
+        self,
+        recipes: Iterable[Tuple[int, Iterable[str]]],
+        weights: Optional[Dict[str, float]] = None,
+        backend: Optional[str] = None,
+    ):
+        if backend is None:
+            backend = "sparse" if sparse is not None else "python"
+        if backend == "sparse" and sparse is None:
+            raise RuntimeError("numpy and scipy are required for the sparse backend: pip install numpy scipy")
+        self.backend = backend
+
+        self.recipe_ids: List[int] = []
+        self.vocabulary: Dict[str, int] = {}
+        rows: List[List[int]] = []
+        for recipe_id, names in recipes:
+            cols = []
+            for name in names:
+                name = canonical_ingredient(name)
+                if name:
+                    col = self.vocabulary.setdefault(name, len(self.vocabulary))
+                    if col not in cols:
+                        cols.append(col)
+            self.recipe_ids.append(recipe_id)
+            rows.append(cols)
+
+        # Token -> columns, so pantry items resolve to every ingredient they cover
+        self._token_cols: Dict[str, set] = {}
+        for name, col in self.vocabulary.items():
+            for token in _tokens(name):
+                self._token_cols.setdefault(token, set()).add(col)
+
+        weights = weights or {}
+        self._weights = [float(weights.get(name, 1.0)) for name in self.vocabulary]
+        self._staple_cols = {col for name, col in self.vocabulary.items() if name in PANTRY_STAPLES}
+
+        if self.backend == "sparse":
+            self._build_sparse(rows)
+        else:
+            self._build_masks(rows)
+
+    # ---------- Constructors ----------
+
+    @classmethod
+    def from_index(cls, index, **kwargs: Any) -> "ScoringMatrix":
+        """Matrix over every recipe currently in a RecipeIndex."""
+        return cls(index.ingredient_lists(), **kwargs)
+
+    @classmethod
+    def from_recipes(cls, items: Iterable[Dict[str, Any]], **kwargs: Any) -> "ScoringMatrix":
+        """Matrix over upstream-shaped recipes (findByIngredients items or recipe information)."""
+        return cls(((item["id"], recipe_ingredient_names(item)) for item in items if item.get("id") is not None), **kwargs)
+
+    # ---------- Public API ----------
+
+    def __len__(self) -> int:
+        return len(self.recipe_ids)
+
+    def pantry_columns(self, pantry: Pantry) -> List[int]:
+        """Vocabulary columns covered by the pantry items."""
+        cols: set = set()
+        for term in canonicalize_ingredients(pantry):
+            token_sets = [self._token_cols.get(token) for token in _tokens(term)]
+            if token_sets and all(token_sets):
+                cols |= set.intersection(*token_sets)
+        return sorted(cols)
+
+    def score(self, pantry: Pantry, ignore_pantry: bool = False) -> Scores:
+        """Score every recipe against one pantry."""
+        if self.backend == "sparse":
+            used, missed, coverage = self._score_sparse([self.pantry_columns(pantry)], ignore_pantry)
+            return Scores(used[0], missed[0], coverage[0])
+        return self._score_masks(self.pantry_columns(pantry), ignore_pantry)
+
+    def score_many(self, pantries: Sequence[Pantry], ignore_pantry: bool = False) -> List[Scores]:
+        """
+        Score every recipe against each pantry. The result alone is about 12 bytes
+        per pantry x recipe; use iter_scores() to stream large batches instead.
+        """
+        return list(self.iter_scores(pantries, ignore_pantry))
+
+    def iter_scores(self, pantries: Iterable[Pantry], ignore_pantry: bool = False) -> Iterator[Scores]:
+        """
+        Lazily score each pantry, in order. The sparse backend takes pantries a
+        block at a time (SCORE_BLOCK_CELLS pantry x recipe cells, one product per
+        block), so memory stays flat however many pantries stream through as
+        long as the caller does not keep every Scores.
+        """
+        if self.backend != "sparse":
+            for pantry in pantries:
+                yield self.score(pantry, ignore_pantry)
+            return
+        block = max(1, SCORE_BLOCK_CELLS // max(1, len(self.recipe_ids)))
+        pantries = iter(pantries)
+        while True:
+            pantry_cols = [self.pantry_columns(p) for p in islice(pantries, block)]
+            if not pantry_cols:
+                return
+            used, missed, coverage = self._score_sparse(pantry_cols, ignore_pantry)
+            for i in range(len(pantry_cols)):
+                yield Scores(used[i], missed[i], coverage[i])
+
+    def rank(
+        self,
+        pantry: Pantry,
+        number: int = 10,
+        ranking: int = 1,
+        ignore_pantry: bool = False,
+        min_used: int = 1,
+    ) -> List[Dict[str, Any]]:
+        """
+        Best recipes for a pantry, ordered like findByIngredients (ranking=1 most
+        used first, ranking=2 fewest missing first), ties broken by coverage.
+        """
+        scores = self.score(pantry, ignore_pantry)
+        if self.backend == "sparse":
+            ids = np.asarray(self.recipe_ids)
+            keep = np.nonzero(scores.used >= min_used)[0]
+            used, missed, coverage = scores.used[keep], scores.missed[keep], scores.coverage[keep]
+            # np.lexsort sorts by the last key first
+            if ranking == RANK_MINIMIZE_MISSING:
+                order = np.lexsort((ids[keep], -coverage, -used, missed))
+            else:
+                order = np.lexsort((ids[keep], -coverage, missed, -used))
+            candidates = keep[order[:number]].tolist()
+        else:
+            candidates = [i for i in range(len(self.recipe_ids)) if scores.used[i] >= min_used]
+            if ranking == RANK_MINIMIZE_MISSING:
+                candidates.sort(key=lambda i: (scores.missed[i], -scores.used[i], -scores.coverage[i], self.recipe_ids[i]))
+            else:
+                candidates.sort(key=lambda i: (-scores.used[i], scores.missed[i], -scores.coverage[i], self.recipe_ids[i]))
+            candidates = candidates[:number]
+        return [
+            {
+                "id": self.recipe_ids[i],
+                "usedIngredientCount": int(scores.used[i]),
+                "missedIngredientCount": int(scores.missed[i]),
+                "coverage": float(scores.coverage[i]),
+            }
+            for i in candidates
+        ]
+
+    # ---------- Internal Helpers ----------
+
+    def _build_sparse(self, rows: List[List[int]]) -> None:
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(cols) for cols in rows])
+        indices = np.fromiter((c for cols in rows for c in cols), dtype=np.int32, count=int(indptr[-1]))
+        data = np.ones(len(indices), dtype=np.float32)
+        self._matrix = sparse.csr_matrix((data, indices, indptr), shape=(len(rows), len(self.vocabulary)))
+        self._matrix_t = self._matrix.T.tocsr()
+        weights = np.asarray(self._weights, dtype=np.float32)
+        non_staple = np.ones(len(self.vocabulary), dtype=np.float32)
+        non_staple[list(self._staple_cols)] = 0
+        self._weight_diag = sparse.diags(weights)
+        self._non_staple_diag = sparse.diags(non_staple)
+        self._row_counts = np.diff(indptr).astype(np.float32)
+        self._row_non_staple = self._matrix @ non_staple
+        self._row_weight = self._matrix @ weights
+
+    def _score_sparse(self, pantry_cols: List[List[int]], ignore_pantry: bool):
+        n_pantries, n_cols = len(pantry_cols), len(self.vocabulary)
+        indptr = np.zeros(n_pantries + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(cols) for cols in pantry_cols])
+        indices = np.fromiter((c for cols in pantry_cols for c in cols), dtype=np.int32, count=int(indptr[-1]))
+        pantries = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.float32), indices, indptr), shape=(n_pantries, n_cols)
+        )
+        matrix_t = self._matrix_t
+        # (pantries x ingredients) @ (ingredients x recipes): one product per quantity for the block
+        used = (pantries @ matrix_t).toarray()
+        weighted = (pantries @ self._weight_diag @ matrix_t).toarray()
+        if ignore_pantry:
+            used_non_staple = (pantries @ self._non_staple_diag @ matrix_t).toarray()
+            missed = self._row_non_staple[None, :] - used_non_staple
+        else:
+            missed = self._row_counts[None, :] - used
+        with np.errstate(divide="ignore", invalid="ignore"):
+            coverage = np.where(self._row_weight > 0, weighted / self._row_weight, 0.0)
+        return used.astype(np.int32), missed.astype(np.int32), coverage
+
+    def _build_masks(self, rows: List[List[int]]) -> None:
+        self._masks = [sum(1 << c for c in cols) for cols in rows]
+        self._staple_mask = sum(1 << c for c in self._staple_cols)
+        self._row_weight_list = [sum(self._weights[c] for c in cols) for cols in rows]
+        self._uniform = all(w == 1.0 for w in self._weights)
+
+    def _score_masks(self, pantry_cols: List[int], ignore_pantry: bool) -> Scores:
+        pantry = sum(1 << c for c in pantry_cols)
+        keep = ~self._staple_mask if ignore_pantry else -1
+        used, missed, coverage = [], [], []
+        for mask, total_weight in zip(self._masks, self._row_weight_list):
+            hit = mask & pantry
+            n_used = hit.bit_count()
+            used.append(n_used)
+            missed.append((mask & ~pantry & keep).bit_count())
+            if not total_weight:
+                coverage.append(0.0)
+            elif self._uniform:
+                coverage.append(n_used / total_weight)
+            else:
+                coverage.append(sum(self._weights[c] for c in pantry_cols if hit >> c & 1) / total_weight)
+        return Scores(used, missed, coverage)
+
+
+def recipe_ingredient_names(item: Dict[str, Any]) -> List[str]:
+    """Ingredient names of an upstream recipe (information or findByIngredients shape)."""
+    if item.get("extendedIngredients"):
+        ingredients = item["extendedIngredients"]
+    else:
+        ingredients = list(item.get("usedIngredients") or []) + list(item.get("missedIngredients") or [])
+    names = []
+    for ing in ingredients:
+        name = ing.get("name") if isinstance(ing, dict) else ing
+        if isinstance(name, str) and name:
+            names.append(name)
+    return names
+
+
+def score_recipes(
+    recipes: List[Dict[str, Any]],
+    pantry: Pantry,
+    ignore_pantry: bool = False,
+    weights: Optional[Dict[str, float]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Annotate upstream-shaped recipes with usedIngredientCount, missedIngredientCount
+    and coverage for one pantry. Returns new dicts in the input order.
+    """
+    if not recipes:
+        return []
+    matrix = ScoringMatrix.from_recipes(recipes, weights=weights)
+    scores = matrix.score(pantry, ignore_pantry)
+    annotated, row = [], 0
+    for recipe in recipes:
+        if recipe.get("id") is None:
+            annotated.append(dict(recipe))
+            continue
+        annotated.append({
+            **recipe,
+            "usedIngredientCount": int(scores.used[row]),
+            "missedIngredientCount": int(scores.missed[row]),
+            "coverage": float(scores.coverage[row]),
+        })
+        row += 1
+    return annotated
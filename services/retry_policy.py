@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import logging
+import os
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from services.timing import span
+
+logger = logging.getLogger(__name__)
+
+# Absolute time.monotonic() by which the current request must be answered
+_request_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+DEFAULT_REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "10"))
+
+
+# ---------- Request deadlines ----------
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current request's deadline, or None when no deadline is set."""
+    deadline = _request_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+@contextmanager
+def deadline_scope(seconds: float) -> Iterator[None]:
+    """Run a block under a deadline. Nested scopes can only shorten the outer deadline."""
+    deadline = time.monotonic() + seconds
+    outer = _request_deadline.get()
+    token = _request_deadline.set(deadline if outer is None else min(outer, deadline))
+    try:
+        yield
+    finally:
+        _request_deadline.reset(token)
+
+
+def init_app(app) -> None:
+    """
+    Give every Flask request a deadline that upstream calls and retries respect.
+    Defaults to REQUEST_DEADLINE_SECONDS; clients may shorten it with an
+    X-Request-Timeout header (seconds).
+    """
+    from flask import g, request
+
+    app.config.setdefault("REQUEST_DEADLINE_SECONDS", DEFAULT_REQUEST_DEADLINE_SECONDS)
+
+    @app.before_request
+    def _start_deadline():
+        seconds = float(app.config["REQUEST_DEADLINE_SECONDS"])
+        try:
+            requested = float(request.headers.get("X-Request-Timeout", ""))
+            if requested > 0:
+                seconds = min(seconds, requested)
+        except ValueError:
+            pass
+        g._deadline_token = _request_deadline.set(time.monotonic() + seconds)
+
+    @app.teardown_request
+    def _end_deadline(exc=None):
+        token = g.pop("_deadline_token", None)
+        if token is not None:
+            try:
+                _request_deadline.reset(token)
+            except ValueError:
+                # Reset from a different context (e.g. streamed response); just clear it
+                _request_deadline.set(None)
+
+
+# ---------- Retry policy ----------
+
+class RetryPolicy:
+    """
+    One retry policy for every Spoonacular client.
+
+    - Full-jitter exponential backoff: sleep = uniform(0, min(max_delay, base_delay * 2**(attempt-1))).
+    - Retry-After is honored up to retry_after_cap; longer waits give up instead of blocking a worker.
+    - Never sleeps past the request deadline (see deadline_scope / init_app).
+    - Retry budget: retries may be at most budget_ratio of attempts in the last
+      budget_window_seconds (plus min_retries_per_window), so an outage does not multiply load.
+    Every decision is counted in `decisions` and exposed via stats().
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 4.0,
+        retry_after_cap: float = 5.0,
+        budget_ratio: float = 0.2,
+        min_retries_per_window: int = 10,
+        budget_window_seconds: float = 60.0,
+        rand: Callable[[], float] = random.random,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_after_cap = retry_after_cap
+        self.budget_ratio = budget_ratio
+        self.min_retries_per_window = min_retries_per_window
+        self.budget_window_seconds = budget_window_seconds
+        self._rand = rand
+        self._clock = clock
+        self._sleep = sleep
+
+        self._lock = threading.Lock()
+        self._window_start = clock()
+        self._window_attempts = 0
+        self._window_retries = 0
+        self.decisions: Counter = Counter()
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        return cls(
+            max_attempts=int(os.getenv("SPOONACULAR_MAX_ATTEMPTS", "3")),
+            base_delay=float(os.getenv("SPOONACULAR_RETRY_BASE_DELAY", "0.5")),
+            max_delay=float(os.getenv("SPOONACULAR_RETRY_MAX_DELAY", "4")),
+            retry_after_cap=float(os.getenv("SPOONACULAR_RETRY_AFTER_CAP", "5")),
+            budget_ratio=float(os.getenv("SPOONACULAR_RETRY_BUDGET_RATIO", "0.2")),
+        )
+
+    @staticmethod
+    def is_retryable_status(status_code: int) -> bool:
+        return status_code == 429 or 500 <= status_code < 600
+
+    def begin_attempt(self, default_timeout: float) -> Optional[float]:
+        """
+        Call before each HTTP attempt. Returns the socket timeout to use (clamped
+        to the request deadline), or None when the deadline has already passed.
+        """
+        remaining = remaining_time()
+        if remaining is not None and remaining <= 0:
+            self._record("give_up", "deadline")
+            return None
+        with self._lock:
+            self._roll_window()
+            self._window_attempts += 1
+        return default_timeout if remaining is None else min(default_timeout, remaining)
+
+    def next_delay(
+        self,
+        attempt: int,
+        status_code: Optional[int] = None,
+        retry_after: Any = None,
+    ) -> Optional[float]:
+        """
+        Decide whether attempt number `attempt` (1-based) may be retried.
+        Returns seconds to sleep before the next attempt, or None to give up.
+        status_code is None for network errors/timeouts.
+        """
+        if status_code is not None and not self.is_retryable_status(status_code):
+            return self._record("give_up", "not_retryable")
+        if attempt >= self.max_attempts:
+            return self._record("give_up", "attempts")
+
+        retry_after_s = _parse_retry_after(retry_after)
+        if retry_after_s is not None:
+            if retry_after_s > self.retry_after_cap:
+                return self._record("give_up", "retry_after_cap")
+            delay = retry_after_s
+        else:
+            delay = self._rand() * min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+
+        remaining = remaining_time()
+        if remaining is not None and delay >= remaining:
+            return self._record("give_up", "deadline")
+
+        with self._lock:
+            self._roll_window()
+            allowed = max(self.min_retries_per_window, self.budget_ratio * self._window_attempts)
+            if self._window_retries + 1 > allowed:
+                exhausted = True
+            else:
+                exhausted = False
+                self._window_retries += 1
+        if exhausted:
+            return self._record("give_up", "budget")
+
+        reason = "network" if status_code is None else str(status_code)
+        self._record("retry", reason)
+        logger.info("Retrying Spoonacular call (attempt %d, reason %s) in %.2fs", attempt, reason, delay)
+        return delay
+
+    def sleep(self, seconds: float) -> None:
+        """Back off before a retry; shows up as spoonacular_wait in Server-Timing."""
+        with span("spoonacular_wait"):
+            self._sleep(seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "decisions": {f"{outcome}:{reason}": n for (outcome, reason), n in self.decisions.items()},
+                "window_attempts": self._window_attempts,
+                "window_retries": self._window_retries,
+            }
+
+    # ---------- Internal Helpers ----------
+
+    def _roll_window(self) -> None:
+        now = self._clock()
+        if now - self._window_start >= self.budget_window_seconds:
+            self._window_start = now
+            self._window_attempts = 0
+            self._window_retries = 0
+
+    def _record(self, outcome: str, reason: str) -> None:
+        with self._lock:
+            self.decisions[(outcome, reason)] += 1
+        return None
+
+
+def _parse_retry_after(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        # HTTP-date form is rare from Spoonacular; fall back to normal backoff
+        return None
+    return max(0.0, seconds)
+
+
+_shared_policy: Optional[RetryPolicy] = None
+_shared_lock = threading.Lock()
+
+
+def get_retry_policy() -> RetryPolicy:
+    """Process-wide retry policy configured from SPOONACULAR_* environment variables."""
+    global _shared_policy
+    if _shared_policy is None:
+        with _shared_lock:
+            if _shared_policy is None:
+                _shared_policy = RetryPolicy.from_env()
+    return _shared_policy
@@ -6,9 +6,23 @@ from typing import List, Optional, Dict, Any
 
 import requests
 
+from services.circuit_breaker import CircuitBreaker, get_circuit_breaker
+from services.http_session import get_session
+from services.ingredients import canonicalize_ingredients
+from services.metrics import record_retry, record_upstream
+from services.persistent_cache import SQLiteCache, get_persistent_cache, make_key
+from services.rate_limiter import RateLimiter, RateLimitExceeded, get_rate_limiter
+from services.recipe_index import RecipeIndex, get_recipe_index, local_index_max_age
+from services.retry_policy import RetryPolicy, get_retry_policy
+from services.singleflight import SingleFlight
+from services.timing import timed
+
 DEFAULT_BASE_URL = os.getenv("SPOONACULAR_BASE_URL", "https://api.spoonacular.com")
 FIND_BY_INGREDIENTS_PATH = "/recipes/findByIngredients"
 
+# Shared by every client instance so concurrent identical requests coalesce process-wide
+_flight = SingleFlight("spoonacular_client")
+
 
 class SpoonacularConfigError(Exception):
     # Raised when Spoonacular configuration is invalid or missing.
@@ -31,12 +45,28 @@ class SpoonacularClient:
         timeout_seconds: float = 10.0,
         max_retries: int = 3,
         backoff_seconds: float = 1.0,
+        cache: Optional[SQLiteCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        session: Optional[requests.Session] = None,
+        recipe_index: Optional[RecipeIndex] = None,
     ):
         self.api_key = api_key or os.getenv("SPOONACULAR_API_KEY")
         self.base_url = base_url or DEFAULT_BASE_URL
         self.timeout_seconds = timeout_seconds
         self.max_retries = max_retries
         self.backoff_seconds = backoff_seconds
+        # Successful JSON responses are shared across workers when a persistent cache is configured
+        self.cache = cache if cache is not None else get_persistent_cache()
+        self.rate_limiter = rate_limiter if rate_limiter is not None else get_rate_limiter()
+        # Answers repeat queries from recipes already seen, before any upstream call
+        self.recipe_index = recipe_index if recipe_index is not None else get_recipe_index()
+        if retry_policy is None and (max_retries, backoff_seconds) != (3, 1.0):
+            # Explicit legacy knobs get a private policy with the same attempt count and base delay
+            retry_policy = RetryPolicy(max_attempts=max_retries, base_delay=backoff_seconds)
+        self.retry_policy = retry_policy or get_retry_policy()
+        self.circuit_breaker = circuit_breaker or get_circuit_breaker()
 
         if not self.api_key:
             raise SpoonacularConfigError(
@@ -45,7 +75,8 @@ class SpoonacularClient:
         if not isinstance(self.base_url, str) or not self.base_url.startswith("https://"):
             raise SpoonacularConfigError("Invalid base URL. Must start with 'https://'.")
 
-        self._session = requests.Session()
+        # Shares the process-wide keep-alive pool unless a session is injected
+        self._session = session or get_session()
 
     def find_by_ingredients(
         self,
@@ -55,6 +86,8 @@ class SpoonacularClient:
         ignore_pantry: bool = False,
     ) -> List[Dict[str, Any]]:
         # Calls Spoonacular /recipes/findByIngredients and normalizes results.
+        # Equivalent ingredient lists share one cache key and one upstream call.
+        ingredients = canonicalize_ingredients(ingredients)
         if not ingredients:
             return []
 
@@ -66,95 +99,134 @@ class SpoonacularClient:
             "apiKey": self.api_key,
         }
 
+        if self.recipe_index is not None:
+            local = self.recipe_index.lookup(
+                ingredients, number, ranking, ignore_pantry=ignore_pantry, max_age_seconds=local_index_max_age()
+            )
+            if local is not None:
+                return [_normalize_recipe(item) for item in local]
+
         raw = self._get(FIND_BY_INGREDIENTS_PATH, params=params)
+        if self.recipe_index is not None and isinstance(raw, list):
+            self.recipe_index.add_find_results(raw)
+        return [_normalize_recipe(item) for item in raw]
 
-        normalized: List[Dict[str, Any]] = []
-        for item in raw:
-            normalized.append(
-                {
-                    "id": item.get("id"),
-                    "title": item.get("title"),
-                    "image": item.get("image"),
-                    "source_url": item.get("sourceUrl"),
-                    "used_ingredients": [
-                        ing.get("name") for ing in item.get("usedIngredients", []) if ing.get("name")
-                    ],
-                    "missed_ingredients": [
-                        ing.get("name") for ing in item.get("missedIngredients", []) if ing.get("name")
-                    ],
-                    "likes": item.get("likes"),
-                }
-            )
-        return normalized
-
-
-# ---------- Internal Helpers ----------
-
-def _build_url(self, path: str) -> str:
-    """Safe join without double slashes."""
-    return f"{self.base_url.rstrip('/')}/{path.lstrip('/')}"
-
-def _get(self, path: str, params: Optional[dict] = None) -> Any:
-    """
-    Perform a GET with retries and backoff. Returns JSON if available, else text.
-    Raises SpoonacularAPIError on final failure.
-
-    Requires:
-      - self._session: requests.Session
-      - self.timeout_seconds: float
-      - self.max_retries: int
-      - self.backoff_seconds: float
-      - SpoonacularAPIError: custom exception
-      - _safe_json(response): helper to safely extract JSON payload
-      - _extract_error_message(response): helper to read API error details
-    """
-    url = self._build_url(path)
-
-    for attempt in range(self.max_retries):
-        try:
-            response = self._session.get(
-                url,
-                params=params,
-                timeout=self.timeout_seconds,
-            )
+    # ---------- Internal Helpers ----------
+
+    def _build_url(self, path: str) -> str:
+        """Safe join without double slashes."""
+        return f"{self.base_url.rstrip('/')}/{path.lstrip('/')}"
+
+    @timed("spoonacular")
+    def _get(self, path: str, params: Optional[dict] = None) -> Any:
+        """
+        Cached, coalesced GET. Concurrent callers with the same request share
+        one upstream call (and its result or exception).
+        """
+        if self.cache is not None:
+            cached = self.cache.get(path, params)
+            if cached is not None:
+                return cached
+        return _flight.do(make_key(self._build_url(path), params), self._request, path, params)
+
+    def _request(self, path: str, params: Optional[dict] = None) -> Any:
+        """
+        Perform a GET with retries and backoff. Returns JSON if available, else text.
+        Raises SpoonacularAPIError on final failure.
+
+        Requires:
+          - self._session: requests.Session
+          - self.timeout_seconds: float
+          - self.retry_policy: RetryPolicy
+          - SpoonacularAPIError: custom exception
+          - _safe_json(response): helper to safely extract JSON payload
+          - _extract_error_message(response): helper to read API error details
+        """
+        url = self._build_url(path)
+        policy = self.retry_policy
+
+        attempt = 0
+        while True:
+            attempt += 1
+            timeout = policy.begin_attempt(self.timeout_seconds)
+            if timeout is None:
+                raise SpoonacularAPIError(-1, "Request deadline exceeded before Spoonacular call.")
+            if self.rate_limiter is not None:
+                try:
+                    self.rate_limiter.acquire()
+                except RateLimitExceeded as e:
+                    raise SpoonacularAPIError(
+                        429,
+                        f"Local rate limit: {e}",
+                        payload={"retry_after": e.retry_after},
+                    ) from e
+            if not self.circuit_breaker.allow_request():
+                raise SpoonacularAPIError(503, "Spoonacular circuit is open; skipping upstream call.")
+            started = time.monotonic()
+            try:
+                response = self._session.get(
+                    url,
+                    params=params,
+                    timeout=timeout,
+                )
+            except requests.RequestException as e:
+                elapsed = time.monotonic() - started
+                self.circuit_breaker.record(False, elapsed)
+                record_upstream(_flight.name, path, elapsed, None)
+                # Network errors/timeouts: backoff then retry
+                delay = policy.next_delay(attempt)
+                if delay is not None:
+                    record_retry(_flight.name, path)
+                    policy.sleep(delay)
+                    continue
+
+                # Surface as SpoonacularAPIError with context after final attempt
+                raise SpoonacularAPIError(
+                    -1,
+                    f"Request failed: {e.__class__.__name__}: {str(e)}",
+                    payload={"url": url, "params": params},
+                ) from e
+            except BaseException:
+                # No upstream verdict; just give back a half-open trial slot
+                self.circuit_breaker.release()
+                raise
+
+            elapsed = time.monotonic() - started
+            self.circuit_breaker.record(not policy.is_retryable_status(response.status_code), elapsed)
+            record_upstream(_flight.name, path, elapsed, response.status_code)
+            if self.rate_limiter is not None:
+                self.rate_limiter.record_response(response.status_code, response.headers)
 
             # --- 2xx success ---
             if 200 <= response.status_code < 300:
                 content_type = response.headers.get("Content-Type", "")
                 if "application/json" in content_type:
                     # Prefer JSON when the server signals JSON
-                    return response.json()
-                # Fallback: try JSON, else return text
-                try:
-                    return response.json()
-                except ValueError:
-                    return response.text
-
-            # --- 429: rate limit ---
-            if response.status_code == 429:
-                retry_after = response.headers.get("Retry-After")
-                if retry_after and retry_after.isdigit():
-                    sleep_secs = float(retry_after)
+                    data = response.json()
                 else:
-                    sleep_secs = self.backoff_seconds * (attempt + 1)
+                    # Fallback: try JSON, else return text
+                    try:
+                        data = response.json()
+                    except ValueError:
+                        return response.text
+                if self.cache is not None:
+                    self.cache.set(path, params, data)
+                return data
 
-                if attempt < self.max_retries - 1:
-                    time.sleep(sleep_secs)
-                    continue
-
-                # Exhausted retries for 429
-                raise SpoonacularAPIError(
-                    response.status_code,
-                    "Rate limited by Spoonacular (429). Retries exhausted.",
-                    payload=_safe_json(response),
-                )
-
-            # --- 5xx: server errors ---
-            if 500 <= response.status_code < 600:
-                if attempt < self.max_retries - 1:
-                    time.sleep(self.backoff_seconds * (attempt + 1))
+            # --- 429 / 5xx: retry under the shared policy ---
+            if policy.is_retryable_status(response.status_code):
+                delay = policy.next_delay(attempt, response.status_code, response.headers.get("Retry-After"))
+                if delay is not None:
+                    record_retry(_flight.name, path)
+                    policy.sleep(delay)
                     continue
 
+                if response.status_code == 429:
+                    raise SpoonacularAPIError(
+                        response.status_code,
+                        "Rate limited by Spoonacular (429). Retries exhausted.",
+                        payload=_safe_json(response),
+                    )
                 raise SpoonacularAPIError(
                     response.status_code,
                     f"Server error from Spoonacular ({response.status_code}). "
@@ -169,15 +241,37 @@ def _get(self, path: str, params: Optional[dict] = None) -> Any:
                 payload=_safe_json(response),
             )
 
-        except requests.RequestException as e:
-            # Network errors/timeouts: backoff then retry
-            if attempt < self.max_retries - 1:
-                time.sleep(self.backoff_seconds * (attempt + 1))
-                continue
 
-            # Surface as SpoonacularAPIError with context after final attempt
-            raise SpoonacularAPIError(
-                -1,
-                f"Request failed: {e.__class__.__name__}: {str(e)}",
-                payload={"url": url, "params": params},
-            ) from e
+def _normalize_recipe(item: Dict[str, Any]) -> Dict[str, Any]:
+    """findByIngredients item -> the flat shape our UI consumes."""
+    return {
+        "id": item.get("id"),
+        "title": item.get("title"),
+        "image": item.get("image"),
+        "source_url": item.get("sourceUrl"),
+        "used_ingredients": [
+            ing.get("name") for ing in item.get("usedIngredients", []) if ing.get("name")
+        ],
+        "missed_ingredients": [
+            ing.get("name") for ing in item.get("missedIngredients", []) if ing.get("name")
+        ],
+        "likes": item.get("likes"),
+    }
+
+
+def _safe_json(response: requests.Response) -> dict:
+    """Response body as a dict, or {} when it is not a JSON object."""
+    try:
+        data = response.json()
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {"data": data}
+
+
+def _extract_error_message(response: requests.Response) -> str:
+    """Best-effort human readable error from a Spoonacular error response."""
+    payload = _safe_json(response)
+    message = payload.get("message") or payload.get("status")
+    if message:
+        return str(message)
+    return (response.text or f"HTTP {response.status_code}")[:500]
@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import functools
+import hmac
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING", "true").lower() in ("1", "true", "yes")
+PROFILE_SAMPLE_INTERVAL_SECONDS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5")) / 1000
+# Keeps a runaway request from growing the profile without bound
+PROFILE_MAX_SAMPLES = 20000
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Timings:
+    """
+    Span durations collected for one request, summed per name.
+
+    Thread-safe: worker threads that run in a copy of the request's context
+    (see _fetch_information) add to the same Timings, so parallel spans can
+    sum to more than the request's wall time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # name -> [seconds, count], in first-recorded order
+        self._spans: Dict[str, List[float]] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            entry = self._spans.get(name)
+            if entry is None:
+                self._spans[name] = [seconds, 1]
+            else:
+                entry[0] += seconds
+                entry[1] += 1
+
+    def spans(self) -> Dict[str, List[float]]:
+        with self._lock:
+            return {name: list(entry) for name, entry in self._spans.items()}
+
+    def header(self, total: Optional[float] = None) -> str:
+        """Server-Timing value: spoonacular;dur=812.4;desc="3 calls", total;dur=901.0"""
+        parts = []
+        for name, (seconds, count) in self.spans().items():
+            part = f"{name};dur={seconds * 1000:.1f}"
+            if count > 1:
+                part += f';desc="{int(count)} calls"'
+            parts.append(part)
+        if total is not None:
+            parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[Optional[Timings]] = ContextVar("server_timing", default=None)
+
+
+def current_timings() -> Optional[Timings]:
+    return _current.get()
+
+
+@contextmanager
+def request_timings() -> Iterator[Timings]:
+    """Collect spans for a block; init_app opens one per Flask request."""
+    timings = Timings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time a block into the current request's Server-Timing; a no-op outside one."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Decorator form of span(); works on plain and async functions."""
+    def decorator(fn: F) -> F:
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+    return decorator
+
+
+class SamplingProfiler:
+    """
+    Samples one thread's Python stack every `interval` seconds from a helper
+    thread and counts identical stacks. collapsed() returns the "folded" format
+    read by flamegraph.pl, speedscope and inferno:
+
+        handler (app.py:10);enrich_with_links (recipe_api.py:314);get (sessions.py:600) 42
+
+    Only the profiled thread is sampled; work handed to worker pools shows up
+    as the caller waiting on its futures.
+    """
+
+    def __init__(
+        self,
+        thread_id: Optional[int] = None,
+        interval: float = PROFILE_SAMPLE_INTERVAL_SECONDS,
+        max_samples: int = PROFILE_MAX_SAMPLES,
+    ):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.max_samples = max_samples
+        self.samples = 0
+        self._stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SamplingProfiler":
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in self._stacks.most_common())
+
+    # ---------- Internal Helpers ----------
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval) and self.samples < self.max_samples:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            self._stacks[_fold(frame)] += 1
+            self.samples += 1
+
+
+def is_admin(request, token: Optional[str]) -> bool:
+    """True when an admin token is configured and the request's X-Admin-Token matches it."""
+    supplied = request.headers.get("X-Admin-Token", "")
+    return bool(token) and hmac.compare_digest(supplied.encode(), token.encode())
+
+
+def init_app(app) -> None:
+    """
+    Collect spans for every request and send them as a Server-Timing header
+    (SERVER_TIMING=false turns the header off).
+
+    ?profile=1 from an admin (X-Admin-Token matching ADMIN_TOKEN) runs the
+    request under SamplingProfiler and answers with the collapsed stacks
+    instead of the normal body. Without a configured token profiling is
+    unavailable. Streamed bodies are produced after the response is returned,
+    so their spans and samples are not included.
+    """
+    from flask import Response, g, jsonify, request
+
+    app.config.setdefault("SERVER_TIMING", SERVER_TIMING_ENABLED)
+    app.config.setdefault("ADMIN_TOKEN", os.getenv("ADMIN_TOKEN"))
+    instrument_sqlalchemy()
+
+    @app.before_request
+    def _start_timings():
+        g._timings = Timings()
+        g._timings_token = _current.set(g._timings)
+        g._timings_started = time.perf_counter()
+        if request.args.get("profile") == "1":
+            if not is_admin(request, app.config["ADMIN_TOKEN"]):
+                return jsonify({"error": "Profiling requires an admin token"}), 403
+            g._profiler = SamplingProfiler().start()
+        return None
+
+    @app.after_request
+    def _emit_timings(response):
+        timings = g.get("_timings")
+        if timings is None:
+            return response
+        total = time.perf_counter() - g._timings_started
+        profiler = g.pop("_profiler", None)
+        if profiler is not None:
+            profiler.stop()
+            status = response.status_code
+            response = Response(profiler.collapsed(), mimetype="text/plain")
+            response.headers["Cache-Control"] = "no-store"
+            response.headers["X-Profiled-Status"] = str(status)
+            response.headers["X-Profile-Samples"] = str(profiler.samples)
+            app.logger.info("Profiled %s %s: %d samples", request.method, request.path, profiler.samples)
+        if app.config["SERVER_TIMING"] or profiler is not None:
+            value = timings.header(total)
+            if value:
+                response.headers["Server-Timing"] = value
+        return response
+
+    @app.teardown_request
+    def _end_timings(exc=None):
+        profiler = g.pop("_profiler", None)
+        if profiler is not None:
+            profiler.stop()
+        token = g.pop("_timings_token", None)
+        if token is not None:
+            try:
+                _current.reset(token)
+            except ValueError:
+                # Reset from a different context (e.g. streamed response); just clear it
+                _current.set(None)
+
+
+_sqlalchemy_instrumented = False
+_instrument_lock = threading.Lock()
+
+
+def instrument_sqlalchemy() -> None:
+    """Time every SQLAlchemy cursor execution as a "db" span (once per process)."""
+    global _sqlalchemy_instrumented
+    try:
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+    except ImportError:
+        return
+    with _instrument_lock:
+        if _sqlalchemy_instrumented:
+            return
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _on_db_error)
+        _sqlalchemy_instrumented = True
+
+
+# ---------- Internal Helpers ----------
+
+
+def _fold(frame) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current.get() is not None:
+        conn.info.setdefault("_timing_starts", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    _end_db_span(conn)
+
+
+def _on_db_error(context) -> None:
+    if context.connection is not None:
+        _end_db_span(context.connection)
+
+
+def _end_db_span(conn) -> None:
+    starts = conn.info.get("_timing_starts")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    timings = _current.get()
+    if timings is not None:
+        timings.add("db", elapsed)
@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from services.async_spoonacular_client import AsyncSpoonacularClient  # noqa: E402
+from services.circuit_breaker import CircuitBreaker  # noqa: E402
+from services.rate_limiter import RateLimiter  # noqa: E402
+from services.spoonacular_client import SpoonacularAPIError, SpoonacularConfigError  # noqa: E402
+
+RAW = [{"id": 1, "title": "Egg Toast", "usedIngredients": [{"name": "egg"}], "missedIngredients": []}]
+
+
+def _client(handler, **kwargs):
+    return AsyncSpoonacularClient(api_key="fake-key", transport=httpx.MockTransport(handler), **kwargs)
+
+
+def test_missing_api_key(monkeypatch):
+    monkeypatch.delenv("SPOONACULAR_API_KEY", raising=False)
+    with pytest.raises(SpoonacularConfigError):
+        AsyncSpoonacularClient()
+
+
+def test_find_by_ingredients_happy_path():
+    def handler(request):
+        assert request.url.params["ingredients"] == "bread,egg"
+        return httpx.Response(200, json=RAW)
+
+    async def run():
+        async with _client(handler) as client:
+            return await client.find_by_ingredients(["Eggs", "bread"])
+
+    result = asyncio.run(run())
+    assert result[0]["title"] == "Egg Toast"
+    assert result[0]["used_ingredients"] == ["egg"]
+
+
+def test_retries_5xx_then_raises():
+    calls = []
+
+    def handler(request):
+        calls.append(1)
+        return httpx.Response(503, json={"message": "down"})
+
+    async def run():
+        async with _client(handler, backoff_seconds=0) as client:
+            await client.find_by_ingredients(["egg"])
+
+    with pytest.raises(SpoonacularAPIError) as exc:
+        asyncio.run(run())
+    assert exc.value.status_code == 503
+    assert len(calls) == 3
+
+
+def test_concurrency_cap():
+    in_flight = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json=RAW)
+
+    async def run():
+        async with _client(handler, max_concurrency=3) as client:
+            await asyncio.gather(*(client.find_by_ingredients([f"egg{i}"]) for i in range(20)))
+
+    asyncio.run(run())
+    assert peak <= 3
+
+
+def test_breaker_latency_excludes_the_wait_for_a_slot():
+    class Recording(CircuitBreaker):
+        def record(self, ok, latency):
+            latencies.append(latency)
+            super().record(ok, latency)
+
+    latencies = []
+
+    async def handler(request):
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json=RAW)
+
+    async def run():
+        async with _client(handler, max_concurrency=1, circuit_breaker=Recording()) as client:
+            await asyncio.gather(*(client.find_by_ingredients([f"egg{i}"]) for i in range(5)))
+
+    asyncio.run(run())
+    # Serialized behind one slot, the last call waited ~0.2s; only its own 0.05s counts
+    assert len(latencies) == 5 and max(latencies) < 0.15
+
+
+def test_calls_share_the_rate_limiter_and_feed_back_quota():
+    limiter = RateLimiter(requests_per_second=1, burst=1, max_wait_seconds=0)
+
+    def handler(request):
+        return httpx.Response(200, json=RAW, headers={"X-API-Quota-Used": "12.5", "X-API-Quota-Left": "137.5"})
+
+    async def run():
+        async with _client(handler, rate_limiter=limiter) as client:
+            await client.find_by_ingredients(["egg"])
+            # Burst of one is spent and no waiting is allowed: rejected locally
+            await client.find_by_ingredients(["bread"])
+
+    with pytest.raises(SpoonacularAPIError) as exc:
+        asyncio.run(run())
+    assert exc.value.status_code == 429
+    assert "Local rate limit" in str(exc.value)
+    stats = limiter.stats()
+    assert (stats["accepted"], stats["rejected"]) == (1, 1)
+    assert (stats["points_used"], stats["quota_left"]) == (12.5, 137.5)
+
+
+def test_asgi_suggest_endpoint():
+    from asgi import SuggestApp
+
+    suggest_app = SuggestApp(client_factory=lambda: _client(lambda request: httpx.Response(200, json=RAW)))
+
+    async def run():
+        transport = httpx.ASGITransport(app=suggest_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            ok = await http.get("/recipes/suggest", params={"ingredients": "egg"})
+            missing = await http.get("/recipes/suggest")
+        return ok, missing
+
+    ok, missing = asyncio.run(run())
+    assert ok.status_code == 200
+    assert ok.json()["recipes"][0]["id"] == 1
+    assert missing.status_code == 400
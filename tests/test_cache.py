@@ -0,0 +1,79 @@
+import threading
+
+from services.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_eviction_by_entries():
+    cache = TTLCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_eviction_by_bytes():
+    cache = TTLCache(max_entries=100, max_bytes=10, sizeof=lambda v: len(v))
+    cache.set("a", "xxxx")
+    cache.set("b", "yyyy")
+    cache.set("c", "zzzz")
+    assert len(cache) == 2
+    assert cache.stats()["bytes"] == 8
+    # Values larger than the whole budget are not stored at all
+    cache.set("huge", "x" * 11)
+    assert "huge" not in cache
+
+
+def test_ttl_expiry_and_sweep():
+    clock = FakeClock()
+    cache = TTLCache(ttl_seconds=10, sweep_interval_seconds=5, clock=clock)
+    cache.set("a", {"id": 1})
+    cache.set("b", {"id": 2}, ttl_seconds=100)
+    clock.now += 11
+    assert cache.sweep() == 1
+    assert len(cache) == 1
+    assert cache.get("b") == {"id": 2}
+    assert cache.stats()["expirations"] == 1
+
+
+def test_payload_is_not_annotated():
+    cache = TTLCache(ttl_seconds=60)
+    payload = {"id": 1}
+    cache.set(1, payload)
+    assert cache.get(1) == {"id": 1}
+
+
+def test_hit_miss_counters():
+    cache = TTLCache()
+    cache.get("missing")
+    cache.set("k", "v")
+    cache.get("k")
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_concurrent_writers_respect_bounds():
+    cache = TTLCache(max_entries=50)
+
+    def worker(offset):
+        for i in range(500):
+            cache.set((offset, i), i)
+            cache.get((offset, i - 1))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(cache) == 50
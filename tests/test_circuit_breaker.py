@@ -0,0 +1,187 @@
+import sys
+import time
+import types
+from pathlib import Path
+
+import pytest
+
+from services.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    StaleWhileRevalidate,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_opens_on_error_rate_and_recovers_through_half_open():
+    clock = FakeClock()
+    breaker = CircuitBreaker(min_calls=4, failure_rate_threshold=0.5, open_seconds=10, clock=clock)
+    for ok in (True, False, True, False):
+        breaker.record(ok, 0.1)
+    assert breaker.state == OPEN
+    assert breaker.allow_request() is False
+
+    clock.now += 10
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request() is True
+    assert breaker.allow_request() is False  # only one trial call at a time
+    breaker.record(True, 0.1)
+    assert breaker.state == CLOSED
+
+
+def test_half_open_failure_reopens():
+    clock = FakeClock()
+    breaker = CircuitBreaker(min_calls=1, open_seconds=5, clock=clock)
+    breaker.record(False, 0.1)
+    clock.now += 5
+    assert breaker.allow_request()
+    breaker.record(False, 0.1)
+    assert breaker.state == OPEN
+
+
+def test_unexpected_error_releases_the_half_open_trial_slot():
+    from services.spoonacular_client import SpoonacularClient
+
+    clock = FakeClock()
+    breaker = CircuitBreaker(min_calls=1, open_seconds=5, clock=clock)
+    breaker.record(False, 0.1)
+    clock.now += 5
+
+    def broken(url, params=None, timeout=None):
+        raise ValueError("bad params")
+
+    client = SpoonacularClient(
+        api_key="fake-key", circuit_breaker=breaker, session=types.SimpleNamespace(get=broken)
+    )
+    with pytest.raises(ValueError):
+        client._request("/recipes/findByIngredients", params={"ingredients": "egg"})
+    # No verdict was recorded, but the trial slot is free for the next caller
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request() is True
+    breaker.record(True, 0.1)
+    assert breaker.state == CLOSED
+
+
+def test_opens_on_slow_calls():
+    breaker = CircuitBreaker(min_calls=3, slow_call_seconds=1.0, slow_call_rate_threshold=0.6)
+    for _ in range(3):
+        breaker.record(True, 2.5)
+    assert breaker.is_open
+
+
+def test_call_raises_when_open():
+    breaker = CircuitBreaker(min_calls=1)
+    with pytest.raises(ValueError):
+        breaker.call(lambda: (_ for _ in ()).throw(ValueError("boom")))
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "never")
+
+
+def test_swr_serves_stale_while_open_and_refreshes_after_close():
+    clock = FakeClock()
+    breaker = CircuitBreaker(min_calls=1, open_seconds=5, clock=clock)
+    swr = StaleWhileRevalidate(breaker)
+
+    assert swr.fetch("k", lambda: ["fresh"]) == (["fresh"], None)
+
+    def failing():
+        breaker.record(False, 0.1)
+        raise RuntimeError("upstream down")
+
+    value, age = swr.fetch("k", failing)  # this failure trips the breaker
+    assert value == ["fresh"]
+    assert age is not None
+    assert swr.fetch("k", lambda: pytest.fail("must not call upstream while open"))[0] == ["fresh"]
+
+    with pytest.raises(RuntimeError):
+        swr.fetch("unknown", failing)
+
+    # Recovery: half-open trial succeeds, breaker closes, pending key refreshes in the background
+    clock.now += 5
+    assert breaker.allow_request()
+    swr._pending["k"] = lambda: ["refreshed"]
+    breaker.record(True, 0.1)
+    assert _wait_for(lambda: swr.stats()["refreshed"] == 1)
+    assert swr.fetch("k", lambda: ["refreshed"])[0] == ["refreshed"]
+
+
+def test_backend_suggest_serves_stale_with_header(monkeypatch):
+    import backend.app as app_module
+
+    breaker = CircuitBreaker(min_calls=1)
+    monkeypatch.setattr(app_module, "_suggest_swr", StaleWhileRevalidate(breaker))
+
+    class Resp:
+        status_code = 200
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return [{"id": 1, "title": "Soup"}]
+
+    monkeypatch.setattr(
+        app_module, "get_session", lambda: types.SimpleNamespace(get=lambda url, params=None, timeout=15: Resp())
+    )
+    client = app_module.app.test_client()
+    assert client.get("/recipes/suggest?ingredients=tomato").status_code == 200
+
+    def down(url, params=None, timeout=15):
+        raise app_module.requests.ConnectionError("down")
+
+    monkeypatch.setattr(app_module, "get_session", lambda: types.SimpleNamespace(get=down))
+    resp = client.get("/recipes/suggest?ingredients=tomatoes")
+    assert resp.status_code == 200
+    assert resp.headers["X-Cache"] == "STALE"
+    assert "Age" in resp.headers
+    assert resp.get_json()[0]["title"] == "Soup"
+
+
+@pytest.fixture
+def app_package(monkeypatch):
+    # app.py shadows the app/ package on sys.path; load the package from its directory
+    package = types.ModuleType("app")
+    package.__path__ = [str(Path(__file__).resolve().parents[1] / "app")]
+    monkeypatch.setitem(sys.modules, "app", package)
+    yield package
+    for name in [n for n in sys.modules if n.startswith("app.")]:
+        del sys.modules[name]
+
+
+def test_app_blueprint_answers_503_when_open_without_stale(monkeypatch, app_package):
+    from flask import Flask
+
+    import app.routes.recipes as routes_module
+    import app.services.spoonacular_client as client_module
+
+    breaker = CircuitBreaker(min_calls=1)
+    breaker.record(False, 0.1)
+    monkeypatch.setattr(routes_module, "_suggest_swr", StaleWhileRevalidate(breaker))
+    monkeypatch.setattr(client_module, "get_circuit_breaker", lambda: breaker)
+    monkeypatch.setattr(client_module, "API_KEY", "fake-key")
+    monkeypatch.setattr(client_module, "get_session", lambda: pytest.fail("must not call upstream while open"))
+
+    flask_app = Flask(__name__)
+    flask_app.register_blueprint(routes_module.recipes_bp)
+    resp = flask_app.test_client().get("/recipes/suggest?ingredients=leek")
+    assert resp.status_code == 503
+    assert "unavailable" in resp.get_json()["error"]
@@ -0,0 +1,88 @@
+import datetime
+import gzip
+import json
+import zlib
+
+import pytest
+from flask import Flask, Response, jsonify
+
+from services import compression, json_provider
+
+from .. import create_app
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    json_provider.init_app(app)
+    compression.init_app(app)
+
+    @app.get("/big")
+    def big():
+        response = jsonify([{"title": "Tomato Rice", "n": i} for i in range(200)])
+        response.set_etag("v1")
+        return response
+
+    @app.get("/small")
+    def small():
+        return jsonify({"ok": True})
+
+    @app.get("/stream")
+    def stream():
+        return Response((json.dumps({"n": i}) + "\n" for i in range(3000)), mimetype="application/x-ndjson")
+
+    return app
+
+
+def test_provider_matches_stdlib_json(app):
+    value = {"b": [1, 2.5, None, "é"], "a": {"when": datetime.date(2026, 1, 2)}, 3: True}
+    with app.app_context():
+        fast = app.json.response(value).get_json()
+        stock = json.loads(super(json_provider.FastJSONProvider, app.json).dumps(value))
+    assert fast == stock
+    assert fast["a"]["when"] == "Fri, 02 Jan 2026 00:00:00 GMT"
+    assert app.json.loads(b'{"x": [1]}') == {"x": [1]}
+
+
+@pytest.mark.skipif(json_provider.orjson is None, reason="differences are orjson's")
+def test_provider_documented_differences(app):
+    when = datetime.datetime(2026, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+    with app.app_context():
+        body = app.json.response({"b": float("nan"), "a": "é", "when": when}).get_data()
+        assert body == '{"b":null,"a":"é","when":"Fri, 02 Jan 2026 03:04:05 GMT"}\n'.encode()
+        assert app.json.dumps({"a": [1, 2]}, separators=(", ", ": ")) == '{"a":[1,2]}'
+        assert app.json.dumps({when: 1}) == '{"2026-01-02T03:04:05+00:00":1}'
+
+
+def test_gzip_is_negotiated_above_the_threshold(app):
+    client = app.test_client()
+    plain = client.get("/big")
+    zipped = client.get("/big", headers={"Accept-Encoding": "gzip, deflate"})
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in zipped.headers["Vary"]
+    assert gzip.decompress(zipped.data) == plain.data
+    assert len(zipped.data) < len(plain.data) / 5
+    assert zipped.headers["ETag"] == 'W/"v1"' and plain.headers["ETag"] == '"v1"'
+
+    assert "Content-Encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "Content-Encoding" not in client.get("/big", headers={"Accept-Encoding": "gzip;q=0"}).headers
+
+
+def test_streams_are_compressed_incrementally(app):
+    response = app.test_client().get("/stream", headers={"Accept-Encoding": "gzip"}, buffered=False)
+    chunks = list(response.response)
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert len(chunks) > 2  # flushed along the way, not one blob at the end
+    lines = zlib.decompress(b"".join(chunks), 31).splitlines()
+    assert len(lines) == 3000 and json.loads(lines[-1]) == {"n": 2999}
+
+
+def test_root_app_compresses_and_still_revalidates():
+    client = create_app().test_client()
+    for i in range(100):
+        client.post("/pantry", json={"name": f"item number {i}", "quantity": "1"})
+    first = client.get("/pantry", headers={"Accept-Encoding": "gzip"})
+    assert first.headers["Content-Encoding"] == "gzip"
+    assert len(json.loads(gzip.decompress(first.data))) == 100
+    again = client.get("/pantry", headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
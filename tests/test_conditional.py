@@ -0,0 +1,97 @@
+import sys
+import types
+
+import pytest
+
+import backend.app as backend_app
+from services.conditional import ETagRegistry
+
+from .. import create_app
+
+
+@pytest.fixture
+def client(monkeypatch):
+    calls = []
+
+    def fake_find(ingredients, number=5, ranking=1):
+        calls.append(list(ingredients))
+        return [{"id": 1, "title": "Tomato Rice", "usedIngredientCount": 1, "missedIngredientCount": 0}]
+
+    monkeypatch.setattr(sys.modules[create_app.__module__], "find_by_ingredients", fake_find)
+    with create_app().test_client() as c:
+        c.calls = calls
+        c.post("/pantry", json={"name": "rice"})
+        yield c
+
+
+def test_pantry_poll_gets_304_until_it_changes(client):
+    first = client.get("/pantry")
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "private, no-cache"
+    assert "Accept" in first.headers["Vary"]
+
+    again = client.get("/pantry", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.data == b""
+    assert again.headers["ETag"] == etag
+
+    assert client.get("/pantry?limit=1", headers={"If-None-Match": etag}).status_code == 200
+    client.post("/pantry", json={"name": "beans"})
+    changed = client.get("/pantry", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+
+
+def test_pantry_suggestions_are_conditional(client):
+    first = client.get("/recipes/suggest?from=pantry")
+    again = client.get("/recipes/suggest?from=pantry", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+    assert client.get("/recipes/suggest?from=pantry&number=3", headers={"If-None-Match": first.headers["ETag"]}).status_code == 200
+
+
+def test_registry_tags_follow_the_body_until_they_expire():
+    now = [0.0]
+    registry = ETagRegistry(ttl_seconds=10, clock=lambda: now[0])
+    tag = registry.issue("k", b"[1]")
+    assert registry.issue("k", b"[1]") == tag and registry.current("k") == tag
+    changed = registry.issue("k", b"[2]")
+    assert changed != tag and registry.current("k") == changed
+    assert registry.issue("other", b"[2]") != changed
+    now[0] = 11
+    assert registry.current("k") is None
+
+
+def test_backend_suggest_answers_304_without_calling_upstream(monkeypatch):
+    calls = []
+
+    def fake_get(url, params=None, timeout=15):
+        calls.append(url)
+        return types.SimpleNamespace(status_code=200, raise_for_status=lambda: None, json=lambda: [{"id": 7, "title": "Soup"}])
+
+    monkeypatch.setattr(backend_app, "get_session", lambda: types.SimpleNamespace(get=fake_get))
+    client = backend_app.app.test_client()
+    url = "/recipes/suggest?ingredients=leek,potato&number=2"
+    first = client.get(url)
+    assert first.headers["Cache-Control"] == "public, no-cache"
+    again = client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+    assert len(calls) == 1
+
+
+def test_backend_suggest_rotates_the_tag_when_upstream_changes(monkeypatch):
+    body = [{"id": 7, "title": "Soup"}]
+
+    def fake_get(url, params=None, timeout=15):
+        return types.SimpleNamespace(status_code=200, raise_for_status=lambda: None, json=lambda: list(body))
+
+    monkeypatch.setattr(backend_app, "get_session", lambda: types.SimpleNamespace(get=fake_get))
+    client = backend_app.app.test_client()
+    url = "/recipes/suggest?ingredients=kale,bean&number=2"
+    old = client.get(url).headers["ETag"]
+
+    # Another client fetches after upstream changed: the new body gets a new tag
+    body[0] = {"id": 8, "title": "Stew"}
+    fresh = client.get(url)
+    assert fresh.get_json()[0]["id"] == 8
+    assert fresh.headers["ETag"] != old
+    stale_poll = client.get(url, headers={"If-None-Match": old})
+    assert stale_poll.status_code == 200 and stale_poll.get_json()[0]["id"] == 8
+    assert client.get(url, headers={"If-None-Match": fresh.headers["ETag"]}).status_code == 304
@@ -0,0 +1,52 @@
+import logging
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from services.db_engine import (
+    PROFILE_POOLED,
+    PROFILE_SQLITE,
+    check_engine,
+    engine_options,
+    install_sqlite_pragmas,
+    resolve_profile,
+    sqlite_pragmas,
+)
+
+
+def test_profile_is_inferred_from_the_uri():
+    assert resolve_profile("sqlite:///prepify.db") == PROFILE_SQLITE
+    assert resolve_profile("postgresql+psycopg://u:p@db/prepify") == PROFILE_POOLED
+    assert resolve_profile("sqlite:///x.db", "pooled") == PROFILE_POOLED
+    with pytest.raises(ValueError):
+        resolve_profile("sqlite:///x.db", "turbo")
+
+
+def test_pooled_options_come_from_env():
+    env = {"DB_POOL_SIZE": "4", "DB_MAX_OVERFLOW": "2", "DB_POOL_PRE_PING": "false"}
+    options = engine_options(PROFILE_POOLED, "postgresql+psycopg://u:p@db/prepify", env)
+    assert options["pool_size"] == 4 and options["max_overflow"] == 2
+    assert options["pool_pre_ping"] is False
+    assert options["connect_args"] == {"prepare_threshold": 5}
+    assert options["query_cache_size"] == 500
+
+
+def test_sqlite_profile_applies_pragmas_on_connect(tmp_path, caplog):
+    pragmas = sqlite_pragmas({"SQLITE_BUSY_TIMEOUT_MS": "2500"})
+    uri = f"sqlite:///{tmp_path / 'pantry.db'}"
+    engine = create_engine(uri, **engine_options(PROFILE_SQLITE, uri, {}))
+    install_sqlite_pragmas(engine, pragmas)
+    with caplog.at_level(logging.INFO, logger="services.db_engine"):
+        settings = check_engine(engine, PROFILE_SQLITE, pragmas)
+    assert settings["journal_mode"] == "wal"
+    assert settings["synchronous"] == 1  # NORMAL
+    assert settings["busy_timeout"] == 2500
+    assert settings["cache_size"] == -65536
+    assert "journal_mode=wal" in caplog.text
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 2500
+
+
+def test_startup_check_survives_an_unreachable_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'missing' / 'x.db'}")
+    assert check_engine(engine, PROFILE_SQLITE) is None
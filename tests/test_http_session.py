@@ -0,0 +1,80 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from services.http_session import SessionProvider
+from services.metrics import REGISTRY, Registry
+
+
+def test_session_is_shared_and_pooled():
+    provider = SessionProvider(pool_connections=2, pool_maxsize=7)
+    session = provider.get()
+    assert provider.get() is session
+    adapter = session.get_adapter("https://api.spoonacular.com")
+    assert adapter._pool_maxsize == 7
+    assert adapter.max_retries.total == 0  # retries are owned by RetryPolicy
+    stats = provider.stats()
+    assert stats["pool_maxsize"] == 7
+    assert stats["rebuilds"] == 1
+
+
+def test_session_rebuilt_in_new_process(monkeypatch):
+    provider = SessionProvider()
+    parent = provider.get()
+    monkeypatch.setattr(os, "getpid", lambda: -1)
+    child = provider.get()
+    assert child is not parent
+    assert provider.stats()["rebuilds"] == 2
+
+
+def test_keep_alive_can_be_disabled():
+    provider = SessionProvider(keep_alive=False)
+    assert provider.get().headers["Connection"] == "close"
+
+
+def test_reset_drops_session():
+    provider = SessionProvider()
+    first = provider.get()
+    provider.reset()
+    assert provider.get() is not first
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+def test_pool_reuse_exported_on_metrics():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        provider = SessionProvider()
+        registry = Registry()
+        registry.register_http_pool("demo", provider)
+        url = f"http://127.0.0.1:{server.server_port}/"
+        for _ in range(3):
+            provider.get().get(url, timeout=5)
+        text = registry.render()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    host = f'pool="demo",host="http://127.0.0.1:{server.server_port}"'
+    assert 'prepify_outbound_http_requests_total{pool="demo"} 3' in text
+    assert f"prepify_outbound_http_host_requests_total{{{host}}} 3" in text
+    assert f"prepify_outbound_http_connections_opened_total{{{host}}} 1" in text
+    assert f"prepify_outbound_http_idle_connections{{{host}}} 1" in text
+    assert 'prepify_outbound_http_session_rebuilds_total{pool="demo"} 1' in text
+    assert 'prepify_outbound_http_in_flight{pool="demo"} 0' in text
+
+
+def test_default_session_registered_with_metrics():
+    assert 'prepify_outbound_http_session_rebuilds_total{pool="default"}' in REGISTRY.render()
@@ -0,0 +1,112 @@
+import sys
+
+import pytest
+
+from services.image_proxy import ImageCache, ImageFetchError, ImageNotFound, ImageProxy, proxied_image_url
+
+from .. import create_app
+
+
+class FakeCDN:
+    """Local stand-in for Spoonacular's image host."""
+
+    def __init__(self, images=None, down=False):
+        self.images = images or {}
+        self.down = down
+        self.calls = []
+
+    def __call__(self, url):
+        self.calls.append(url)
+        name = url.rsplit("/", 1)[-1]
+        if self.down:
+            raise ImageFetchError("connection reset")
+        if name not in self.images:
+            raise ImageNotFound(url)
+        return self.images[name], "image/jpeg"
+
+
+@pytest.fixture
+def cdn():
+    return FakeCDN({"7-312x231.jpg": b"jpeg-7", "7-90x90.jpg": b"thumb-7"})
+
+
+@pytest.fixture
+def client(tmp_path, cdn, monkeypatch):
+    def fake_find(ingredients, number=5, ranking=1):
+        return [{"id": 7, "title": "Soup", "image": "https://img.spoonacular.com/recipes/7-312x231.png"}]
+
+    monkeypatch.setattr(sys.modules[create_app.__module__], "find_by_ingredients", fake_find)
+    proxy = ImageProxy(ImageCache(str(tmp_path)), fetcher=cdn)
+    app = create_app({"IMAGE_PROXY": proxy})
+    with app.test_client() as c:
+        yield c
+
+
+def test_image_fetched_once_then_served_from_disk(client, cdn):
+    first = client.get("/images/7")
+    assert first.status_code == 200
+    assert first.data == b"jpeg-7"
+    assert first.mimetype == "image/jpeg"
+    assert "max-age=31536000" in first.headers["Cache-Control"]
+
+    again = client.get("/images/7", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+    assert client.get("/images/7?size=90x90").data == b"thumb-7"
+    assert len(cdn.calls) == 2
+
+
+def test_cold_request_counts_one_miss(tmp_path, cdn):
+    proxy = ImageProxy(ImageCache(str(tmp_path)), fetcher=cdn)
+    proxy.get(7)
+    proxy.get(7)
+    stats = proxy.cache.stats()
+    assert (stats["misses"], stats["hits"]) == (1, 1)
+
+
+def test_image_errors(client):
+    assert client.get("/images/7?size=1x1").status_code == 400
+    assert client.get("/images/7?type=gif").status_code == 400
+    assert client.get("/images/8").status_code == 404
+
+
+def test_upstream_failure_is_502(tmp_path):
+    proxy = ImageProxy(ImageCache(str(tmp_path)), fetcher=FakeCDN(down=True))
+    with pytest.raises(ImageFetchError):
+        proxy.get(1)
+    app = create_app({"IMAGE_PROXY": proxy})
+    assert app.test_client().get("/images/1").status_code == 502
+
+
+def test_identical_images_stored_once(tmp_path):
+    cdn = FakeCDN({"1-312x231.jpg": b"placeholder", "2-312x231.jpg": b"placeholder"})
+    proxy = ImageProxy(ImageCache(str(tmp_path)), fetcher=cdn)
+    assert proxy.get(1)[0] == proxy.get(2)[0]
+    assert proxy.cache.stats()["blobs"] == 1
+
+
+def test_lru_eviction_by_bytes(tmp_path):
+    cache = ImageCache(str(tmp_path), max_bytes=10)
+    cache.put("a", b"aaaa", "image/jpeg")
+    cache.put("b", b"bbbb", "image/jpeg")
+    assert cache.get("a") is not None  # a is now the most recently used
+    cache.put("c", b"cccc", "image/jpeg")
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["bytes"] == 8
+    assert cache.stats()["evictions"] == 1
+
+    # A new process picks up what is on disk, within the same budget
+    assert ImageCache(str(tmp_path), max_bytes=10).stats()["bytes"] == 8
+
+
+def test_suggest_rewrites_images_to_proxy(client):
+    client.post("/pantry", json={"name": "rice"})
+    recipes = client.get("/recipes/suggest?from=pantry").get_json()["recipes"]
+    assert recipes[0]["image"] == "/images/7?type=png"
+
+
+def test_proxied_image_url():
+    assert proxied_image_url(5, "https://img.spoonacular.com/recipes/5-312x231.jpg") == "/images/5"
+    assert proxied_image_url(5, None) is None
+    assert proxied_image_url(None, "x.jpg") == "x.jpg"
@@ -0,0 +1,38 @@
+import pytest
+
+from services.ingredients import canonical_query, canonicalize_ingredients, singularize
+
+
+@pytest.mark.parametrize("raw", ["Tomato, chicken", "chicken,tomato", "chicken, tomatoes", " CHICKEN ,, tomato,tomato "])
+def test_equivalent_queries_share_one_key(raw):
+    assert canonical_query(raw) == "chicken,tomato"
+
+
+@pytest.mark.parametrize(
+    "plural, singular",
+    [
+        ("tomatoes", "tomato"),
+        ("berries", "berry"),
+        ("peaches", "peach"),
+        ("eggs", "egg"),
+        ("leaves", "leaf"),
+        ("asparagus", "asparagus"),
+        ("molasses", "molasses"),
+        ("glass", "glass"),
+    ],
+)
+def test_singularize(plural, singular):
+    assert singularize(plural) == singular
+
+
+def test_synonyms_and_multiword_terms():
+    assert canonicalize_ingredients(["Scallions", "green  beans", "Garbanzo Beans"]) == [
+        "chickpea",
+        "green bean",
+        "green onion",
+    ]
+
+
+def test_blank_input():
+    assert canonicalize_ingredients(" , ,") == []
+    assert canonical_query("") == ""
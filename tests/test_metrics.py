@@ -0,0 +1,128 @@
+import threading
+
+from services.cache import TTLCache
+from services.metrics import REGISTRY, Counter, Histogram, Registry, upstream_endpoint
+from services.retry_policy import RetryPolicy
+from services.spoonacular_client import SpoonacularClient
+
+from .. import create_app
+
+
+def _value(text, series):
+    for line in text.splitlines():
+        if line.startswith(series + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_counter_sums_across_threads():
+    counter = Counter("jobs_total", "Jobs.", ("kind",))
+
+    def work():
+        for _ in range(1000):
+            counter.inc("a")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    counter.inc("b", amount=2)
+
+    assert counter.collect() == {("a",): 8000, ("b",): 2}
+    # Finished threads are folded into one shard without losing counts
+    assert len(counter._shards._live) == 1
+
+
+def test_histogram_renders_cumulative_buckets():
+    hist = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    for v in (0.05, 0.1, 0.5, 3.0):
+        hist.observe(v, "/x")
+    lines = list(hist.render())
+    assert 'latency_seconds_bucket{route="/x",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/x",le="1"} 3' in lines
+    assert 'latency_seconds_bucket{route="/x",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{route="/x"} 4' in lines
+    assert 'latency_seconds_sum{route="/x"} 3.65' in lines
+
+
+def test_registered_cache_stats_exported():
+    registry = Registry()
+    cache = TTLCache(max_entries=1)
+    registry.register_cache("demo", cache)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("b")
+    cache.get("a")
+    text = registry.render()
+    assert 'prepify_cache_hits_total{cache="demo"} 1' in text
+    assert 'prepify_cache_misses_total{cache="demo"} 1' in text
+    assert 'prepify_cache_evictions_total{cache="demo"} 1' in text
+    assert 'prepify_cache_entries{cache="demo"} 1' in text
+
+    del cache
+    assert "demo" not in registry.render()
+
+
+def test_upstream_endpoint_hides_ids():
+    assert upstream_endpoint("https://api.spoonacular.com/recipes/716429/information") == "/recipes/{id}/information"
+    assert upstream_endpoint("/recipes/findByIngredients") == "/recipes/findByIngredients"
+
+
+class _Resp:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.headers = {"Content-Type": "application/json"}
+        self._body = body
+        self.text = ""
+
+    def json(self):
+        return self._body
+
+
+class _Session:
+    def __init__(self, responses):
+        self.responses = list(responses)
+
+    def get(self, url, params=None, timeout=None):
+        return self.responses.pop(0)
+
+
+def test_spoonacular_client_records_retries_and_429s():
+    endpoint = 'client="spoonacular_client",endpoint="/recipes/findByIngredients"'
+    before = REGISTRY.render()
+    client = SpoonacularClient(
+        api_key="fake-key",
+        cache=None,
+        rate_limiter=None,
+        recipe_index=None,
+        retry_policy=RetryPolicy(rand=lambda: 0.0, sleep=lambda s: None),
+        session=_Session([_Resp(429), _Resp(200, [])]),
+    )
+    assert client.find_by_ingredients(["metrics-egg"]) == []
+
+    after = REGISTRY.render()
+    for series, delta in (
+        (f"prepify_spoonacular_retries_total{{{endpoint}}}", 1),
+        (f"prepify_spoonacular_rate_limited_total{{{endpoint}}}", 1),
+        (f"prepify_spoonacular_errors_total{{{endpoint}}}", 1),
+        (f'prepify_spoonacular_requests_total{{{endpoint},code="200"}}', 1),
+        (f"prepify_spoonacular_request_duration_seconds_count{{{endpoint}}}", 2),
+    ):
+        assert _value(after, series) - _value(before, series) == delta, series
+
+
+def test_metrics_endpoint_counts_routes_by_template():
+    client = create_app().test_client()
+    item = client.post("/pantry", json={"name": "rice"}).get_json()
+    client.put(f"/pantry/{item['id']}", json={"name": "basmati rice"})
+    client.get("/no-such-page")
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.content_type.startswith("text/plain; version=0.0.4")
+    text = resp.get_data(as_text=True)
+    assert '# TYPE prepify_http_request_duration_seconds histogram' in text
+    assert 'prepify_http_requests_total{method="PUT",route="/pantry/<int:item_id>",status="200"}' in text
+    assert 'route="<unmatched>",status="404"' in text
+    assert 'prepify_cache_entries{cache="pantry_suggestions"}' in text
@@ -0,0 +1,124 @@
+import pytest
+from sqlalchemy import Column, Integer, String, create_engine, event, select
+from sqlalchemy.orm import Session, declarative_base
+
+from services.pantry_batch import apply_batch
+from services.pantry_revision import read_revision, track_revisions
+from services.pantry_suggestions import DB_PANTRY_ID, pantry_versions
+
+from .. import create_app
+
+Base = declarative_base()
+
+
+class Item(Base):
+    # Same columns as models.PantryItem
+    __tablename__ = "pantry_items"
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False, index=True)
+    quantity = Column(String(50), nullable=True, default="")
+    category = Column(String(50), nullable=True, default="")
+
+
+track_revisions(Item)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    commits = []
+    with Session(engine) as s:
+        event.listen(s, "after_commit", lambda _: commits.append(1))
+        s.add_all([Item(name="Rice", quantity="1"), Item(name="Beans")])
+        s.commit()
+        commits.clear()
+        s.commits = commits
+        yield s
+
+
+def _names(session):
+    return sorted(session.scalars(select(Item.name)))
+
+
+def test_mixed_batch_in_one_commit(session):
+    before = pantry_versions.current(DB_PANTRY_ID)
+    revision = read_revision(session, Item)
+    body, status = apply_batch(session, Item, [
+        {"op": "create", "name": " Tomato ", "quantity": "3"},
+        {"op": "create", "name": "Pasta", "category": "grains"},
+        {"op": "update", "id": 1, "quantity": "2 cups"},
+        {"op": "update", "id": 1, "category": "grains"},
+        {"op": "delete", "id": 2},
+    ])
+    assert status == 200
+    assert body["applied"] == 5 and body["failed"] == 0
+    assert session.commits == [1]
+    assert [r["item"]["name"] for r in body["results"][:2]] == ["Tomato", "Pasta"]
+    assert body["results"][3]["item"] == {"id": 1, "name": "Rice", "quantity": "2 cups", "category": "grains"}
+    assert _names(session) == ["Pasta", "Rice", "Tomato"]
+    assert pantry_versions.current(DB_PANTRY_ID) == before + 1
+    # Bulk statements skip the mapper hooks; the batch bumps the DB revision itself
+    assert read_revision(session, Item) == revision + 1
+
+
+def test_partial_failures_keep_valid_operations(session):
+    body, status = apply_batch(session, Item, [
+        {"op": "create", "name": "Milk"},
+        {"op": "create", "name": ""},
+        {"op": "update", "id": 99, "quantity": "1"},
+        {"op": "delete", "id": 2},
+        {"op": "update", "id": 2, "quantity": "5"},
+        {"op": "explode"},
+    ])
+    assert status == 207
+    assert [r["status"] for r in body["results"]] == ["ok", "error", "error", "ok", "error", "error"]
+    assert body["results"][2]["error"] == "Item not found"
+    assert body["results"][4]["error"] == "Item deleted earlier in this batch"
+    assert _names(session) == ["Milk", "Rice"]
+
+
+def test_atomic_mode_rejects_the_whole_batch(session):
+    body, status = apply_batch(session, Item, [
+        {"op": "create", "name": "Milk"},
+        {"op": "update", "id": 1, "name": "x" * 101},
+    ], atomic=True)
+    assert status == 400
+    assert [r["status"] for r in body["results"]] == ["skipped", "error"]
+    assert session.commits == []
+    assert _names(session) == ["Beans", "Rice"]
+
+
+def test_rejects_malformed_payloads(session):
+    assert apply_batch(session, Item, {"op": "create"})[1] == 400
+    assert apply_batch(session, Item, [])[1] == 400
+    body, status = apply_batch(session, Item, [{"op": "delete", "id": "1"}])
+    assert status == 400 and body["results"][0]["error"] == "id must be an integer"
+
+
+def test_numeric_name_is_stored_as_text(session):
+    body, status = apply_batch(session, Item, [{"op": "create", "name": 5}])
+    assert status == 200
+    assert body["results"][0]["item"]["name"] == "5"
+
+
+def test_batch_over_http_on_sql_pantry():
+    client = create_app({"PANTRY_BACKEND": "sql", "DATABASE_URL": "sqlite://"}).test_client()
+    rice = client.post("/pantry", json={"name": "Rice"}).get_json()
+    resp = client.post("/pantry/batch", json={"operations": [
+        {"op": "create", "name": "Beans"},
+        {"op": "update", "id": rice["id"], "quantity": "2 cups"},
+        {"op": "delete", "id": 999},
+    ]})
+    assert resp.status_code == 207
+    assert [r["status"] for r in resp.get_json()["results"]] == ["ok", "ok", "error"]
+    assert sorted(i["name"] for i in client.get("/pantry").get_json()) == ["Beans", "Rice"]
+
+    resp = client.post("/pantry/batch?atomic=true", json=[{"op": "create", "name": "Milk"}, {"op": "explode"}])
+    assert resp.status_code == 400
+    assert len(client.get("/pantry").get_json()) == 2
+
+
+def test_batch_needs_sql_backend():
+    client = create_app({"PANTRY_BACKEND": "memory"}).test_client()
+    assert client.post("/pantry/batch", json=[{"op": "create", "name": "Milk"}]).status_code == 501
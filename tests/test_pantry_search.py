@@ -0,0 +1,102 @@
+import pytest
+from sqlalchemy import Column, Index, Integer, String, create_engine, event, update
+from sqlalchemy.orm import Session, declarative_base
+
+from services.pantry_search import install_search_index, search_items
+
+from .. import create_app
+
+Base = declarative_base()
+
+
+class Item(Base):
+    # Same columns, indexes and create hook as models.PantryItem
+    __tablename__ = "pantry_items"
+    __table_args__ = (Index("ix_pantry_items_category_name", "category", "name"),)
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False, index=True)
+    quantity = Column(String(50), nullable=True, default="")
+    category = Column(String(50), nullable=True, default="")
+
+
+event.listen(Item.__table__, "after_create", lambda table, connection, **kw: install_search_index(connection, Item))
+
+
+def _names(rows):
+    return [r["name"] for r in rows]
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as s:
+        s.add_all([
+            Item(name="Tomato Sauce", category="canned"),
+            Item(name="Tomatoes", category="produce"),
+            Item(name="Crème fraîche", category="dairy"),
+            Item(name="Brown Rice", category="grains"),
+            Item(name="Rice Noodles", category="grains"),
+        ])
+        s.commit()
+        yield s
+
+
+def test_prefix_autocomplete_and_category_filter(session):
+    assert set(_names(search_items(session, Item, "tom"))) == {"Tomato Sauce", "Tomatoes"}
+    assert _names(search_items(session, Item, "tom sa")) == ["Tomato Sauce"]
+    assert _names(search_items(session, Item, "rice", category="grains", limit=1)) in (["Brown Rice"], ["Rice Noodles"])
+    assert _names(search_items(session, Item, "creme")) == ["Crème fraîche"]
+    assert search_items(session, Item, 'rice" OR "x') == []
+
+
+def test_index_follows_writes(session):
+    session.add(Item(name="Tomatillo"))
+    session.execute(update(Item).where(Item.name == "Brown Rice").values(name="Basmati Rice"))
+    session.delete(session.get(Item, 2))
+    session.commit()
+    assert set(_names(search_items(session, Item, "tom"))) == {"Tomato Sauce", "Tomatillo"}
+    assert _names(search_items(session, Item, "bro")) == []
+    assert _names(search_items(session, Item, "basm")) == ["Basmati Rice"]
+
+
+def test_empty_query_browses_category(session):
+    assert _names(search_items(session, Item, "", category="grains")) == ["Brown Rice", "Rice Noodles"]
+    plan = " ".join(
+        str(row[-1]) for row in session.connection().exec_driver_sql(
+            "EXPLAIN QUERY PLAN SELECT id FROM pantry_items WHERE category = 'grains' ORDER BY name"
+        )
+    )
+    assert "ix_pantry_items_category_name" in plan and "TEMP B-TREE" not in plan
+
+
+def test_backfills_tables_created_without_the_index():
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "CREATE TABLE pantry_items (id INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, "
+            "quantity VARCHAR(50), category VARCHAR(50))"
+        )
+        connection.exec_driver_sql("INSERT INTO pantry_items (name) VALUES ('Oat Milk')")
+    with Session(engine) as s:
+        assert _names(search_items(s, Item, "oat")) == ["Oat Milk"]
+        s.commit()
+
+
+def test_search_over_http_on_sql_pantry():
+    client = create_app({"PANTRY_BACKEND": "sql", "DATABASE_URL": "sqlite://"}).test_client()
+    for name, category in (("Tomato sauce", "sauces"), ("Tomatoes", "produce"), ("Salt", "spices")):
+        client.post("/pantry", json={"name": name, "category": category})
+
+    resp = client.get("/pantry/search?q=tom%20sa")
+    assert resp.status_code == 200
+    assert [i["name"] for i in resp.get_json()["items"]] == ["Tomato sauce"]
+    assert [i["name"] for i in client.get("/pantry/search?category=produce").get_json()["items"]] == ["Tomatoes"]
+    again = client.get("/pantry/search?q=tom%20sa", headers={"If-None-Match": resp.headers["ETag"]})
+    assert again.status_code == 304
+    assert client.get("/pantry/search?q=x&limit=abc").status_code == 400
+
+
+def test_search_needs_sql_backend():
+    client = create_app({"PANTRY_BACKEND": "memory"}).test_client()
+    assert client.get("/pantry/search?q=tom").status_code == 501
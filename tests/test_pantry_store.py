@@ -0,0 +1,118 @@
+import pytest
+from sqlalchemy import Column, Integer, String, create_engine
+from sqlalchemy.orm import Session, declarative_base
+
+from services.pantry_revision import track_revisions
+from services.pantry_store import MemoryPantryStore, PantryStore, SQLAlchemyPantryStore
+
+from .. import create_app
+
+Base = declarative_base()
+
+
+class Item(Base):
+    # Same columns as models.PantryItem
+    __tablename__ = "pantry_items"
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False)
+    quantity = Column(String(50), nullable=True, default="")
+    category = Column(String(50), nullable=True, default="")
+
+
+track_revisions(Item)
+
+
+@pytest.fixture(params=["memory", "sql"])
+def store(request):
+    if request.param == "memory":
+        yield MemoryPantryStore()
+        return
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as s:
+        yield SQLAlchemyPantryStore(s, Item)
+
+
+def test_ids_are_stable_across_deletes(store):
+    ids = [store.add({"name": n, "quantity": "1"})["id"] for n in ("rice", "beans", "oats")]
+    assert store.delete(ids[0]) is True
+    assert store.get(ids[2])["name"] == "oats"
+    assert store.update(ids[1], {"quantity": "2"})["quantity"] == "2"
+    assert store.delete(ids[0]) is False
+    assert store.update(ids[0], {"quantity": "2"}) is None
+    assert [i["id"] for i in store.items()] == ids[1:]
+
+
+def test_page_walks_in_id_order(store):
+    for n in range(7):
+        store.add({"name": f"item{n}"})
+    store.delete(3)
+    first, more = store.page(None, 3)
+    assert [i["id"] for i in first] == [1, 2, 4] and more
+    rest, more = store.page(first[-1]["id"], 10)
+    assert [i["id"] for i in rest] == [5, 6, 7] and not more
+
+
+def test_writes_bump_the_pantry_version(store):
+    before = store.versions.current(store.pantry_id)
+    item = store.add({"name": "rice"})
+    store.update(item["id"], {"name": "basmati rice"})
+    store.delete(item["id"])
+    assert store.versions.current(store.pantry_id) >= before + 1
+
+
+def test_every_write_changes_the_revision(store):
+    seen = [store.revision()]
+    item = store.add({"name": "rice"})
+    seen.append(store.revision())
+    store.update(item["id"], {"quantity": "2"})
+    seen.append(store.revision())
+    store.delete(item["id"])
+    seen.append(store.revision())
+    assert len(set(seen)) == 4
+
+
+def test_sql_revision_sees_in_place_updates_from_another_worker(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pantry.db'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as mine, Session(engine) as theirs:
+        store = SQLAlchemyPantryStore(mine, Item)
+        item = store.add({"name": "rice", "quantity": "1"})
+        before = store.revision()
+        mine.commit()  # end the read transaction, as a request teardown would
+
+        # Same row count and max id: only the DB-backed counter can notice this
+        theirs.get(Item, item["id"]).quantity = "5"
+        theirs.commit()
+        assert store.revision() != before
+
+
+def test_root_app_ids_survive_deletes():
+    client = create_app().test_client()
+    a, b = (client.post("/pantry", json={"name": n}).get_json() for n in ("rice", "beans"))
+    assert client.delete(f"/pantry/{a['id']}").status_code == 204
+    assert client.put(f"/pantry/{b['id']}", json={"name": "black beans"}).get_json()["id"] == b["id"]
+    assert client.get("/pantry").get_json() == [{"id": b["id"], "name": "black beans", "quantity": None}]
+    assert client.delete(f"/pantry/{a['id']}").status_code == 404
+
+
+def test_root_app_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        create_app({"PANTRY_BACKEND": "redis"})
+
+
+def test_root_app_sql_backend():
+    client = create_app({"PANTRY_BACKEND": "sql", "DATABASE_URL": "sqlite://"}).test_client()
+    rice = client.post("/pantry", json={"name": "rice", "category": "grains"}).get_json()
+    client.post("/pantry", json={"name": "beans"})
+    assert client.delete(f"/pantry/{rice['id']}").status_code == 204
+    page = client.get("/pantry?limit=1").get_json()
+    assert [i["name"] for i in page["items"]] == ["beans"] and page["next"] is None
+
+
+def test_incomplete_backend_fails_at_construction():
+    class NoDelete(PantryStore):
+        revision = page = items = get = add = update = MemoryPantryStore.revision
+
+    with pytest.raises(TypeError, match="delete"):
+        NoDelete()
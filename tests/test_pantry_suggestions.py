@@ -0,0 +1,122 @@
+import sqlite3
+import sys
+
+import pytest
+
+from services.pantry_suggestions import PantrySuggestionCache, PantryVersions
+
+from .. import create_app
+
+
+def test_memoized_until_version_bump():
+    versions = PantryVersions()
+    cache = PantrySuggestionCache(versions)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return ["soup"]
+
+    assert cache.get("a", {"number": 5}, compute) == (["soup"], 0, False)
+    assert cache.get("a", {"number": 5}, compute) == (["soup"], 0, True)
+    assert len(calls) == 1
+
+    cache.get("b", {"number": 5}, compute)
+    assert versions.bump("a") == 1
+    assert cache.get("b", {"number": 5}, compute)[2] is True  # other pantries keep their entries
+    assert cache.get("a", {"number": 5}, compute) == (["soup"], 1, False)
+    assert len(calls) == 3
+
+
+def test_result_not_stored_when_pantry_changes_mid_compute():
+    versions = PantryVersions()
+    cache = PantrySuggestionCache(versions)
+
+    def compute():
+        versions.bump("a")
+        return ["stale"]
+
+    assert cache.get("a", None, compute) == (["stale"], 0, False)
+    assert cache.stats()["pantries"] == 0
+
+
+def test_revision_source_catches_writes_without_a_local_bump():
+    versions = PantryVersions()
+    revision = [7]
+    cache = PantrySuggestionCache(versions, revision=lambda _: revision[0])
+    assert cache.get("db", None, lambda: ["soup"]) == (["soup"], 7, False)
+    assert cache.get("db", None, lambda: ["soup"])[2] is True
+    revision[0] = 8  # another process wrote; nothing bumped `versions` here
+    assert cache.get("db", None, lambda: ["stew"]) == (["stew"], 8, False)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    calls = []
+
+    def fake_find(ingredients, number=5, ranking=1):
+        calls.append(list(ingredients))
+        return [{"id": 1, "title": "Tomato Rice", "usedIngredientCount": len(ingredients), "missedIngredientCount": 0}]
+
+    monkeypatch.setattr(sys.modules[create_app.__module__], "find_by_ingredients", fake_find)
+    app = create_app()
+    with app.test_client() as c:
+        c.calls = calls
+        yield c
+
+
+def test_suggest_from_pantry_is_free_until_pantry_changes(client):
+    client.post("/pantry", json={"name": "Tomatoes", "quantity": "2"})
+    rice = client.post("/pantry", json={"name": "rice"}).get_json()
+
+    first = client.get("/recipes/suggest?from=pantry")
+    assert first.status_code == 200
+    assert first.headers["X-Cache"] == "MISS"
+    assert client.calls == [["rice", "tomato"]]
+
+    again = client.get("/recipes/suggest?from=pantry")
+    assert again.headers["X-Cache"] == "HIT"
+    assert again.get_json() == first.get_json()
+    assert len(client.calls) == 1
+
+    client.put(f"/pantry/{rice['id']}", json={"name": "basmati rice"})
+    after = client.get("/recipes/suggest?from=pantry")
+    assert after.headers["X-Cache"] == "MISS"
+    assert after.get_json()["pantryVersion"] > first.get_json()["pantryVersion"]
+    assert client.calls[-1] == ["basmati rice", "tomato"]
+
+
+def test_suggest_requires_from_pantry(client):
+    assert client.get("/recipes/suggest").status_code == 400
+
+
+def test_suggest_fields_projection(client):
+    client.post("/pantry", json={"name": "rice"})
+    resp = client.get("/recipes/suggest?from=pantry&fields=id,title")
+    assert resp.get_json()["recipes"] == [{"id": 1, "title": "Tomato Rice"}]
+    assert client.get("/recipes/suggest?from=pantry&fields=calories").status_code == 400
+
+
+def test_sql_memo_follows_writes_from_another_worker(monkeypatch, tmp_path):
+    calls = []
+
+    def fake_find(ingredients, number=5, ranking=1):
+        calls.append(list(ingredients))
+        return [{"id": 1, "title": "Tomato Rice"}]
+
+    monkeypatch.setattr(sys.modules[create_app.__module__], "find_by_ingredients", fake_find)
+    path = tmp_path / "shared.db"
+    client = create_app({"PANTRY_BACKEND": "sql", "DATABASE_URL": f"sqlite:///{path}"}).test_client()
+    rice = client.post("/pantry", json={"name": "rice"}).get_json()
+    first = client.get("/recipes/suggest?from=pantry")
+    assert client.get("/recipes/suggest?from=pantry").headers["X-Cache"] == "HIT"
+
+    # Another worker's ORM write: the row and its revision change in one transaction,
+    # but this process's pantry_versions never hears of it
+    with sqlite3.connect(path) as other:
+        other.execute("UPDATE pantry_items SET name = 'basmati rice' WHERE id = ?", (rice["id"],))
+        other.execute("UPDATE pantry_items_revision SET revision = revision + 1")
+
+    after = client.get("/recipes/suggest?from=pantry", headers={"If-None-Match": first.headers["ETag"]})
+    assert after.status_code == 200 and after.headers["X-Cache"] == "MISS"
+    assert calls[-1] == ["basmati rice"]
@@ -0,0 +1,40 @@
+from multiprocessing import Process
+
+from services.persistent_cache import SQLiteCache, make_key
+
+
+def test_key_is_canonical_and_drops_api_key():
+    a = make_key("/recipes/findByIngredients", {"ingredients": "egg", "number": 5, "apiKey": "secret"})
+    b = make_key("recipes/findByIngredients", {"number": "5", "ingredients": "egg"})
+    assert a == b
+    assert "secret" not in a
+
+
+def test_roundtrip_and_expiry(tmp_path):
+    cache = SQLiteCache(tmp_path / "cache.sqlite3")
+    cache.set("recipes/information", {"id": 1}, {"id": 1, "title": "Soup"})
+    assert cache.get("recipes/information", {"id": 1}) == {"id": 1, "title": "Soup"}
+
+    cache.set("recipes/information", {"id": 2}, {"id": 2}, ttl_seconds=-1)
+    assert cache.get("recipes/information", {"id": 2}) is None
+    assert cache.purge() == 1
+    assert cache.stats() == [{"endpoint": "recipes/information", "entries": 1, "expired": 0, "bytes": 23}]
+
+
+def _write_entries(path, offset):
+    cache = SQLiteCache(path)
+    for i in range(50):
+        cache.set("recipes/information", {"id": offset + i}, {"id": offset + i})
+
+
+def test_shared_between_processes(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    SQLiteCache(path)
+    procs = [Process(target=_write_entries, args=(path, n * 100)) for n in range(3)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    cache = SQLiteCache(path)
+    assert cache.stats()[0]["entries"] == 150
+    assert cache.get("recipes/information", {"id": 201}) == {"id": 201}
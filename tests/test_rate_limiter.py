@@ -0,0 +1,92 @@
+from multiprocessing import Process, Queue
+
+import pytest
+
+from services.rate_limiter import RateLimiter, RateLimitExceeded
+
+
+class FakeClock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def _limiter(clock, **kwargs):
+    return RateLimiter(clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def test_bucket_allows_burst_then_waits_briefly():
+    clock = FakeClock()
+    limiter = _limiter(clock, requests_per_second=2, burst=2, max_wait_seconds=1.0)
+    limiter.acquire()
+    limiter.acquire()
+    start = clock.now
+    limiter.acquire()  # must wait ~0.5s for a token
+    assert clock.now - start == pytest.approx(0.5)
+
+
+def test_rejects_fast_when_wait_exceeds_budget():
+    clock = FakeClock()
+    limiter = _limiter(clock, requests_per_second=1, burst=1, max_wait_seconds=0.1)
+    limiter.acquire()
+    with pytest.raises(RateLimitExceeded) as exc:
+        limiter.acquire()
+    assert exc.value.retry_after == pytest.approx(1.0)
+    assert limiter.stats()["rejected"] == 1
+
+
+def test_daily_points_budget_and_reset():
+    clock = FakeClock(now=86400 * 20000 + 3600)
+    limiter = _limiter(clock, requests_per_second=100, burst=100, points_per_day=3)
+    limiter.acquire(points=2)
+    with pytest.raises(RateLimitExceeded, match="daily points budget"):
+        limiter.acquire(points=2)
+    clock.now += 86400
+    limiter.acquire(points=2)
+
+
+def test_quota_headers_adapt_budget():
+    clock = FakeClock()
+    limiter = _limiter(clock, requests_per_second=100, burst=100, reserve_points=1)
+    limiter.record_response(200, {"X-API-Quota-Used": "148", "X-API-Quota-Left": "1.5"})
+    assert limiter.stats()["points_used"] == 148
+    with pytest.raises(RateLimitExceeded, match="quota exhausted"):
+        limiter.acquire()
+
+
+def test_429_drains_bucket_and_honors_retry_after():
+    clock = FakeClock()
+    limiter = _limiter(clock, requests_per_second=10, burst=10, max_wait_seconds=0.5)
+    limiter.record_response(429, {"Retry-After": "5"})
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire()
+    clock.now += 5
+    limiter.acquire()
+
+
+def _take_tokens(path, n, queue):
+    limiter = RateLimiter(requests_per_second=0.001, burst=10, max_wait_seconds=0, state_path=path)
+    taken = 0
+    for _ in range(n):
+        try:
+            limiter.acquire()
+            taken += 1
+        except RateLimitExceeded:
+            pass
+    queue.put(taken)
+
+
+def test_bucket_is_shared_across_processes(tmp_path):
+    path = tmp_path / "limiter.sqlite3"
+    queue = Queue()
+    procs = [Process(target=_take_tokens, args=(path, 8, queue)) for _ in range(3)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    assert sum(queue.get() for _ in procs) == 10
@@ -0,0 +1,110 @@
+import json
+import types
+
+import pytest
+
+import backend.services.recipe_api as ra
+
+
+class FakeResp:
+    def __init__(self, json_data, status_code=200):
+        self._json_data = json_data
+        self.status_code = status_code
+        self.text = json.dumps(json_data)
+
+    def raise_for_status(self):
+        if not (200 <= self.status_code < 300):
+            raise ra.requests.HTTPError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return self._json_data
+
+
+@pytest.fixture(autouse=True)
+def fake_key(monkeypatch):
+    monkeypatch.setattr(ra, "API_KEY", "fake-key")
+    ra._recipe_cache.clear()
+    yield
+    ra._recipe_cache.clear()
+
+
+def test_enrich_uses_single_bulk_call(monkeypatch):
+    calls = []
+
+    def fake_get(url, params=None, timeout=15):
+        calls.append(url)
+        assert "informationBulk" in url
+        ids = [int(i) for i in params["ids"].split(",")]
+        return FakeResp([{"id": i, "sourceUrl": f"https://src/{i}", "servings": 2} for i in ids])
+
+    monkeypatch.setattr(ra, "get_session", lambda: types.SimpleNamespace(get=fake_get))
+
+    stubs = [{"id": i, "title": f"Recipe {i}"} for i in (3, 1, 2)]
+    enriched = ra.enrich_with_links(stubs)
+
+    assert len(calls) == 1
+    assert [r["id"] for r in enriched] == [3, 1, 2]
+    assert enriched[0]["sourceUrl"] == "https://src/3"
+    assert enriched[0]["servings"] == 2
+
+
+def test_enrich_falls_back_per_recipe_and_keeps_fallback_url(monkeypatch):
+    def fake_get(url, params=None, timeout=15):
+        if "informationBulk" in url:
+            # Spoonacular silently drops unknown ids
+            return FakeResp([{"id": 1, "sourceUrl": "https://src/1"}])
+        if "/recipes/2/information" in url:
+            return FakeResp({"id": 2, "sourceUrl": "https://src/2"})
+        return FakeResp({"message": "not found"}, status_code=404)
+
+    monkeypatch.setattr(ra, "get_session", lambda: types.SimpleNamespace(get=fake_get))
+
+    stubs = [{"id": i, "title": "Tomato Soup"} for i in (1, 2, 3)]
+    enriched = ra.enrich_with_links(stubs, max_workers=2)
+
+    assert [r["sourceUrl"] for r in enriched] == [
+        "https://src/1",
+        "https://src/2",
+        "https://spoonacular.com/recipes/tomato-soup-3",
+    ]
+
+
+def test_bulk_skips_cached_ids(monkeypatch):
+    ra._recipe_cache.set(1, {"id": 1, "sourceUrl": "https://cached"})
+    seen_ids = []
+
+    def fake_get(url, params=None, timeout=15):
+        seen_ids.append(params["ids"])
+        return FakeResp([{"id": 2}])
+
+    monkeypatch.setattr(ra, "get_session", lambda: types.SimpleNamespace(get=fake_get))
+
+    infos = ra.recipe_information_bulk([1, 2, 2])
+    assert seen_ids == ["2"]
+    assert set(infos) == {1, 2}
+
+
+def test_field_projection_skips_information_lookup(monkeypatch):
+    calls = []
+
+    def fake_get(url, params=None, timeout=15):
+        calls.append(url)
+        return FakeResp([{"id": 1, "sourceUrl": "https://src/1", "servings": 4}])
+
+    monkeypatch.setattr(ra, "get_session", lambda: types.SimpleNamespace(get=fake_get))
+    stubs = [{"id": 1, "title": "Soup", "image": "soup.jpg", "usedIngredientCount": 2,
+              "usedIngredients": [{"name": "leek"}]}]
+
+    cards = ra.enrich_with_links(stubs, fields=["id", "title", "usedIngredients", "usedIngredientCount"])
+    assert cards == [{"id": 1, "title": "Soup", "usedIngredients": ["leek"], "usedIngredientCount": 2}]
+    assert calls == []
+
+    assert ra.enrich_with_links(stubs, fields=["title", "servings"]) == [{"title": "Soup", "servings": 4}]
+    assert len(calls) == 1
+
+
+def test_parse_fields():
+    assert ra.parse_fields(None) is None
+    assert ra.parse_fields(" id, title,id ") == ["id", "title"]
+    with pytest.raises(ValueError, match="nutrition"):
+        ra.parse_fields("id,nutrition")
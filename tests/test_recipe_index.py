@@ -0,0 +1,98 @@
+import pytest
+
+import backend.services.recipe_api as ra
+from services.persistent_cache import SQLiteCache
+from services.recipe_index import RecipeIndex
+
+
+def _item(rid, used, missed, likes=0):
+    return {
+        "id": rid,
+        "title": f"Recipe {rid}",
+        "image": f"https://img/{rid}.jpg",
+        "imageType": "jpg",
+        "usedIngredients": [{"name": n} for n in used],
+        "missedIngredients": [{"name": n} for n in missed],
+        "likes": likes,
+    }
+
+
+@pytest.fixture
+def index():
+    idx = RecipeIndex()
+    idx.add_find_results([
+        _item(1, ["tomatoes", "chicken breast"], ["rice", "salt"]),
+        _item(2, ["tomato"], []),
+        _item(3, ["boneless chicken breast", "cherry tomatoes", "garlic"], ["basil", "parmesan", "pasta"]),
+        _item(4, ["beef"], ["onion"]),
+    ])
+    return idx
+
+
+def test_ranking_modes_match_upstream_semantics(index):
+    by_used = index.search(["chicken breast", "tomato", "garlic"], number=3, ranking=1)
+    assert [r["id"] for r in by_used] == [3, 1, 2]
+    assert (by_used[0]["usedIngredientCount"], by_used[0]["missedIngredientCount"]) == (3, 3)
+
+    by_missing = index.search(["chicken breast", "tomato", "garlic"], number=3, ranking=2)
+    assert [r["id"] for r in by_missing] == [2, 1, 3]
+
+
+def test_upstream_shape_and_token_matching(index):
+    [hit] = index.search("Chicken", number=5)[:1]
+    assert hit["id"] == 1
+    assert [i["name"] for i in hit["usedIngredients"]] == ["chicken breast"]
+    assert [i["name"] for i in hit["missedIngredients"]] == ["tomatoes", "rice", "salt"]
+    assert set(hit) >= {"usedIngredientCount", "missedIngredientCount", "unusedIngredients", "likes", "imageType"}
+
+    rec = index.search(["tomato", "zucchini"], number=1)[0]
+    assert rec["unusedIngredients"] == [{"name": "zucchini"}]
+
+
+def test_ignore_pantry_drops_staples_from_missed(index):
+    plain = {r["id"]: r for r in index.search(["chicken"], number=5)}
+    pantry = {r["id"]: r for r in index.search(["chicken"], number=5, ignore_pantry=True)}
+    assert plain[1]["missedIngredientCount"] == 3
+    assert pantry[1]["missedIngredientCount"] == 2
+
+
+def test_lookup_falls_back_when_too_few_or_stale():
+    now = [1000.0]
+    idx = RecipeIndex(clock=lambda: now[0])
+    idx.add_find_results([_item(1, ["egg"], []), _item(2, ["egg"], ["milk"])])
+    assert idx.lookup(["egg"], number=3) is None
+    assert len(idx.lookup(["egg"], number=2, max_age_seconds=60)) == 2
+    now[0] += 120
+    assert idx.lookup(["egg"], number=2, max_age_seconds=60) is None
+    assert idx.stats()["hits"] == 1
+
+
+def test_reindexing_replaces_postings_and_eviction_is_bounded():
+    idx = RecipeIndex(max_recipes=2)
+    idx.add_find_results([_item(1, ["egg"], [])])
+    idx.add_find_results([_item(1, ["milk"], [])])
+    assert idx.search(["egg"]) == []
+    idx.add_find_results([_item(2, ["milk"], []), _item(3, ["milk"], [])])
+    assert 1 not in idx and len(idx) == 2
+    assert idx.stats()["postings"] == 2
+
+
+def test_bootstraps_from_persistent_cache(tmp_path):
+    disk = SQLiteCache(tmp_path / "cache.sqlite3")
+    disk.set("recipes/findByIngredients", {"ingredients": "egg"}, [_item(1, ["egg"], ["flour"])])
+    disk.set("recipes/information", {"id": 7}, {"id": 7, "title": "Omelette", "extendedIngredients": [{"name": "eggs"}]})
+    idx = RecipeIndex()
+    assert idx.load_from_cache(disk) == 2
+    assert {r["id"] for r in idx.search(["egg"])} == {1, 7}
+
+
+def test_recipe_api_answers_from_index_before_upstream(monkeypatch, index):
+    monkeypatch.setattr(ra, "get_recipe_index", lambda: index)
+    monkeypatch.setattr(ra, "_get_json", lambda *a, **k: pytest.fail("must not call upstream"))
+    results = ra.find_by_ingredients(["tomatoes"], number=2)
+    assert [r["id"] for r in results] == [2, 1]
+
+    upstream = [_item(9, ["kale"], [])]
+    monkeypatch.setattr(ra, "_get_json", lambda *a, **k: upstream)
+    assert ra.find_by_ingredients(["kale"], number=2) == upstream
+    assert 9 in index
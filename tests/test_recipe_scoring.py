@@ -0,0 +1,106 @@
+import pytest
+
+from backend.services.weekly_menu import generate_weekly_menu
+from services.recipe_index import RecipeIndex
+from services.recipe_scoring import ScoringMatrix, score_recipes
+
+CORPUS = [
+    (1, ["chicken breast", "tomato", "rice", "salt"]),
+    (2, ["tomato"]),
+    (3, ["cherry tomatoes", "garlic", "basil", "pasta"]),
+    (4, ["beef", "onion"]),
+]
+
+
+def test_used_missed_and_coverage():
+    matrix = ScoringMatrix(CORPUS, backend="python")
+    scores = matrix.score(["chicken", "tomatoes", "salt"])
+    assert list(scores.used) == [3, 1, 1, 0]
+    assert list(scores.missed) == [1, 0, 3, 2]
+    assert scores.coverage[0] == pytest.approx(0.75)
+
+    ignoring = matrix.score(["chicken", "tomatoes"], ignore_pantry=True)
+    assert ignoring.missed[0] == 1  # salt is a staple, only rice is missing
+
+
+def test_weighted_coverage():
+    matrix = ScoringMatrix(CORPUS, weights={"rice": 3.0}, backend="python")
+    assert matrix.score(["rice"]).coverage[0] == pytest.approx(0.5)
+
+
+def test_rank_orders_like_find_by_ingredients():
+    matrix = ScoringMatrix(CORPUS, backend="python")
+    assert [r["id"] for r in matrix.rank(["chicken", "tomato"], ranking=1)] == [1, 2, 3]
+    assert [r["id"] for r in matrix.rank(["chicken", "tomato"], ranking=2)] == [2, 1, 3]
+
+
+def test_score_many_matches_single_scores():
+    matrix = ScoringMatrix(CORPUS, backend="python")
+    pantries = [["beef"], ["tomato", "garlic"], []]
+    batch = matrix.score_many(pantries)
+    for pantry, scores in zip(pantries, batch):
+        assert list(scores.used) == list(matrix.score(pantry).used)
+
+
+def test_sparse_backend_agrees_with_python():
+    pytest.importorskip("scipy")
+    pantries = [["chicken", "tomatoes", "salt"], ["onion"], ["basil", "pasta", "garlic"]]
+    fast = ScoringMatrix(CORPUS, weights={"rice": 2.0}, backend="sparse")
+    slow = ScoringMatrix(CORPUS, weights={"rice": 2.0}, backend="python")
+    for ignore in (False, True):
+        for a, b in zip(fast.score_many(pantries, ignore), slow.score_many(pantries, ignore)):
+            assert list(a.used) == list(b.used)
+            assert list(a.missed) == list(b.missed)
+            assert list(a.coverage) == pytest.approx(list(b.coverage))
+    fast_ranked, slow_ranked = fast.rank(pantries[0], ranking=2), slow.rank(pantries[0], ranking=2)
+    assert [(r["id"], r["missedIngredientCount"]) for r in fast_ranked] == [
+        (r["id"], r["missedIngredientCount"]) for r in slow_ranked
+    ]
+    assert [r["coverage"] for r in fast_ranked] == pytest.approx([r["coverage"] for r in slow_ranked])
+
+
+def test_sparse_batches_are_scored_in_blocks(monkeypatch):
+    pytest.importorskip("scipy")
+    import services.recipe_scoring as recipe_scoring
+
+    pantries = [["chicken"], ["tomato", "garlic"], ["beef", "onion"], [], ["rice", "salt"]]
+    matrix = ScoringMatrix(CORPUS, backend="sparse")
+    expected = matrix.score_many(pantries)
+
+    # 8 cells over 4 recipes: two pantries per product
+    monkeypatch.setattr(recipe_scoring, "SCORE_BLOCK_CELLS", 8)
+    blocks = []
+    score_block = matrix._score_sparse
+
+    def counting(pantry_cols, ignore_pantry):
+        blocks.append(len(pantry_cols))
+        return score_block(pantry_cols, ignore_pantry)
+
+    monkeypatch.setattr(matrix, "_score_sparse", counting)
+    streamed = list(matrix.iter_scores(iter(pantries)))
+    assert blocks == [2, 2, 1]
+    for a, b in zip(streamed, expected):
+        assert list(a.used) == list(b.used)
+        assert list(a.missed) == list(b.missed)
+        assert list(a.coverage) == pytest.approx(list(b.coverage))
+
+
+def test_from_index_and_score_recipes():
+    index = RecipeIndex()
+    index.add_find_results([
+        {"id": 5, "usedIngredients": [{"name": "egg"}], "missedIngredients": [{"name": "milk"}]},
+    ])
+    assert ScoringMatrix.from_index(index, backend="python").rank(["eggs"]) == [
+        {"id": 5, "usedIngredientCount": 1, "missedIngredientCount": 1, "coverage": 0.5}
+    ]
+    annotated = score_recipes([{"id": 9, "usedIngredients": ["Egg"], "missedIngredients": ["Milk"]}], ["milk"])
+    assert annotated[0]["coverage"] == 0.5
+
+
+def test_weekly_menu_prefers_pantry_coverage():
+    recipes = [
+        {"id": 1, "usedIngredients": ["beef"], "missedIngredients": ["onion"]},
+        {"id": 2, "usedIngredients": ["egg"], "missedIngredients": []},
+    ]
+    menu = generate_weekly_menu(recipes, days=2, pantry=["egg"])
+    assert [d["recipe"]["id"] for d in menu] == [2, 1]
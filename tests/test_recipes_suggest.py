@@ -17,7 +17,7 @@ def client():
 
 def test_recipes_suggest_mocked_requests(monkeypatch, client):
     """
-    Unit test that mocks requests.get to avoid external API calls.
+    Unit test that mocks the pooled session's get to avoid external API calls.
     Verifies:
       - 200 response
       - JSON structure contains 'recipes' list with expected fields
@@ -61,7 +61,7 @@ def test_recipes_suggest_mocked_requests(monkeypatch, client):
         return FakeResp(fake_response_data, 200)
 
     import backend.app as app_module
-    monkeypatch.setattr(app_module.requests, "get", fake_requests_get)
+    monkeypatch.setattr(app_module, "get_session", lambda: types.SimpleNamespace(get=fake_requests_get))
 
     resp = client.get("/recipes/suggest?ingredients=chicken,tomato,rice&number=5")
     assert resp.status_code == 200
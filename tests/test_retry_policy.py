@@ -0,0 +1,95 @@
+import sys
+import time
+
+import pytest
+from flask import Flask
+
+from services import retry_policy
+from services.retry_policy import RetryPolicy, deadline_scope, remaining_time
+
+from .. import create_app
+
+
+def _policy(**kwargs):
+    kwargs.setdefault("rand", lambda: 1.0)  # deterministic: upper edge of the jitter window
+    kwargs.setdefault("sleep", lambda s: None)
+    return RetryPolicy(**kwargs)
+
+
+def test_full_jitter_exponential_backoff():
+    policy = _policy(max_attempts=5, base_delay=0.5, max_delay=1.5)
+    assert policy.next_delay(1, 503) == 0.5
+    assert policy.next_delay(2, 503) == 1.0
+    assert policy.next_delay(3, 503) == 1.5  # capped
+    jittered = RetryPolicy(rand=lambda: 0.25, base_delay=1.0)
+    assert jittered.next_delay(2) == 0.5
+
+
+def test_gives_up_on_non_retryable_and_after_max_attempts():
+    policy = _policy(max_attempts=2)
+    assert policy.next_delay(1, 404) is None
+    assert policy.next_delay(2, 503) is None
+    decisions = policy.stats()["decisions"]
+    assert decisions["give_up:not_retryable"] == 1
+    assert decisions["give_up:attempts"] == 1
+
+
+def test_retry_after_is_honored_and_capped():
+    policy = _policy(retry_after_cap=5)
+    assert policy.next_delay(1, 429, "2") == 2.0
+    assert policy.next_delay(1, 429, "120") is None
+    assert policy.stats()["decisions"]["give_up:retry_after_cap"] == 1
+
+
+def test_never_sleeps_past_the_deadline():
+    policy = _policy(base_delay=2.0)
+    with deadline_scope(0.5):
+        assert 0 < remaining_time() <= 0.5
+        assert policy.next_delay(1, 503) is None
+        assert policy.begin_attempt(10) <= 0.5
+    assert remaining_time() is None
+
+
+def test_expired_deadline_blocks_new_attempts():
+    policy = _policy()
+    with deadline_scope(0.01):
+        time.sleep(0.02)
+        assert policy.begin_attempt(10) is None
+
+
+def test_retry_budget_limits_retry_ratio():
+    policy = _policy(max_attempts=10, budget_ratio=0.1, min_retries_per_window=1)
+    for _ in range(10):
+        policy.begin_attempt(10)
+    assert policy.next_delay(1, 503) is not None
+    assert policy.next_delay(1, 503) is None
+    assert policy.stats()["decisions"]["give_up:budget"] == 1
+
+
+def test_flask_request_gets_deadline():
+    app = Flask(__name__)
+    app.config["REQUEST_DEADLINE_SECONDS"] = 8
+    retry_policy.init_app(app)
+
+    @app.get("/remaining")
+    def remaining():
+        return {"remaining": remaining_time()}
+
+    client = app.test_client()
+    assert client.get("/remaining").get_json()["remaining"] == pytest.approx(8, abs=0.5)
+    shortened = client.get("/remaining", headers={"X-Request-Timeout": "2"}).get_json()["remaining"]
+    assert shortened == pytest.approx(2, abs=0.5)
+
+
+def test_root_app_suggest_runs_under_the_request_deadline(monkeypatch):
+    seen = []
+
+    def fake_find(ingredients, number=5, ranking=1):
+        seen.append(remaining_time())
+        return []
+
+    monkeypatch.setattr(sys.modules[create_app.__module__], "find_by_ingredients", fake_find)
+    client = create_app().test_client()
+    client.post("/pantry", json={"name": "rice"})
+    client.get("/recipes/suggest?from=pantry", headers={"X-Request-Timeout": "2"})
+    assert seen and seen[0] == pytest.approx(2, abs=0.5)
@@ -0,0 +1,74 @@
+import threading
+import time
+
+import pytest
+
+from services.singleflight import SingleFlight
+
+
+def _run_concurrently(n, target):
+    results, errors = [], []
+
+    def wrapper():
+        try:
+            results.append(target())
+        except Exception as e:  # noqa: BLE001
+            errors.append(e)
+
+    threads = [threading.Thread(target=wrapper) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def slow():
+        calls.append(1)
+        release.wait(2)
+        return {"id": 1}
+
+    timer = threading.Timer(0.2, release.set)
+    timer.start()
+    results, errors = _run_concurrently(10, lambda: flight.do("k", slow))
+
+    assert not errors
+    assert len(calls) == 1
+    assert results == [{"id": 1}] * 10
+    stats = flight.stats()
+    assert stats["executed"] == 1
+    assert stats["coalesced"] == 9
+    assert stats["in_flight"] == 0
+
+
+def test_exception_is_shared():
+    flight = SingleFlight()
+
+    def boom():
+        time.sleep(0.2)
+        raise RuntimeError("upstream down")
+
+    results, errors = _run_concurrently(5, lambda: flight.do("k", boom))
+    assert not results
+    assert len(errors) == 5
+    assert all(str(e) == "upstream down" for e in errors)
+
+
+def test_completed_calls_are_not_cached():
+    flight = SingleFlight()
+    counter = iter(range(10))
+    assert flight.do("k", lambda: next(counter)) == 0
+    assert flight.do("k", lambda: next(counter)) == 1
+
+
+def test_different_keys_do_not_coalesce():
+    flight = SingleFlight()
+    assert flight.do("a", lambda: "a") == "a"
+    with pytest.raises(KeyError):
+        flight.do("b", lambda: {}["missing"])
+    assert flight.stats()["coalesced"] == 0
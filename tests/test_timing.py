@@ -0,0 +1,94 @@
+import asyncio
+import sys
+import time
+
+import pytest
+
+from services.retry_policy import RetryPolicy
+from services.timing import SamplingProfiler, request_timings, span, timed
+
+from .. import create_app
+
+
+def test_spans_summed_per_name_and_ignored_outside_a_request():
+    with span("spoonacular"):
+        pass  # no request: nothing to record into
+
+    with request_timings() as timings:
+        for _ in range(3):
+            with span("spoonacular"):
+                pass
+        with span("serialize"):
+            pass
+    assert list(timings.spans()) == ["spoonacular", "serialize"]
+    header = timings.header(total=0.25)
+    assert header.startswith("spoonacular;dur=")
+    assert 'desc="3 calls"' in header
+    assert header.endswith("total;dur=250.0")
+
+
+def test_timed_wraps_async_functions():
+    @timed("upstream")
+    async def call():
+        await asyncio.sleep(0)
+        return 1
+
+    with request_timings() as timings:
+        assert asyncio.run(call()) == 1
+    assert timings.spans()["upstream"][1] == 1
+
+
+def test_retry_backoff_is_its_own_span():
+    policy = RetryPolicy(sleep=lambda s: None)
+    with request_timings() as timings:
+        policy.sleep(0.1)
+    assert "spoonacular_wait" in timings.spans()
+
+
+def test_sampling_profiler_folds_stacks():
+    def busy_wait():
+        end = time.perf_counter() + 0.05
+        while time.perf_counter() < end:
+            pass
+
+    profiler = SamplingProfiler(interval=0.001).start()
+    busy_wait()
+    profiler.stop()
+    assert profiler.samples > 0
+    stack, count = profiler.collapsed().splitlines()[0].rsplit(" ", 1)
+    assert "busy_wait (test_timing.py:" in stack and int(count) > 0
+
+
+def test_server_timing_header_includes_db_spans():
+    client = create_app({"PANTRY_BACKEND": "sql", "DATABASE_URL": "sqlite://"}).test_client()
+    client.post("/pantry", json={"name": "rice"})
+    resp = client.get("/pantry")
+    assert "db;dur=" in resp.headers["Server-Timing"]
+    assert "total;dur=" in resp.headers["Server-Timing"]
+
+
+@pytest.fixture
+def slow_suggest(monkeypatch):
+    def fake_find(ingredients, number=5, ranking=1):
+        time.sleep(0.05)
+        return [{"id": 1, "title": "Rice Bowl"}]
+
+    monkeypatch.setattr(sys.modules[create_app.__module__], "find_by_ingredients", fake_find)
+    client = create_app({"ADMIN_TOKEN": "s3cret"}).test_client()
+    client.post("/pantry", json={"name": "rice"})
+    return client
+
+
+def test_profile_requires_admin_token(slow_suggest):
+    assert slow_suggest.get("/recipes/suggest?from=pantry&profile=1").status_code == 403
+    resp = slow_suggest.get("/recipes/suggest?from=pantry&profile=1", headers={"X-Admin-Token": "nope"})
+    assert resp.status_code == 403
+
+
+def test_profile_returns_collapsed_stacks(slow_suggest):
+    resp = slow_suggest.get("/recipes/suggest?from=pantry&profile=1", headers={"X-Admin-Token": "s3cret"})
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/plain"
+    assert resp.headers["X-Profiled-Status"] == "200"
+    assert int(resp.headers["X-Profile-Samples"]) > 0
+    assert "fake_find (test_timing.py:" in resp.get_data(as_text=True)
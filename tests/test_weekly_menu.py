@@ -0,0 +1,114 @@
+import random
+
+from backend.services.weekly_menu import generate_weekly_menu, primary_ingredient
+
+
+def _recipes(primaries):
+    return [{"id": i, "usedIngredients": [p] if p else [], "missedIngredients": []} for i, p in enumerate(primaries)]
+
+
+def _ids(menu):
+    return [day["recipe"]["id"] for day in menu]
+
+
+def test_round_robin_matches_previous_menus():
+    # Same output the original scheduler produced for these pools
+    recipes = _recipes(["Chicken", "beef", "tofu", "fish", "chicken", "beef", "tofu", "fish"])
+    menu = generate_weekly_menu(recipes)
+    assert _ids(menu) == [0, 1, 2, 3, 4, 5, 6]
+    assert [d["dayName"] for d in menu] == ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+    assert _ids(generate_weekly_menu(_recipes(["a", "a", "b", "c", "d", "b"]), days=5)) == [0, 2, 3, 4, 1]
+
+
+def _original_ids(recipes, days):
+    """The pre-deque scheduler, plus whether it ever dropped a bucket from the rotation."""
+    selected, recent, by_primary = [], [], {}
+    for r in recipes:
+        by_primary.setdefault(primary_ingredient(r), []).append(r)
+    primaries = list(by_primary)
+    idx, dropped = 0, False
+    while len(selected) < min(days, len({r["id"] for r in recipes})) and primaries and idx <= 1000:
+        p = primaries[idx % len(primaries)]
+        chosen = None
+        for r in by_primary[p]:
+            if any(r["id"] == s["id"] for s in selected) or (p and p in recent[-3:]):
+                continue
+            chosen = r
+            break
+        if chosen:
+            selected.append(chosen)
+            recent.append(p)
+        else:
+            primaries.remove(p)
+            dropped = True
+        idx += 1
+    return [r["id"] for r in selected], dropped
+
+
+def test_parity_with_original_scheduler_while_no_bucket_is_dropped():
+    rng = random.Random(14)
+    compared = 0
+    for _ in range(2000):
+        recipes = [
+            {"id": rng.randint(0, 8), "usedIngredients": [rng.choice("abcdef")], "missedIngredients": []}
+            for _ in range(rng.randint(1, 12))
+        ]
+        days = rng.randint(1, 10)
+        expected, dropped = _original_ids(recipes, days)
+        if dropped:
+            continue
+        assert _ids(generate_weekly_menu(recipes, days=days)) == expected, (recipes, days)
+        compared += 1
+    assert compared > 1000
+
+
+def test_id_shared_by_two_buckets_no_longer_skips_a_bucket():
+    recipes = [
+        {"id": rid, "usedIngredients": [p], "missedIngredients": []}
+        for rid, p in ((13, "b"), (13, "d"), (4, "a"), (7, "c"))
+    ]
+    # The original dropped the exhausted "d" bucket and its index shift skipped "a": [13, 7, 4]
+    assert _original_ids(recipes, 8) == ([13, 7, 4], True)
+    assert _ids(generate_weekly_menu(recipes, days=8)) == [13, 4, 7]
+
+
+def test_duplicates_are_scheduled_once():
+    recipes = _recipes(["a", "b", "c", "d"]) + _recipes(["a", "b"])
+    assert _ids(generate_weekly_menu(recipes)) == [0, 1, 2, 3]
+
+
+def test_never_cuts_the_menu_short():
+    # Two buckets cannot satisfy a 3-day window; the old loop stopped after 2 days
+    menu = generate_weekly_menu(_recipes(["a", "a", "a", "b", "b", "b"]), days=6)
+    assert len(menu) == 6
+    assert [primary_ingredient(d["recipe"]) for d in menu] == ["a", "b", "a", "b", "a", "b"]
+
+
+def test_diversity_window_is_configurable():
+    recipes = _recipes(["a", "b", "a", "c", "a", "d"])
+    assert _ids(generate_weekly_menu(recipes, days=4, diversity_window=0)) == [0, 1, 3, 5]
+    menu = generate_weekly_menu(recipes, days=6, diversity_window=2)
+    primaries = [primary_ingredient(d["recipe"]) for d in menu]
+    assert all(primaries[i] not in primaries[max(0, i - 2):i] for i in range(4))
+
+
+def test_multi_week_horizon():
+    recipes = _recipes([f"p{i % 10}" for i in range(40)])
+    menu = generate_weekly_menu(recipes, days=28)
+    assert len(menu) == 28 and len(set(_ids(menu))) == 28
+    assert menu[27]["dayName"] == "Sun"
+
+    small = generate_weekly_menu(_recipes(["a", "b", "c", "d"]), days=28, allow_repeats=True)
+    assert len(small) == 28
+    assert _ids(small)[:8] == [0, 1, 2, 3, 0, 1, 2, 3]
+
+
+def test_large_pool_is_fully_scheduled():
+    recipes = _recipes([f"p{i % 500}" for i in range(50_000)])
+    menu = generate_weekly_menu(recipes, days=2_000)
+    assert len(menu) == 2_000
+
+
+def test_upstream_ingredient_dicts():
+    assert primary_ingredient({"usedIngredients": [{"name": "Tomato"}]}) == "tomato"